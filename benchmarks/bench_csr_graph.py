@@ -0,0 +1,96 @@
+"""Compare the memory and traversal cost of `networkx` and `CSRGraph`.
+
+The graph has the attributes the indexing pipeline keeps on its edges
+(weight, rank and ids) and a power law degree distribution. The memory
+of the CSR graph does not include the strings (names and ids) it shares
+with the networkx graph it is converted from.
+
+Usage:
+    python benchmarks/bench_csr_graph.py --num-edges 500000
+"""
+
+import argparse
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import TypeVar
+
+import networkx as nx
+import numpy as np
+
+from langchain_graphrag.utils.csr_graph import CSRGraph
+
+T = TypeVar("T")
+
+
+def make_graph(num_nodes: int, num_edges: int, seed: int) -> nx.Graph:
+    rng = np.random.default_rng(seed)
+    sources = rng.zipf(1.8, size=num_edges) % num_nodes
+    targets = rng.integers(0, num_nodes, size=num_edges)
+    graph = nx.Graph()
+    graph.add_nodes_from(f"ENTITY {i}" for i in range(num_nodes))
+    graph.add_edges_from(
+        (
+            f"ENTITY {s}",
+            f"ENTITY {t}",
+            {"weight": 1.0, "rank": int(s % 97), "id": f"edge-{index}"},
+        )
+        for index, (s, t) in enumerate(zip(sources, targets, strict=True))
+    )
+    return graph
+
+
+def _measure(build: Callable[[], T]) -> tuple[T, int, int, float]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size, peak, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-nodes", type=int, default=50_000)
+    parser.add_argument("--num-edges", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    graph, nx_size, _, nx_build = _measure(
+        lambda: make_graph(args.num_nodes, args.num_edges, args.seed)
+    )
+    csr, csr_size, csr_peak, csr_build = _measure(
+        lambda: CSRGraph.from_networkx(graph, edge_attributes=["weight", "rank", "id"])
+    )
+    print(f"edges: {graph.number_of_edges()}")
+    print(f"networkx: {nx_size / 2**20:8.1f} MiB (build {nx_build:.2f}s)")
+    print(
+        f"     csr: {csr_size / 2**20:8.1f} MiB "
+        f"(peak {csr_peak / 2**20:.1f} MiB, conversion {csr_build:.2f}s)"
+    )
+
+    start = time.perf_counter()
+    nx_total = sum(graph.degree(n) for n in graph.nodes)
+    nx_time = time.perf_counter() - start
+    start = time.perf_counter()
+    csr_total = int(csr.degrees().sum())
+    csr_time = time.perf_counter() - start
+    assert nx_total == csr_total
+    print(f"degrees   networkx {nx_time:.3f}s csr {csr_time:.4f}s")
+
+    nodes = np.arange(0, csr.num_nodes, 10)
+    names = csr.node_names[nodes].tolist()
+    start = time.perf_counter()
+    nx_edges = {frozenset(e) for e in graph.edges(names)}
+    nx_time = time.perf_counter() - start
+    start = time.perf_counter()
+    csr_edges = csr.incident_edges(nodes)
+    csr_time = time.perf_counter() - start
+    assert len(nx_edges) == len(csr_edges)
+    print(f"incident  networkx {nx_time:.3f}s csr {csr_time:.4f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Compare the graph embedding generators on a graph with planted communities.
+
+Besides the time, the separation is reported: the mean cosine similarity
+of nodes of the same community minus the one of nodes of different
+communities, over random pairs of nodes.
+
+Usage:
+    python benchmarks/bench_graph_embedding.py --num-nodes 20000 --dimensions 128
+"""
+
+import argparse
+import time
+
+import networkx as nx
+import numpy as np
+
+from langchain_graphrag.indexing.embedding_generation import (
+    FastRPGraphEmbeddingGenerator,
+    Node2VectorGraphEmbeddingGenerator,
+    SpectralGraphEmbeddingGenerator,
+)
+from langchain_graphrag.types.graphs.embedding import GraphEmbeddingGenerator
+
+# share of the edges that stay in the community of their source
+_SHARE_INSIDE_COMMUNITY = 0.8
+
+
+def make_graph(
+    num_nodes: int,
+    num_communities: int,
+    degree: int,
+    seed: int,
+) -> tuple[nx.Graph, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    communities = rng.integers(0, num_communities, size=num_nodes)
+    members = [np.flatnonzero(communities == c) for c in range(num_communities)]
+
+    sources = np.repeat(np.arange(num_nodes), degree // 2)
+    inside = rng.random(len(sources)) < _SHARE_INSIDE_COMMUNITY
+    targets = rng.integers(0, num_nodes, size=len(sources))
+    for source_index in np.flatnonzero(inside):
+        community = members[communities[sources[source_index]]]
+        targets[source_index] = community[rng.integers(0, len(community))]
+
+    graph = nx.Graph()
+    graph.add_nodes_from(f"ENTITY {i}" for i in range(num_nodes))
+    graph.add_edges_from(
+        (f"ENTITY {s}", f"ENTITY {t}", {"weight": 1.0})
+        for s, t in zip(sources, targets, strict=True)
+        if s != t
+    )
+    return graph, communities
+
+
+def separation(
+    embeddings: dict[str, np.ndarray],
+    communities: np.ndarray,
+    seed: int,
+) -> float:
+    names = list(embeddings)
+    matrix = np.stack([embeddings[n] for n in names]).astype(np.float64)
+    matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+    labels = communities[[int(n.split()[-1]) for n in names]]
+
+    rng = np.random.default_rng(seed)
+    first, second = rng.integers(0, len(names), size=(2, 20_000))
+    similarities = np.einsum("ij,ij->i", matrix[first], matrix[second])
+    same = labels[first] == labels[second]
+    return float(similarities[same].mean() - similarities[~same].mean())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-nodes", type=int, default=5_000)
+    parser.add_argument("--num-communities", type=int, default=20)
+    parser.add_argument("--degree", type=int, default=10)
+    parser.add_argument("--dimensions", type=int, default=128)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--generators",
+        nargs="+",
+        default=["node2vec", "fastrp", "spectral"],
+        choices=["node2vec", "fastrp", "spectral"],
+    )
+    args = parser.parse_args()
+
+    graph, communities = make_graph(
+        args.num_nodes, args.num_communities, args.degree, args.seed
+    )
+    print(f"nodes: {graph.number_of_nodes()} edges: {graph.number_of_edges()}")
+
+    generators: dict[str, GraphEmbeddingGenerator] = {
+        "node2vec": Node2VectorGraphEmbeddingGenerator(
+            use_lcc=False, dimensions=args.dimensions
+        ),
+        "fastrp": FastRPGraphEmbeddingGenerator(
+            use_lcc=False, dimensions=args.dimensions
+        ),
+        "spectral": SpectralGraphEmbeddingGenerator(
+            use_lcc=False, dimensions=args.dimensions
+        ),
+    }
+    for name in args.generators:
+        start = time.perf_counter()
+        embeddings = generators[name].run(graph)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{name:>9}: {elapsed:8.2f}s "
+            f"separation {separation(embeddings, communities, args.seed):.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
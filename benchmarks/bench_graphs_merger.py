@@ -0,0 +1,98 @@
+"""Benchmark the engines of `GraphsMerger` on synthetic chunk graphs.
+
+The entities of every chunk are drawn from a Zipf distribution so that a
+few hub entities show up in a large number of chunks, like they do in
+real corpora.
+
+Usage:
+    python benchmarks/bench_graphs_merger.py --num-chunks 20000
+"""
+
+import argparse
+import copy
+import itertools
+import time
+
+import networkx as nx
+import numpy as np
+
+from langchain_graphrag.indexing.graph_generation.graphs_merger import (
+    GraphsMerger,
+    MergeEngine,
+)
+
+
+def make_chunk_graphs(
+    num_chunks: int,
+    num_entities: int,
+    entities_per_chunk: int,
+    seed: int,
+) -> list[nx.Graph]:
+    rng = np.random.default_rng(seed)
+    graphs = []
+    for chunk in range(num_chunks):
+        names = np.unique(
+            rng.zipf(1.5, size=entities_per_chunk) % num_entities
+        ).tolist()
+        graph = nx.Graph()
+        for name in names:
+            graph.add_node(
+                f"ENTITY {name}",
+                type="PERSON",
+                description=[f"description of {name} in chunk {chunk}"],
+                text_unit_ids=[f"chunk-{chunk}"],
+            )
+        for source, target in itertools.pairwise(names):
+            graph.add_edge(
+                f"ENTITY {source}",
+                f"ENTITY {target}",
+                weight=1.0,
+                description=[f"{source} relates to {target} in chunk {chunk}"],
+                text_unit_ids=[f"chunk-{chunk}"],
+            )
+        graphs.append(graph)
+    return graphs
+
+
+def _graph_signature(graph: nx.Graph) -> tuple[list, list]:
+    return list(graph.nodes(data=True)), list(graph.edges(data=True))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-chunks", type=int, default=10_000)
+    parser.add_argument("--num-entities", type=int, default=5_000)
+    parser.add_argument("--entities-per-chunk", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--engines",
+        nargs="+",
+        type=MergeEngine,
+        default=list(MergeEngine),
+        help="The fold engine is very slow on large inputs",
+    )
+    args = parser.parse_args()
+
+    graphs = make_chunk_graphs(
+        args.num_chunks,
+        args.num_entities,
+        args.entities_per_chunk,
+        args.seed,
+    )
+
+    results = {}
+    for engine in args.engines:
+        # the fold mutates the lists of the input graphs
+        engine_graphs = copy.deepcopy(graphs)
+        start = time.perf_counter()
+        results[engine] = GraphsMerger(engine=engine)(engine_graphs)
+        elapsed = time.perf_counter() - start
+        print(f"{engine.value:>10}: {elapsed:8.3f}s")
+
+    signatures = [_graph_signature(g) for g in results.values()]
+    assert all(s == signatures[0] for s in signatures), "merged graphs differ"
+    print("merged graphs are identical")
+
+
+if __name__ == "__main__":
+    main()
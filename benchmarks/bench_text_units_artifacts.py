@@ -0,0 +1,112 @@
+"""Benchmark the joins of `TextUnitsArtifactsGenerator`.
+
+Compares the inverted index built in one pass over the entities and
+relationships with the previous implementation, which exploded and
+aggregated them with a python function per text unit and merged three
+times.
+
+Usage:
+    python benchmarks/bench_text_units_artifacts.py --num-text-units 50000
+"""
+
+import argparse
+import time
+from typing import cast
+
+import numpy as np
+import pandas as pd
+
+from langchain_graphrag.indexing.artifacts_generation import (
+    TextUnitsArtifactsGenerator,
+)
+
+
+def _previous_temporary_frame(
+    entities_or_relationships: pd.DataFrame,
+    rename_id_to: str,
+) -> pd.DataFrame:
+    tmp = entities_or_relationships[["id", "text_unit_ids"]].explode("text_unit_ids")
+    grouped = tmp.groupby("text_unit_ids", sort=False)
+    output = cast("pd.DataFrame", grouped.agg({"id": lambda s: list(s.unique())}))
+    output = output.rename(columns={"id": rename_id_to}).reset_index()
+    return output.rename(columns={"text_unit_ids": "id"})
+
+
+def previous_run(
+    base_text_units: pd.DataFrame,
+    entities: pd.DataFrame,
+    relationships: pd.DataFrame,
+) -> pd.DataFrame:
+    entities_df = _previous_temporary_frame(entities, "entity_ids")
+    relationships_df = _previous_temporary_frame(relationships, "relationship_ids")
+    # the first merge was computed twice
+    base_text_units.merge(entities_df, on="id", how="left", indicator=True)
+    text_units = base_text_units.merge(entities_df, on="id", how="left")
+    return text_units.merge(relationships_df, on="id", how="left")
+
+
+def make_frames(
+    num_text_units: int,
+    num_entities: int,
+    num_relationships: int,
+    seed: int,
+) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    rng = np.random.default_rng(seed)
+    text_unit_ids = [f"chunk-{i}" for i in range(num_text_units)]
+    base_text_units = pd.DataFrame(
+        {
+            "document_id": [f"doc-{i // 20}" for i in range(num_text_units)],
+            "id": text_unit_ids,
+            "text_unit": [f"text of chunk {i}" for i in range(num_text_units)],
+        }
+    )
+
+    def _frame(prefix: str, size: int) -> pd.DataFrame:
+        # a few entities show up in a large number of text units
+        counts = np.minimum(rng.zipf(1.7, size=size), num_text_units)
+        return pd.DataFrame(
+            {
+                "id": [f"{prefix}-{i}" for i in range(size)],
+                "text_unit_ids": [
+                    [text_unit_ids[j] for j in rng.integers(0, num_text_units, count)]
+                    for count in counts
+                ],
+            }
+        )
+
+    return (
+        base_text_units,
+        _frame("entity", num_entities),
+        _frame("relationship", num_relationships),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-text-units", type=int, default=20_000)
+    parser.add_argument("--num-entities", type=int, default=50_000)
+    parser.add_argument("--num-relationships", type=int, default=80_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    frames = make_frames(
+        args.num_text_units,
+        args.num_entities,
+        args.num_relationships,
+        args.seed,
+    )
+
+    start = time.perf_counter()
+    expected = previous_run(*frames)
+    print(f"  previous: {time.perf_counter() - start:8.3f}s")
+
+    start = time.perf_counter()
+    actual = TextUnitsArtifactsGenerator().run(*frames)
+    print(f"  one pass: {time.perf_counter() - start:8.3f}s")
+
+    pd.testing.assert_frame_equal(actual, expected)
+    print("text units are identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -22,6 +22,10 @@ from langchain_openai import (
 )
 
 from langchain_graphrag.indexing import IndexerArtifacts
+from langchain_graphrag.indexing.artifacts_generation import (
+    LazyGraphEmbeddings,
+    save_graph_embeddings,
+)
 
 _LOGGER = logging.getLogger("main:common")
 
@@ -205,6 +209,19 @@ def save_artifacts(artifacts: IndexerArtifacts, path: Path):
         with path.joinpath("community_info.pickle").open("wb") as fp:
             pickle.dump(artifacts.communities, fp)
 
+    # lazy graph embeddings that were never asked for are not computed
+    graph_embeddings = artifacts.graph_embeddings
+    if isinstance(graph_embeddings, LazyGraphEmbeddings):
+        graph_embeddings = (
+            graph_embeddings.get() if graph_embeddings.is_computed else None
+        )
+    if graph_embeddings is not None:
+        save_graph_embeddings(
+            graph_embeddings,
+            path.joinpath("graph_embeddings"),
+            graph=artifacts.summarized_graph,
+        )
+
 
 def load_artifacts(path: Path) -> IndexerArtifacts:
     entities = pd.read_parquet(f"{path}/entities.parquet")
@@ -239,6 +256,11 @@ def load_artifacts(path: Path) -> IndexerArtifacts:
         merged_graph=merged_graph,
         summarized_graph=summarized_graph,
         communities=communities,
+        # embeddings saved for another version of the graph are ignored
+        graph_embeddings=LazyGraphEmbeddings(
+            cache_dir=path.joinpath("graph_embeddings"),
+            graph=summarized_graph,
+        ),
     )
 
 
@@ -188,6 +188,7 @@ def index(
         relationships_artifacts_generator=relationships_artifacts_generator,
         text_units_artifacts_generator=text_units_artifacts_generator,
         communities_report_artifacts_generator=communities_report_artifacts_generator,
+        graph_embeddings_dir=artifacts_dir / "graph_embeddings",
     )
 
     artifacts = indexer.run(documents)
@@ -3,11 +3,16 @@
 # and are modified to fit the needs of this project
 
 import html
+import weakref
 from typing import Any, cast
 
 import networkx as nx
+import numpy as np
 from graspologic.utils import largest_connected_component
 
+from langchain_graphrag.utils.csr_graph import CSRGraph
+from langchain_graphrag.utils.disk_cache import make_cache_key
+
 
 def _stabilize_graph(graph: nx.Graph) -> nx.Graph:
     """Ensure an undirected graph with the same relationships will always be read the same way."""  # noqa: E501
@@ -43,10 +48,7 @@ def _stabilize_graph(graph: nx.Graph) -> nx.Graph:
 
         edges = [_sort_source_target(edge) for edge in edges]
 
-    def _get_edge_key(source: Any, target: Any) -> str:
-        return f"{source} -> {target}"
-
-    edges = sorted(edges, key=lambda x: _get_edge_key(x[0], x[1]))
+    edges = sorted(edges, key=lambda x: (x[0], x[1]))
 
     fixed_graph.add_edges_from(edges)
     return fixed_graph
@@ -58,8 +60,68 @@ def normalize_node_names(graph: nx.Graph | nx.DiGraph) -> nx.Graph | nx.DiGraph:
     return nx.relabel_nodes(graph, node_mapping)
 
 
+# graph -> (fingerprint of the graph, its stable largest connected component)
+_LCC_CACHE: weakref.WeakKeyDictionary[nx.Graph, tuple[str, nx.Graph]] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def graph_fingerprint(graph: nx.Graph) -> str:
+    """Fingerprint of the nodes, the edges and the edge weights of a graph.
+
+    It is the same in every process, so it can be saved next to an
+    artifact computed from the graph.
+    """
+    return make_cache_key(
+        list(graph.nodes),
+        [
+            (source, target, data.get("weight"))
+            for source, target, data in graph.edges(data=True)
+        ],
+    )
+
+
 def stable_largest_connected_component(graph: nx.Graph) -> nx.Graph:
-    graph = graph.copy()
-    graph = cast(nx.Graph, largest_connected_component(graph))
-    graph = normalize_node_names(graph)
-    return _stabilize_graph(graph)
+    """Largest connected component with normalized names in a stable order.
+
+    The result is computed once per graph and shared by every caller
+    (e.g. community detection and graph embedding), it is recomputed
+    only if the nodes, edges or edge weights of the graph change. The
+    returned graph is frozen as it is shared.
+    """
+    fingerprint = graph_fingerprint(graph)
+    cached = _LCC_CACHE.get(graph)
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+
+    # graspologic returns a copy of the component, the graph is left as is
+    lcc = cast(nx.Graph, largest_connected_component(graph))
+    lcc = nx.freeze(_stabilize_graph(normalize_node_names(lcc)))
+    _LCC_CACHE[graph] = (fingerprint, lcc)
+    return lcc
+
+
+def csr_to_stable_graph(graph: CSRGraph, *, use_lcc: bool) -> nx.Graph:
+    """Stable networkx graph of a CSR graph or of its largest connected component."""
+    if use_lcc:
+        graph = graph.largest_connected_component()
+    return _stabilize_graph(graph.to_networkx())
+
+
+def stable_csr_graph(graph: nx.Graph | CSRGraph, *, use_lcc: bool) -> CSRGraph:
+    """CSR graph (or its largest connected component) with nodes sorted by name.
+
+    A networkx graph goes through `stable_largest_connected_component`
+    so its names are normalized the same way as for the other stages.
+    """
+    if isinstance(graph, CSRGraph):
+        if use_lcc:
+            graph = graph.largest_connected_component()
+        return graph.reordered(np.argsort(graph.node_names, kind="stable"))
+
+    graph = (
+        stable_largest_connected_component(graph)
+        if use_lcc
+        else _stabilize_graph(graph)
+    )
+    return CSRGraph.from_networkx(graph)
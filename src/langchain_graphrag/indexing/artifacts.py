@@ -1,10 +1,15 @@
 from typing import NamedTuple
 
 import networkx as nx
+import numpy as np
 import pandas as pd
 import tableprint
 
+from langchain_graphrag.indexing.artifacts_generation.graph_embeddings import (
+    LazyGraphEmbeddings,
+)
 from langchain_graphrag.types.graphs.community import CommunityDetectionResult
+from langchain_graphrag.types.graphs.embedding import EmbeddingMatrix
 
 
 class IndexerArtifacts(NamedTuple):
@@ -15,6 +20,20 @@ class IndexerArtifacts(NamedTuple):
     merged_graph: nx.Graph | None = None
     summarized_graph: nx.Graph | None = None
     communities: CommunityDetectionResult | None = None
+    graph_embeddings: EmbeddingMatrix | LazyGraphEmbeddings | None = None
+
+    def get_graph_embeddings(self) -> EmbeddingMatrix | None:
+        """The graph embeddings, computed or loaded now if they are lazy."""
+        if isinstance(self.graph_embeddings, LazyGraphEmbeddings):
+            return self.graph_embeddings.get()
+        return self.graph_embeddings
+
+    def graph_embedding(self, entity_id: str) -> np.ndarray | None:
+        """Graph embedding of an entity, None if it has none."""
+        graph_embeddings = self.get_graph_embeddings()
+        if graph_embeddings is None:
+            return None
+        return graph_embeddings.get(entity_id)
 
     def _entity_info(self, top_k: int) -> None:
         tableprint.banner("Entities")
@@ -1,13 +1,24 @@
 """Artifacts generation module for indexing."""
 
 from .entities import EntitiesArtifactsGenerator
+from .graph_embeddings import LazyGraphEmbeddings, save_graph_embeddings
 from .relationships import RelationshipsArtifactsGenerator
 from .reports import CommunitiesReportsArtifactsGenerator
 from .text_units import TextUnitsArtifactsGenerator
+from .vector_store_writer import (
+    EmbeddingBatchMetrics,
+    UpsertResult,
+    VectorStoreWriter,
+)
 
 __all__ = [
     "EntitiesArtifactsGenerator",
     "RelationshipsArtifactsGenerator",
     "TextUnitsArtifactsGenerator",
     "CommunitiesReportsArtifactsGenerator",
+    "LazyGraphEmbeddings",
+    "save_graph_embeddings",
+    "VectorStoreWriter",
+    "EmbeddingBatchMetrics",
+    "UpsertResult",
 ]
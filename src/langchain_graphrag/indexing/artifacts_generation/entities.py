@@ -1,69 +1,88 @@
 import networkx as nx
-import numpy as np
 import pandas as pd
 from langchain_core.vectorstores import VectorStore
 
+from langchain_graphrag.indexing.artifacts_generation.vector_store_writer import (
+    VectorStoreWriter,
+    as_writer,
+)
 from langchain_graphrag.types.graphs.community import (
     CommunityDetectionResult,
     CommunityId,
 )
-from langchain_graphrag.types.graphs.embedding import GraphEmbeddingGenerator
+from langchain_graphrag.types.graphs.embedding import (
+    EmbeddingMatrix,
+    GraphEmbeddingGenerator,
+)
 
 
 def _make_entity_to_communities_map(
     detection_result: CommunityDetectionResult,
 ) -> dict[str, list[CommunityId]]:
-    entity_to_communities: dict[str, list[CommunityId]] = {}
-    for level in detection_result.communities:
-        communities = detection_result.communities_at_level(level)
-        for c in communities:
-            for node in c.nodes:
-                entity_to_communities.setdefault(node.name, []).append(c.id)
-    return entity_to_communities
+    return detection_result.node_communities()
 
 
 class EntitiesArtifactsGenerator:
     def __init__(
         self,
-        entities_vector_store: VectorStore,
+        entities_vector_store: VectorStore | VectorStoreWriter,
         graph_embedding_generator: GraphEmbeddingGenerator | None = None,
+        *,
+        quantize_graph_embeddings: bool = False,
     ):
+        """Makes the entities table and puts the entities in a vector store.
+
+        Args:
+            entities_vector_store (VectorStore | VectorStoreWriter): Store of the
+                embeddings of the names and descriptions of the entities, upserted
+                in batches by a `VectorStoreWriter`. Give it a writer with content
+                hashes to only embed new or changed entities on a re-index, with
+                the ids of a `GraphsMerger` using `IdScheme.content`.
+            graph_embedding_generator (GraphEmbeddingGenerator, optional): Embeds the
+                nodes of the graph, see `generate_graph_embeddings`. Defaults to None.
+            quantize_graph_embeddings (bool, optional): Keep the graph embeddings as
+                int8 instead of float32. Defaults to False.
+        """
         self._graph_embedding_generator = graph_embedding_generator
-        self._entities_vector_store = entities_vector_store
+        self._entities_writer = as_writer(entities_vector_store)
+        self._quantize_graph_embeddings = quantize_graph_embeddings
 
     def _unpack_nodes(
         self,
         graph: nx.Graph,
         entity_to_commnunities_map: dict[str, list[CommunityId]],
-        graph_embeddings: dict[str, np.ndarray] | None,
     ) -> pd.DataFrame:
         records = [
             {
                 "title": label,
                 **(node_data or {}),
                 "communities": entity_to_commnunities_map.get(label),
-                "graph_embedding": graph_embeddings.get(label)
-                if graph_embeddings
-                else None,
             }
             for label, node_data in graph.nodes(data=True)
         ]
         return pd.DataFrame.from_records(records)
 
+    def generate_graph_embeddings(self, graph: nx.Graph) -> EmbeddingMatrix | None:
+        """Graph embeddings of the entities, rows indexed by entity id.
+
+        Returns:
+            None if there is no graph embedding generator.
+        """
+        if self._graph_embedding_generator is None:
+            return None
+
+        embeddings = EmbeddingMatrix.from_embeddings(
+            self._graph_embedding_generator.run(graph),
+            ids=dict(graph.nodes(data="id")),
+        )
+        return embeddings.quantized() if self._quantize_graph_embeddings else embeddings
+
     def run(
         self,
         detection_result: CommunityDetectionResult,
         graph: nx.Graph,
     ) -> pd.DataFrame:
-        # Step 1 (Optional)
-        # Generate graph embeddings
-        graph_embeddings = (
-            self._graph_embedding_generator.run(graph)
-            if self._graph_embedding_generator
-            else None
-        )
-
-        # Step 2
+        # Step 1
         # Extract the information to embed from the graph
         # and put in the vectorstore
         texts_to_embed = []
@@ -90,18 +109,15 @@ class EntitiesArtifactsGenerator:
                 )
             )
 
-        self._entities_vector_store.add_texts(
+        self._entities_writer.upsert(
             texts_to_embed,
-            metadatas=texts_metadata,
-            ids=texts_ids,
+            texts_metadata,
+            texts_ids,
+            desc="Generating entity embeddings ...",
         )
 
         entity_to_commnunities_map = _make_entity_to_communities_map(detection_result)
 
-        # Step 3
+        # Step 2
         # Make a dataframe
-        return self._unpack_nodes(
-            graph,
-            entity_to_commnunities_map,
-            graph_embeddings,
-        )
+        return self._unpack_nodes(graph, entity_to_commnunities_map)
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from langchain_graphrag.indexing._graph_utils import graph_fingerprint
+from langchain_graphrag.types.graphs.embedding import EmbeddingMatrix
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+    import networkx as nx
+
+_FINGERPRINT_FILE = "graph_fingerprint.txt"
+
+
+def save_graph_embeddings(
+    embeddings: EmbeddingMatrix,
+    directory: Path,
+    *,
+    graph: nx.Graph | None = None,
+) -> None:
+    """Save graph embeddings, replacing the ones saved there before.
+
+    Args:
+        embeddings (EmbeddingMatrix): The embeddings.
+        directory (Path): Where to save them.
+        graph (nx.Graph, optional): The graph they are the embeddings of. Its
+            fingerprint is saved with them so that they are not mistaken for
+            the embeddings of another graph. Defaults to None.
+    """
+    embeddings.save(directory)
+    fingerprint_file = directory / _FINGERPRINT_FILE
+    if graph is None:
+        fingerprint_file.unlink(missing_ok=True)
+    else:
+        fingerprint_file.write_text(graph_fingerprint(graph))
+
+
+def _is_saved_for(directory: Path, graph: nx.Graph | None) -> bool:
+    if not directory.exists():
+        return False
+    if graph is None:
+        return True
+    fingerprint_file = directory / _FINGERPRINT_FILE
+    return (
+        fingerprint_file.exists()
+        and fingerprint_file.read_text() == graph_fingerprint(graph)
+    )
+
+
+class LazyGraphEmbeddings:
+    def __init__(
+        self,
+        compute: Callable[[], EmbeddingMatrix | None] | None = None,
+        *,
+        cache_dir: Path | None = None,
+        graph: nx.Graph | None = None,
+    ):
+        """Graph embeddings computed the first time they are asked for.
+
+        Graph embeddings are not needed to answer queries, so indexing
+        only sets this stage up and the cost is paid by the first
+        consumer, if any.
+
+        Args:
+            compute (Callable[[], EmbeddingMatrix | None], optional): Computes the
+                embeddings. If None, they can only be loaded from `cache_dir`.
+                Defaults to None.
+            cache_dir (Path, optional): Where the embeddings are saved once computed
+                and loaded from if they are already there. Defaults to None.
+            graph (nx.Graph, optional): The graph the embeddings are of. Embeddings
+                in `cache_dir` are only loaded if they were saved for a graph
+                with the same fingerprint, otherwise they are computed again
+                and replaced. If None, whatever is in `cache_dir` is loaded.
+                Defaults to None.
+        """
+        self._compute = compute
+        self._cache_dir = cache_dir
+        self._graph = graph
+        self._embeddings: EmbeddingMatrix | None = None
+        self._is_computed = False
+
+    @property
+    def is_computed(self) -> bool:
+        return self._is_computed
+
+    def get(self) -> EmbeddingMatrix | None:
+        """The embeddings, loaded or computed on the first call."""
+        if self._is_computed:
+            return self._embeddings
+
+        if self._cache_dir is not None and _is_saved_for(self._cache_dir, self._graph):
+            self._embeddings = EmbeddingMatrix.load(self._cache_dir)
+        elif self._compute is not None:
+            self._embeddings = self._compute()
+            if self._embeddings is not None and self._cache_dir is not None:
+                save_graph_embeddings(
+                    self._embeddings, self._cache_dir, graph=self._graph
+                )
+
+        self._is_computed = True
+        return self._embeddings
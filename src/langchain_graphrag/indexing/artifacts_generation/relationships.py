@@ -2,13 +2,22 @@ import networkx as nx
 import pandas as pd
 from langchain_core.vectorstores import VectorStore
 
+from langchain_graphrag.indexing.artifacts_generation.vector_store_writer import (
+    VectorStoreWriter,
+    as_writer,
+)
+
 
 class RelationshipsArtifactsGenerator:
     def __init__(
         self,
-        relationships_vector_store: VectorStore | None = None,
+        relationships_vector_store: VectorStore | VectorStoreWriter | None = None,
     ):
-        self._relationships_vector_store = relationships_vector_store
+        self._relationships_writer = (
+            as_writer(relationships_vector_store)
+            if relationships_vector_store is not None
+            else None
+        )
 
     def _unpack_edges(self, graph: nx.Graph) -> pd.DataFrame:
         records = [
@@ -51,16 +60,17 @@ class RelationshipsArtifactsGenerator:
                 )
             )
 
-        assert self._relationships_vector_store is not None
+        assert self._relationships_writer is not None
 
-        self._relationships_vector_store.add_texts(
+        self._relationships_writer.upsert(
             texts_to_embed,
-            metadatas=texts_metadata,
-            ids=texts_ids,
+            texts_metadata,
+            texts_ids,
+            desc="Generating relationship embeddings ...",
         )
 
     def run(self, graph: nx.Graph) -> pd.DataFrame:
-        if self._relationships_vector_store:
+        if self._relationships_writer:
             self._embed_relationships(graph)
 
         return self._unpack_edges(graph)
@@ -1,39 +1,56 @@
-from typing import cast
+import itertools
 
+import numpy as np
 import pandas as pd
 from langchain_core.vectorstores import VectorStore
-from pandas._typing import Suffixes
-from tqdm import tqdm
 
-
-def _array_agg_distinct(series: pd.Series) -> list[pd.Series]:
-    return list(series.unique())
-
-
-def _make_temporary_frame(
-    entities_or_relationships: pd.DataFrame,
-    rename_id_to: str,
-) -> pd.DataFrame:
-    # select only id & text_unit_ids columns
-    tmp = entities_or_relationships[["id", "text_unit_ids"]]
-
-    # flatten the text_unit_ids
-    tmp = tmp.explode("text_unit_ids")
-
-    # group by text_unit_ids
-    grouped = tmp.groupby("text_unit_ids", sort=False)
-
-    aggregations = {"id": _array_agg_distinct}
-
-    output = cast(pd.DataFrame, grouped.agg(aggregations))
-    output.rename(columns={"id": rename_id_to}, inplace=True)
-
-    return output.reset_index()
+from langchain_graphrag.indexing.artifacts_generation.vector_store_writer import (
+    VectorStoreWriter,
+    as_writer,
+)
+
+
+def _text_unit_index(entities_or_relationships: pd.DataFrame) -> pd.Series:
+    """Distinct ids of the entities (or relationships) of every text unit.
+
+    The ids of a text unit are in the order the entities are listed,
+    the text units are in the order they are first referenced.
+    """
+    # entities (or relationships) without text units, e.g. NaN after a
+    # merge, have no references
+    lists = [
+        text_unit_ids if isinstance(text_unit_ids, list | np.ndarray) else []
+        for text_unit_ids in entities_or_relationships["text_unit_ids"].tolist()
+    ]
+    lengths = np.fromiter(map(len, lists), dtype=np.int64, count=len(lists))
+
+    # one (text unit, id) pair per reference, as integer codes so that
+    # the duplicates are dropped and the pairs grouped by a single sort
+    # instead of hashing or comparing strings again
+    text_unit_codes, text_unit_ids = pd.factorize(
+        np.array(list(itertools.chain.from_iterable(lists)), dtype=object)
+    )
+    id_codes, ids = pd.factorize(entities_or_relationships["id"])
+    num_ids = max(len(ids), 1)
+    pairs = text_unit_codes.astype(np.int64) * num_ids + np.repeat(id_codes, lengths)
+
+    # text unit codes are in the order the text units are first referenced
+    # and id codes in the order the ids are listed, so the sorted distinct
+    # pairs are already grouped and ordered
+    pairs = np.unique(pairs)
+    text_unit_codes, id_codes = np.divmod(pairs, num_ids)
+    boundaries = np.flatnonzero(np.diff(text_unit_codes)) + 1
+    groups = np.split(np.asarray(ids, dtype=object)[id_codes], boundaries)
+    return pd.Series(
+        [group.tolist() for group in groups] if len(pairs) else [],
+        index=pd.Index(text_unit_ids, dtype=object),
+        dtype=object,
+    )
 
 
 class TextUnitsArtifactsGenerator:
-    def __init__(self, vector_store: VectorStore | None = None):
-        self._vector_store = vector_store
+    def __init__(self, vector_store: VectorStore | VectorStoreWriter | None = None):
+        self._writer = as_writer(vector_store) if vector_store is not None else None
 
     def run(
         self,
@@ -41,72 +58,40 @@ class TextUnitsArtifactsGenerator:
         entities: pd.DataFrame,
         relationships: pd.DataFrame,
     ) -> pd.DataFrame:
-        entities_df = _make_temporary_frame(
-            entities,
-            rename_id_to="entity_ids",
-        )
-        entities_df.rename(columns={"text_unit_ids": "id"}, inplace=True)
-
-        relationships_df = _make_temporary_frame(
-            relationships,
-            rename_id_to="relationship_ids",
+        # a single join attaches both indexes, text units that are not
+        # referenced get NaN as with a left merge
+        index = pd.concat(
+            [
+                _text_unit_index(entities).rename("entity_ids"),
+                _text_unit_index(relationships).rename("relationship_ids"),
+            ],
+            axis=1,
         )
-        relationships_df.rename(columns={"text_unit_ids": "id"}, inplace=True)
-
-        text_units_entities = base_text_units.merge(
-            entities_df,
-            left_on="id",
-            right_on="id",
-            how="left",
-            suffixes=cast(Suffixes, ["_1", "_2"]),
-            indicator=True,
-        )
-
-        text_units_entities = base_text_units.merge(
-            entities_df,
-            left_on="id",
-            right_on="id",
-            how="left",
-            suffixes=cast(Suffixes, ["_1", "_2"]),
-            indicator=True,
-        ).drop("_merge", axis=1)
-
-        text_units = text_units_entities.merge(
-            relationships_df,
-            left_on="id",
-            right_on="id",
-            how="left",
-            suffixes=cast(Suffixes, ["_1", "_2"]),
-            indicator=True,
-        ).drop("_merge", axis=1)
-
-        def _run_embedder(series: pd.Series) -> None:
-            chunk_to_embedd = series["text_unit"]
-            chunk_id = series["id"]
+        if base_text_units["id"].dtype != object:
+            # e.g. the float64 ids of a frame without text units
+            base_text_units = base_text_units.astype({"id": object})
+        text_units = base_text_units.join(index, on="id")
 
+        if self._writer:
             # Bug in langchain vectorstore retrival that
             # does not populate Document.id field.
             #
-            # Hence add relationship_id as an additional field
+            # Hence add text_unit_id as an additional field
             # in the metadata
-            chunk_metadata = dict(
-                document_id=series["document_id"],
-                text_unit_id=chunk_id,  # TODO: Remove once langchain is fixed
-            )
-
-            assert self._vector_store is not None
-
-            self._vector_store.add_texts(
-                [chunk_to_embedd],
-                metadata=[chunk_metadata],
-                ids=[chunk_id],
-            )
-
-        if self._vector_store:
-            tqdm.pandas(desc="Generating chunk embedding ...")
-            text_units.progress_apply(
-                _run_embedder,
-                axis=1,
+            self._writer.upsert(
+                text_units["text_unit"].tolist(),
+                [
+                    dict(
+                        document_id=document_id,
+                        # TODO: Remove once langchain is fixed
+                        text_unit_id=text_unit_id,
+                    )
+                    for document_id, text_unit_id in zip(
+                        text_units["document_id"], text_units["id"], strict=True
+                    )
+                ],
+                text_units["id"].tolist(),
+                desc="Generating chunk embedding ...",
             )
 
         return text_units
@@ -0,0 +1,292 @@
+"""Bulk writes of texts to a vector store in concurrent batches."""
+
+import logging
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, NamedTuple
+
+from langchain_core.vectorstores import VectorStore
+from tqdm import tqdm
+
+from langchain_graphrag.utils.content_hash_index import ContentHashIndex
+from langchain_graphrag.utils.disk_cache import make_cache_key
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class EmbeddingBatchMetrics(NamedTuple):
+    """Metrics of a batch written to the vector store.
+
+    Attributes:
+        batch: Index of the batch.
+        size: Number of texts of the batch.
+        attempts: Number of attempts it took, 1 if it did not fail.
+        seconds: Time of the successful attempt.
+    """
+
+    batch: int
+    size: int
+    attempts: int
+    seconds: float
+
+    @property
+    def texts_per_second(self) -> float:
+        return self.size / self.seconds if self.seconds > 0 else float("inf")
+
+
+class UpsertResult(NamedTuple):
+    """Outcome of an upsert.
+
+    Attributes:
+        written: Number of new or changed texts that were embedded.
+        unchanged: Number of texts skipped because their content did not change.
+        deleted: Number of ids deleted because they were not upserted.
+        metrics: Metrics of the batches that were written.
+    """
+
+    written: int
+    unchanged: int
+    deleted: int
+    metrics: list[EmbeddingBatchMetrics]
+
+
+class VectorStoreWriter:
+    def __init__(
+        self,
+        vector_store: VectorStore,
+        *,
+        batch_size: int = 256,
+        max_concurrency: int = 4,
+        max_attempts: int = 3,
+        retry_wait: float = 1.0,
+        content_hashes: ContentHashIndex | None = None,
+    ):
+        """Adds texts to a vector store in batches, several batches at a time.
+
+        Every batch is one `add_texts` call, i.e. one embedding request for
+        most embedding models. A failed batch is retried on its own with
+        an exponential backoff, the other batches are not affected.
+
+        Args:
+            vector_store (VectorStore): The vector store.
+            batch_size (int, optional): Number of texts per batch. Defaults to 256.
+            max_concurrency (int, optional): Number of batches written at the same
+                time. Defaults to 4.
+            max_attempts (int, optional): Number of attempts of a batch before giving
+                up. Defaults to 3.
+            retry_wait (float, optional): Seconds before the first retry, doubled for
+                every following one. Defaults to 1.0.
+            content_hashes (ContentHashIndex, optional): Hashes of the content already
+                in the vector store, used by `upsert` to skip unchanged texts and
+                to delete the ids that are gone. If None, `upsert` writes
+                everything. Defaults to None.
+        """
+        self._vector_store = vector_store
+        self._batch_size = batch_size
+        self._max_concurrency = max_concurrency
+        self._max_attempts = max_attempts
+        self._retry_wait = retry_wait
+        self._content_hashes = content_hashes
+
+    @property
+    def vector_store(self) -> VectorStore:
+        return self._vector_store
+
+    def _write_batch(
+        self,
+        batch: int,
+        texts: Sequence[str],
+        metadatas: Sequence[dict[str, Any]],
+        ids: Sequence[str],
+    ) -> EmbeddingBatchMetrics:
+        attempt = 1
+        while True:
+            start = time.perf_counter()
+            try:
+                self._vector_store.add_texts(
+                    list(texts), metadatas=list(metadatas), ids=list(ids)
+                )
+            except Exception:
+                if attempt >= self._max_attempts:
+                    raise
+                _LOGGER.warning(
+                    f"Writing batch {batch} failed (attempt {attempt}), retrying",
+                    exc_info=True,
+                )
+                time.sleep(self._retry_wait * 2 ** (attempt - 1))
+                attempt += 1
+                continue
+            return EmbeddingBatchMetrics(
+                batch=batch,
+                size=len(texts),
+                attempts=attempt,
+                seconds=time.perf_counter() - start,
+            )
+
+    def write(
+        self,
+        texts: Sequence[str],
+        metadatas: Sequence[dict[str, Any]],
+        ids: Sequence[str],
+        *,
+        desc: str = "Writing embeddings ...",
+    ) -> list[EmbeddingBatchMetrics]:
+        """Add the texts to the vector store.
+
+        Args:
+            texts (Sequence[str]): The texts to embed.
+            metadatas (Sequence[dict[str, Any]]): Metadata of every text.
+            ids (Sequence[str]): Id of every text.
+            desc (str, optional): Description of the progress bar.
+
+        Returns:
+            The metrics of every batch, in the order of the batches.
+
+        Raises:
+            The error of the first batch that failed every attempt, once all
+            the other batches are written.
+        """
+        return self._write(texts, metadatas, ids, desc=desc)
+
+    def upsert(
+        self,
+        texts: Sequence[str],
+        metadatas: Sequence[dict[str, Any]],
+        ids: Sequence[str],
+        *,
+        desc: str = "Writing embeddings ...",
+    ) -> UpsertResult:
+        """Make the vector store hold exactly these texts.
+
+        Only the texts whose content (text and metadata) changed since they
+        were last written under the same id are embedded, and the ids
+        written before but missing from `ids` are deleted. A changed text
+        is deleted before it is written again, for the vector stores where
+        `add_texts` does not replace an existing id. The content hashes are
+        saved even if some batches fail, so a retry only writes what is
+        missing.
+
+        The ids must be the same from one run to the next, see
+        `IdScheme.content` for the ids of the entities and relationships.
+
+        Args:
+            texts (Sequence[str]): All the texts the vector store should hold.
+            metadatas (Sequence[dict[str, Any]]): Metadata of every text.
+            ids (Sequence[str]): Id of every text.
+            desc (str, optional): Description of the progress bar.
+        """
+        index = self._content_hashes
+        if index is None:
+            metrics = self._write(texts, metadatas, ids, desc=desc)
+            return UpsertResult(len(texts), 0, 0, metrics)
+
+        hashes = [
+            make_cache_key(text, metadata)
+            for text, metadata in zip(texts, metadatas, strict=True)
+        ]
+        changed = [
+            position
+            for position, (text_id, content_hash) in enumerate(
+                zip(ids, hashes, strict=True)
+            )
+            if index.get(text_id) != content_hash
+        ]
+        removed = sorted(index.ids() - set(ids))
+
+        changed_ids = [ids[p] for p in changed]
+        stale = [text_id for text_id in changed_ids if index.get(text_id) is not None]
+
+        if removed or stale:
+            self._vector_store.delete(ids=removed + stale)
+            index.remove(removed + stale)
+
+        def _record(batch_metrics: EmbeddingBatchMetrics) -> None:
+            start = batch_metrics.batch * self._batch_size
+            index.update(
+                {ids[p]: hashes[p] for p in changed[start : start + batch_metrics.size]}
+            )
+
+        try:
+            metrics = self._write(
+                [texts[p] for p in changed],
+                [metadatas[p] for p in changed],
+                changed_ids,
+                desc=desc,
+                on_batch_written=_record,
+            )
+        finally:
+            index.save()
+
+        _LOGGER.info(
+            f"Upserted {len(changed)} texts, {len(texts) - len(changed)} unchanged, "
+            f"{len(removed)} deleted"
+        )
+        return UpsertResult(
+            written=len(changed),
+            unchanged=len(texts) - len(changed),
+            deleted=len(removed),
+            metrics=metrics,
+        )
+
+    def _write(
+        self,
+        texts: Sequence[str],
+        metadatas: Sequence[dict[str, Any]],
+        ids: Sequence[str],
+        *,
+        desc: str,
+        on_batch_written: Callable[[EmbeddingBatchMetrics], None] | None = None,
+    ) -> list[EmbeddingBatchMetrics]:
+        starts = range(0, len(texts), self._batch_size)
+        metrics: list[EmbeddingBatchMetrics] = []
+        errors: list[BaseException] = []
+
+        start = time.perf_counter()
+        with (
+            ThreadPoolExecutor(max_workers=self._max_concurrency) as executor,
+            tqdm(total=len(texts), desc=desc) as pbar,
+        ):
+            futures = [
+                executor.submit(
+                    self._write_batch,
+                    batch,
+                    texts[s : s + self._batch_size],
+                    metadatas[s : s + self._batch_size],
+                    ids[s : s + self._batch_size],
+                )
+                for batch, s in enumerate(starts)
+            ]
+            for future in as_completed(futures):
+                error = future.exception()
+                if error is not None:
+                    errors.append(error)
+                    continue
+                batch_metrics = future.result()
+                metrics.append(batch_metrics)
+                if on_batch_written is not None:
+                    on_batch_written(batch_metrics)
+                pbar.update(batch_metrics.size)
+                pbar.set_postfix(texts_per_second=batch_metrics.texts_per_second)
+                _LOGGER.debug(
+                    f"Batch {batch_metrics.batch}: {batch_metrics.size} texts "
+                    f"in {batch_metrics.seconds:.2f}s "
+                    f"({batch_metrics.texts_per_second:.1f} texts/s, "
+                    f"{batch_metrics.attempts} attempts)"
+                )
+
+        elapsed = time.perf_counter() - start
+        _LOGGER.info(
+            f"Wrote {sum(m.size for m in metrics)} texts in {len(metrics)} batches "
+            f"in {elapsed:.2f}s"
+        )
+        if errors:
+            raise errors[0]
+        return sorted(metrics)
+
+
+def as_writer(vector_store: VectorStore | VectorStoreWriter) -> VectorStoreWriter:
+    """A writer with the default settings for a bare vector store."""
+    if isinstance(vector_store, VectorStoreWriter):
+        return vector_store
+    return VectorStoreWriter(vector_store)
@@ -1,7 +1,15 @@
 """Embedding generation module for indexing."""
 
-from .graph import Node2VectorGraphEmbeddingGenerator
+from .graph import (
+    FastRPGraphEmbeddingGenerator,
+    IncrementalGraphEmbeddingGenerator,
+    Node2VectorGraphEmbeddingGenerator,
+    SpectralGraphEmbeddingGenerator,
+)
 
 __all__ = [
+    "FastRPGraphEmbeddingGenerator",
+    "IncrementalGraphEmbeddingGenerator",
     "Node2VectorGraphEmbeddingGenerator",
+    "SpectralGraphEmbeddingGenerator",
 ]
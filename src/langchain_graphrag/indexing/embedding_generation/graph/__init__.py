@@ -1,7 +1,13 @@
 """Graph Embedding generation module for indexing."""
 
+from .fastrp import FastRPGraphEmbeddingGenerator
+from .incremental import IncrementalGraphEmbeddingGenerator
 from .node2vec import Node2VectorGraphEmbeddingGenerator
+from .spectral import SpectralGraphEmbeddingGenerator
 
 __all__ = [
+    "FastRPGraphEmbeddingGenerator",
+    "IncrementalGraphEmbeddingGenerator",
     "Node2VectorGraphEmbeddingGenerator",
+    "SpectralGraphEmbeddingGenerator",
 ]
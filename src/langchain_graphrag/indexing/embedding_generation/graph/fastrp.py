@@ -0,0 +1,84 @@
+"""Graph embedding generation using fast random projection (FastRP)."""
+
+from collections.abc import Sequence
+
+import networkx as nx
+import numpy as np
+from scipy.sparse import diags_array
+
+from langchain_graphrag.indexing._graph_utils import stable_csr_graph
+from langchain_graphrag.types.graphs.embedding import GraphEmbeddingGenerator
+from langchain_graphrag.utils.csr_graph import CSRGraph
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+class FastRPGraphEmbeddingGenerator(GraphEmbeddingGenerator):
+    def __init__(
+        self,
+        *,
+        use_lcc: bool = True,
+        dimensions: int = 1536,
+        iteration_weights: Sequence[float] = (0.0, 1.0, 1.0, 1.0),
+        normalization_strength: float = 0.0,
+        random_seed: int = 86,
+    ):
+        """Embeds the nodes with fast random projection (FastRP).
+
+        A sparse random projection of the nodes is propagated along the
+        weighted edges, the embedding of a node is the weighted sum of
+        its propagated projections after 1, 2, ... hops. It only takes
+        a few sparse matrix products, no walks and no training.
+
+        Args:
+            use_lcc (bool, optional): Only embed the largest connected component.
+                Defaults to True.
+            dimensions (int, optional): Size of the embeddings. Defaults to 1536.
+            iteration_weights (Sequence[float], optional): Weight of the projection
+                after every hop, there are as many hops as weights.
+                Defaults to (0.0, 1.0, 1.0, 1.0).
+            normalization_strength (float, optional): The projection of a node is scaled
+                by its degree to this power, a negative value lowers the influence
+                of the hubs. Defaults to 0.0.
+            random_seed (int, optional): Seed of the random projection. Defaults to 86.
+        """
+        self._use_lcc = use_lcc
+        self._dimensions = dimensions
+        self._iteration_weights = list(iteration_weights)
+        self._normalization_strength = normalization_strength
+        self._random_seed = random_seed
+
+    def _random_projection(self, num_nodes: int) -> np.ndarray:
+        # very sparse random projection (Achlioptas), entries are
+        # +-sqrt(3) with probability 1/6 each and 0 otherwise
+        rng = np.random.default_rng(self._random_seed)
+        entries = rng.choice(
+            np.array([np.sqrt(3), 0.0, -np.sqrt(3)], dtype=np.float32),
+            size=(num_nodes, self._dimensions),
+            p=[1 / 6, 2 / 3, 1 / 6],
+        )
+        return entries.astype(np.float32, copy=False)
+
+    def run(self, graph: nx.Graph | CSRGraph) -> dict[str, np.ndarray]:
+        csr_graph = stable_csr_graph(graph, use_lcc=self._use_lcc)
+        adjacency = csr_graph.adjacency()
+
+        degrees = np.asarray(adjacency.sum(axis=1)).ravel()
+        safe_degrees = np.where(degrees == 0, 1, degrees).astype(np.float32)
+        transition = diags_array(1 / safe_degrees) @ adjacency
+
+        projection = self._random_projection(csr_graph.num_nodes)
+        if self._normalization_strength != 0:
+            projection *= (safe_degrees**self._normalization_strength)[:, None]
+
+        embeddings = np.zeros((csr_graph.num_nodes, self._dimensions), np.float32)
+        for weight in self._iteration_weights:
+            projection = transition @ projection
+            if weight != 0:
+                embeddings += weight * _normalize_rows(projection)
+
+        # nodes are sorted by name
+        return dict(zip(csr_graph.node_names.tolist(), embeddings, strict=True))
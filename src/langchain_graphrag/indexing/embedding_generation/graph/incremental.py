@@ -0,0 +1,135 @@
+"""Incremental graph embeddings, for the nodes added to an embedded graph."""
+
+from collections.abc import Iterable, Mapping
+
+import networkx as nx
+import numpy as np
+from scipy.sparse import diags_array
+
+from langchain_graphrag.types.graphs.embedding import (
+    GraphEmbeddingGenerator,
+    GraphEmbeddingUpdate,
+)
+from langchain_graphrag.utils.csr_graph import CSRGraph
+
+
+class IncrementalGraphEmbeddingGenerator(GraphEmbeddingGenerator):
+    def __init__(
+        self,
+        generator: GraphEmbeddingGenerator,
+        *,
+        num_iterations: int = 10,
+        max_drift: float = 0.2,
+    ):
+        """Embeds new nodes from the embeddings of their neighbours.
+
+        `run` embeds the whole graph with `generator`. `update` only embeds
+        the new or changed nodes of a subgraph: their embeddings are
+        propagated from the neighbours that are already embedded, which
+        stay as they are, by repeatedly averaging the embeddings of the
+        neighbours weighted by the edge weights.
+
+        Args:
+            generator (GraphEmbeddingGenerator): Embeds the whole graph.
+            num_iterations (int, optional): Number of propagation steps, nodes
+                farther than this from an embedded node get no embedding.
+                Defaults to 10.
+            max_drift (float, optional): A full rebuild is due when more than this
+                share of the embeddings were propagated. Defaults to 0.2.
+        """
+        self._generator = generator
+        self._num_iterations = num_iterations
+        self._max_drift = max_drift
+
+    def run(self, graph: nx.Graph) -> dict[str, np.ndarray]:
+        return self._generator.run(graph)
+
+    def update(
+        self,
+        previous: Mapping[str, np.ndarray] | GraphEmbeddingUpdate,
+        changed_subgraph: nx.Graph,
+        *,
+        changed_nodes: Iterable[str] = (),
+        removed_nodes: Iterable[str] = (),
+    ) -> GraphEmbeddingUpdate:
+        """Embed the nodes of a subgraph that have no embedding or changed.
+
+        Args:
+            previous (Mapping[str, np.ndarray] | GraphEmbeddingUpdate): The output of
+                `run` or of the previous update.
+            changed_subgraph (nx.Graph): The new and changed nodes with their edges,
+                including the edges to nodes that are already embedded.
+            changed_nodes (Iterable[str], optional): Embedded nodes of the subgraph that
+                must be embedded again. Defaults to ().
+            removed_nodes (Iterable[str], optional): Nodes whose embeddings are
+                dropped. Defaults to ().
+
+        Returns:
+            The updated embeddings and the drift since the last full run.
+        """
+        if isinstance(previous, GraphEmbeddingUpdate):
+            previous_embeddings: Mapping[str, np.ndarray] = previous.embeddings
+            propagated_nodes = previous.propagated_nodes
+        else:
+            previous_embeddings, propagated_nodes = previous, frozenset()
+        if not previous_embeddings:
+            raise ValueError("an update needs the embeddings of a full run")
+
+        updated = self._propagate(
+            previous_embeddings, changed_subgraph, set(changed_nodes)
+        )
+
+        removed = set(removed_nodes)
+        embeddings = {
+            name: embedding
+            for name, embedding in sorted({**previous_embeddings, **updated}.items())
+            if name not in removed
+        }
+        propagated_nodes = frozenset(
+            name for name in propagated_nodes | updated.keys() if name in embeddings
+        )
+        drift = len(propagated_nodes) / len(embeddings) if embeddings else 0.0
+        return GraphEmbeddingUpdate(
+            embeddings=embeddings,
+            updated_nodes=sorted(updated),
+            propagated_nodes=propagated_nodes,
+            drift=drift,
+            needs_full_rebuild=drift > self._max_drift,
+        )
+
+    def _propagate(
+        self,
+        previous: Mapping[str, np.ndarray],
+        subgraph: nx.Graph,
+        changed_nodes: set[str],
+    ) -> dict[str, np.ndarray]:
+        csr_graph = CSRGraph.from_networkx(subgraph)
+        names = csr_graph.node_names.tolist()
+        targets = np.array(
+            [name not in previous or name in changed_nodes for name in names],
+            dtype=bool,
+        )
+        anchors = np.flatnonzero(~targets)
+
+        dimensions = len(next(iter(previous.values())))
+        vectors = np.zeros((csr_graph.num_nodes, dimensions), dtype=np.float32)
+        if len(anchors):
+            vectors[anchors] = np.stack([previous[names[i]] for i in anchors])
+        reached = ~targets
+
+        adjacency = csr_graph.adjacency()
+        degrees = np.asarray(adjacency.sum(axis=1)).ravel()
+        transition = diags_array(1 / np.where(degrees == 0, 1, degrees)) @ adjacency
+
+        # anchors keep their embeddings, the targets take the weighted
+        # average of their neighbours that were reached so far
+        for _ in range(self._num_iterations):
+            reached_weight = transition @ reached.astype(np.float32)
+            averages = (transition @ (vectors * reached[:, None])) / np.where(
+                reached_weight == 0, 1, reached_weight
+            )[:, None]
+            vectors[targets] = averages[targets]
+            reached = reached | (reached_weight > 0)
+
+        embedded = np.flatnonzero(targets & reached)
+        return {names[i]: vectors[i] for i in embedded}
@@ -1,11 +1,138 @@
-"""Graph embedding generation using node2vec."""
+"""Graph embedding generation using node2vec.
+
+The random walks are sampled over the CSR adjacency of the graph, one
+step of all the walks of a shard at a time, and streamed into the
+word2vec training of `gensim` shard by shard.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import itertools
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import nullcontext
+from typing import TYPE_CHECKING
 
-import graspologic as gl
 import networkx as nx
 import numpy as np
+from gensim.models import Word2Vec
 
-from langchain_graphrag.indexing._graph_utils import stable_largest_connected_component
+from langchain_graphrag.indexing._graph_utils import stable_csr_graph
 from langchain_graphrag.types.graphs.embedding import GraphEmbeddingGenerator
+from langchain_graphrag.utils.csr_graph import CSRGraph
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+# (start nodes, walk lengths, seed) of a shard of walks
+_WalkJob = tuple[np.ndarray, np.ndarray, tuple[int, int, int]]
+
+
+def _stable_hash(text: str) -> int:
+    # gensim seeds the initial vectors with this hash, the builtin hash
+    # of a string changes with every python process
+    return int.from_bytes(
+        hashlib.blake2b(text.encode(), digest_size=4).digest(), "little"
+    )
+
+
+def _walk_lengths(degrees: np.ndarray, walk_length: int) -> np.ndarray:
+    # shorter walks for low degree nodes, as done by graspologic: 1 below
+    # the 20th percentile of the degrees, interpolated from 20% to 80% of
+    # `walk_length` up to the 80th percentile and `walk_length` above
+    percentiles = np.percentile(degrees, list(range(20, 90, 10)))
+    buckets = np.searchsorted(percentiles, degrees, side="left")
+    lengths = np.where(
+        buckets < len(percentiles),
+        np.floor(np.maximum(1, walk_length * (buckets * 0.1 + 0.2))),
+        walk_length,
+    ).astype(np.int64)
+    return np.where(degrees < percentiles[0], 1, lengths)
+
+
+class _WalkSampler:
+    """Samples weighted random walks over the CSR adjacency of a graph."""
+
+    def __init__(self, graph: CSRGraph):
+        adjacency = graph.adjacency(dtype=np.float64)
+        self._indptr = adjacency.indptr
+        self._indices = adjacency.indices
+        # the neighbours of a node are a slice of the cumulative weights,
+        # a walk step is a binary search for a uniform draw in that slice
+        self._cumulative = np.cumsum(adjacency.data)
+        self._row_starts = np.concatenate(([0.0], self._cumulative))[self._indptr[:-1]]
+
+    def walks(self, job: _WalkJob) -> tuple[np.ndarray, np.ndarray]:
+        starts, lengths, seed = job
+        rng = np.random.default_rng(seed)
+        walks = np.full((len(starts), int(lengths.max(initial=1))), -1, np.int32)
+        walks[:, 0] = starts
+        current = starts.astype(np.int64)
+
+        for step in range(1, walks.shape[1]):
+            walking = np.flatnonzero(lengths > step)
+            if len(walking) == 0:
+                break
+            nodes = current[walking]
+            first, last = self._indptr[nodes], self._indptr[nodes + 1] - 1
+            low = self._row_starts[nodes]
+            targets = low + rng.random(len(walking)) * (self._cumulative[last] - low)
+            slots = np.clip(
+                np.searchsorted(self._cumulative, targets, side="right"), first, last
+            )
+            current[walking] = self._indices[slots]
+            walks[walking, step] = current[walking]
+
+        return walks, lengths
+
+
+# sampler of the worker processes, set once per process
+_WORKER_SAMPLER: _WalkSampler | None = None
+
+
+def _init_worker(sampler: _WalkSampler) -> None:
+    global _WORKER_SAMPLER  # noqa: PLW0603
+    _WORKER_SAMPLER = sampler
+
+
+def _sample_in_worker(job: _WalkJob) -> tuple[np.ndarray, np.ndarray]:
+    assert _WORKER_SAMPLER is not None
+    return _WORKER_SAMPLER.walks(job)
+
+
+class _WalkCorpus:
+    """Restartable corpus of walks, sampled again for every pass of gensim.
+
+    Every shard has its own seed so the walks are the same on every pass
+    and whatever the number of worker processes.
+    """
+
+    def __init__(
+        self,
+        sampler: _WalkSampler,
+        jobs: list[_WalkJob],
+        executor: Executor | None,
+        window_size: int,
+    ):
+        self._sampler = sampler
+        self._jobs = jobs
+        self._executor = executor
+        self._window_size = window_size
+
+    def _shards(self) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        if self._executor is None:
+            yield from map(self._sampler.walks, self._jobs)
+            return
+
+        # a bounded number of shards is sampled ahead of the training
+        jobs = iter(self._jobs)
+        while window := list(itertools.islice(jobs, self._window_size)):
+            yield from self._executor.map(_sample_in_worker, window)
+
+    def __iter__(self) -> Iterator[list[str]]:
+        for walks, lengths in self._shards():
+            for walk, length in zip(walks.tolist(), lengths.tolist(), strict=True):
+                yield [str(node) for node in walk[:length]]
 
 
 class Node2VectorGraphEmbeddingGenerator(GraphEmbeddingGenerator):
@@ -19,7 +146,36 @@ class Node2VectorGraphEmbeddingGenerator(GraphEmbeddingGenerator):
         window_size: int = 2,
         num_iter: int = 3,
         random_seed: int = 86,
+        interpolate_walk_lengths_by_node_degree: bool = True,
+        shard_size: int = 10_000,
+        max_workers: int | None = None,
+        training_workers: int = 8,
     ):
+        """Embeds the nodes with node2vec (weighted walks, p = q = 1).
+
+        Args:
+            use_lcc (bool, optional): Only embed the largest connected component.
+                Defaults to True.
+            dimensions (int, optional): Size of the embeddings. Defaults to 1536.
+            num_walks (int, optional): Number of walks from every node. Defaults to 10.
+            walk_length (int, optional): Maximum number of nodes of a walk.
+                Defaults to 40.
+            window_size (int, optional): Window of word2vec. Defaults to 2.
+            num_iter (int, optional): Number of epochs of word2vec. Defaults to 3.
+            random_seed (int, optional): Seed of the walks and of word2vec.
+                Defaults to 86.
+            interpolate_walk_lengths_by_node_degree (bool, optional): Walks from low
+                degree nodes are shorter, like graspologic does. Defaults to True.
+            shard_size (int, optional): Number of walks sampled together.
+                Defaults to 10_000.
+            max_workers (int, optional): If greater than 1, the shards of walks are
+                sampled in a pool of that many processes. It does not change the
+                walks. Defaults to None.
+            training_workers (int, optional): Number of word2vec threads, 8 like
+                graspologic. With more than 1 the embeddings depend on the thread
+                scheduling, use 1 for embeddings that are the same in every run.
+                Defaults to 8.
+        """
         self._use_lcc = use_lcc
         self._dimensions = dimensions
         self._num_walks = num_walks
@@ -27,28 +183,66 @@ class Node2VectorGraphEmbeddingGenerator(GraphEmbeddingGenerator):
         self._window_size = window_size
         self._num_iter = num_iter
         self._random_seed = random_seed
+        self._interpolate_walk_lengths = interpolate_walk_lengths_by_node_degree
+        self._shard_size = shard_size
+        self._max_workers = max_workers
+        self._training_workers = training_workers
+
+    def _walk_jobs(self, graph: CSRGraph) -> list[_WalkJob]:
+        degrees = graph.degrees()
+        lengths = (
+            _walk_lengths(degrees, self._walk_length)
+            if self._interpolate_walk_lengths
+            else np.full(graph.num_nodes, self._walk_length)
+        )
+        lengths = np.where(degrees == 0, 1, lengths)
+
+        jobs: list[_WalkJob] = []
+        for iteration in range(self._num_walks):
+            rng = np.random.default_rng([self._random_seed, iteration])
+            order = rng.permutation(graph.num_nodes)
+            for shard, start in enumerate(range(0, len(order), self._shard_size)):
+                starts = order[start : start + self._shard_size]
+                jobs.append(
+                    (starts, lengths[starts], (self._random_seed, iteration, shard))
+                )
+        return jobs
 
     def run(
         self,
-        graph: nx.Graph,
+        graph: nx.Graph | CSRGraph,
     ) -> dict[str, np.ndarray]:
-        if self._use_lcc:
-            graph = stable_largest_connected_component(graph)
-
-        lcc_tensors = gl.embed.node2vec_embed(
-            graph=graph,
-            dimensions=self._dimensions,
-            window_size=self._window_size,
-            iterations=self._num_iter,
-            num_walks=self._num_walks,
-            walk_length=self._walk_length,
-            random_seed=self._random_seed,
-        )
+        csr_graph = stable_csr_graph(graph, use_lcc=self._use_lcc)
+        sampler = _WalkSampler(csr_graph)
 
-        embeddings = lcc_tensors[0]
-        nodes = lcc_tensors[1]
+        executor: Executor | None = None
+        if self._max_workers is not None and self._max_workers > 1:
+            executor = ProcessPoolExecutor(
+                max_workers=self._max_workers,
+                initializer=_init_worker,
+                initargs=(sampler,),
+            )
 
-        pairs = zip(nodes, embeddings, strict=True)
-        sorted_pairs = sorted(pairs, key=lambda x: x[0])
+        with executor if executor is not None else nullcontext():
+            corpus = _WalkCorpus(
+                sampler,
+                self._walk_jobs(csr_graph),
+                executor,
+                window_size=2 * (self._max_workers or 1),
+            )
+            model = Word2Vec(
+                corpus,
+                vector_size=self._dimensions,
+                window=self._window_size,
+                min_count=0,
+                sg=1,
+                workers=self._training_workers,
+                epochs=self._num_iter,
+                seed=self._random_seed,
+                hashfxn=_stable_hash,
+            )
 
-        return dict(sorted_pairs)
+        # isolated nodes are left out, as graspologic does. Nodes are
+        # sorted by name.
+        connected = np.flatnonzero(csr_graph.degrees() > 0)
+        return {csr_graph.node_names[node]: model.wv[str(node)] for node in connected}
@@ -1,4 +1,5 @@
-from typing import cast
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
 
 import networkx as nx
 from graspologic.partition import (
@@ -9,13 +10,135 @@ from graspologic.partition import (
 
 from langchain_graphrag.indexing._graph_utils import stable_largest_connected_component
 from langchain_graphrag.types.graphs.community import (
-    Community,
     CommunityDetectionResult,
     CommunityDetector,
     CommunityId,
     CommunityLevel,
-    CommunityNode,
 )
+from langchain_graphrag.utils.csr_graph import CSRGraph
+
+_NO_PARENT = -1
+
+
+def _component_graph(graph: nx.Graph, nodes: set[str]) -> nx.Graph:
+    # a bare and sorted copy, cheap to send to a worker process and
+    # always clustered the same way whatever the order of the graph
+    component = nx.Graph()
+    component.add_nodes_from(sorted(nodes))
+    component.add_weighted_edges_from(
+        sorted(
+            (min(source, target), max(source, target), weight)
+            for source, target, weight in graph.subgraph(nodes).edges(
+                data="weight", default=1.0
+            )
+        )
+    )
+    return component
+
+
+def _cluster_component(
+    job: tuple[nx.Graph, int, int, dict[str, int] | None],
+) -> list[HierarchicalCluster]:
+    component, max_cluster_size, seed, starting_communities = job
+    return list(
+        hierarchical_leiden(
+            component,
+            max_cluster_size=max_cluster_size,
+            random_seed=seed,
+            starting_communities=starting_communities,
+        )
+    )
+
+
+def _starting_communities(
+    previous: CommunityDetectionResult | None,
+    nodes: Iterable[str],
+) -> dict[str, int] | None:
+    # the top level communities of the previous run, for the nodes
+    # that are still there. New nodes start on their own.
+    if previous is None or len(previous.levels) == 0:
+        return None
+    membership = previous.membership_at_level(
+        CommunityLevel(int(previous.levels.min()))
+    )
+    return {node: membership[node] for node in nodes if node in membership}
+
+
+def _keep_previous_ids(
+    result: CommunityDetectionResult,
+    previous: CommunityDetectionResult,
+) -> CommunityDetectionResult:
+    """Give every community the id of the previous community it overlaps most.
+
+    Leiden numbers the communities again on every run. Communities are
+    matched level by level, greedily by the number of shared nodes, and
+    the ones without a match get ids that were never used before.
+    """
+    next_id = int(previous.community_ids.max(initial=-1)) + 1
+    id_mapping: dict[int, int] = {}
+
+    for level in sorted(result.communities):
+        previous_membership = previous.membership_at_level(level)
+        overlaps: dict[tuple[CommunityId, CommunityId], int] = {}
+        for community_id in result.communities[level]:
+            for name in result.members(level, community_id):
+                previous_id = previous_membership.get(name)
+                if previous_id is not None:
+                    key = (community_id, previous_id)
+                    overlaps[key] = overlaps.get(key, 0) + 1
+
+        taken: set[CommunityId] = set()
+        for (matched_id, matched_previous_id), _ in sorted(
+            overlaps.items(), key=lambda item: (-item[1], item[0])
+        ):
+            if matched_id not in id_mapping and matched_previous_id not in taken:
+                id_mapping[matched_id] = matched_previous_id
+                taken.add(matched_previous_id)
+
+        for community_id in result.communities[level]:
+            if community_id not in id_mapping:
+                id_mapping[community_id] = next_id
+                next_id += 1
+
+    id_mapping[_NO_PARENT] = _NO_PARENT
+    return CommunityDetectionResult.from_memberships(
+        node_names=result.node_names,
+        levels=result.levels,
+        community_ids=[id_mapping[i] for i in result.community_ids.tolist()],
+        node_codes=result.node_codes,
+        parent_ids=[id_mapping[i] for i in result.parent_ids.tolist()],
+        is_final=result.is_final,
+    )
+
+
+def _to_detection_result(
+    partitions: Iterable[HierarchicalCluster],
+) -> CommunityDetectionResult:
+    node_index: dict[str, int] = {}
+    levels: list[int] = []
+    community_ids: list[int] = []
+    node_codes: list[int] = []
+    parent_ids: list[int] = []
+    is_final: list[bool] = []
+
+    partition: HierarchicalCluster
+    for partition in partitions:
+        levels.append(partition.level)
+        community_ids.append(partition.cluster)
+        node_codes.append(node_index.setdefault(partition.node, len(node_index)))
+        parent_ids.append(
+            _NO_PARENT if partition.parent_cluster is None else partition.parent_cluster
+        )
+        is_final.append(partition.is_final_cluster)
+
+    return CommunityDetectionResult.from_memberships(
+        node_names=list(node_index),
+        levels=levels,
+        community_ids=community_ids,
+        node_codes=node_codes,
+        parent_ids=parent_ids,
+        is_final=is_final,
+    )
 
 
 class HierarchicalLeidenCommunityDetector(CommunityDetector):
@@ -25,42 +148,139 @@ class HierarchicalLeidenCommunityDetector(CommunityDetector):
         use_lcc: bool = True,
         max_cluster_size: int = 10,
         seed: int = 0xDEADBEEF,
+        per_component: bool = False,
+        trivial_component_size: int = 2,
+        max_workers: int | None = None,
     ):
+        """Detects communities with the hierarchical Leiden algorithm.
+
+        Args:
+            use_lcc (bool, optional): Only cluster the largest connected component.
+                Defaults to True.
+            max_cluster_size (int, optional): Communities larger than this are split
+                again at the next level. Defaults to 10.
+            seed (int, optional): Seed of the Leiden algorithm. Defaults to 0xDEADBEEF.
+            per_component (bool, optional): Only used if `use_lcc` is False. Clusters
+                every connected component on its own instead of the whole graph
+                at once, community ids are then renumbered across the components.
+                Defaults to False.
+            trivial_component_size (int, optional): Components with at most this many
+                nodes become a single community without running Leiden. Defaults to 2.
+            max_workers (int, optional): If greater than 1, the components are clustered
+                in a pool of that many processes. Defaults to None.
+        """
         self._use_lcc = use_lcc
         self._max_cluster_size = max_cluster_size
         self._seed = seed
+        self._per_component = per_component
+        self._trivial_component_size = trivial_component_size
+        self._max_workers = max_workers
 
-    def run(self, graph: nx.Graph) -> CommunityDetectionResult:
-        if self._use_lcc:
-            graph = stable_largest_connected_component(graph)
-
-        community_mapping: HierarchicalClusters = hierarchical_leiden(
-            graph,
-            max_cluster_size=self._max_cluster_size,
-            random_seed=self._seed,
-        )
+    def _cluster_components(
+        self,
+        graph: nx.Graph,
+        previous: CommunityDetectionResult | None,
+    ) -> Iterator[HierarchicalCluster]:
+        components = list(nx.connected_components(graph))
+        jobs = [
+            (
+                _component_graph(graph, nodes),
+                self._max_cluster_size,
+                self._seed,
+                _starting_communities(previous, nodes),
+            )
+            for nodes in components
+            if len(nodes) > self._trivial_component_size
+        ]
 
-        communities: dict[CommunityLevel, dict[CommunityId, Community]] = {}
+        if self._max_workers is not None and self._max_workers > 1:
+            with ProcessPoolExecutor(max_workers=self._max_workers) as executor:
+                clustered = iter(list(executor.map(_cluster_component, jobs)))
+        else:
+            clustered = map(_cluster_component, jobs)
 
-        partition: HierarchicalCluster
-        for partition in community_mapping:
-            partition_level = cast(CommunityLevel, partition.level)
-            partition_cluster = cast(CommunityId, partition.cluster)
+        # local cluster ids are numbered again in the order of the
+        # components so that they are unique in the whole graph
+        next_id = 0
+        for nodes in components:
+            if len(nodes) <= self._trivial_component_size:
+                for node in sorted(nodes):
+                    yield HierarchicalCluster(
+                        node=node,
+                        cluster=next_id,
+                        parent_cluster=None,
+                        level=0,
+                        is_final_cluster=True,
+                    )
+                next_id += 1
+                continue
 
-            communities_at_level = communities.get(partition_level, {})
-            community = communities_at_level.get(
-                partition_cluster,
-                Community(id=partition_cluster, nodes=[]),
-            )
-            community.nodes.append(
-                CommunityNode(
-                    name=partition.node,
-                    parent_cluster=cast(CommunityId, partition.parent_cluster),
-                    is_final_cluster=partition.is_final_cluster,
+            global_ids: dict[int, int] = {}
+            for partition in next(clustered):
+                for local_id in (partition.parent_cluster, partition.cluster):
+                    if local_id is not None and local_id not in global_ids:
+                        global_ids[local_id] = next_id
+                        next_id += 1
+                yield partition._replace(
+                    cluster=global_ids[partition.cluster],
+                    parent_cluster=None
+                    if partition.parent_cluster is None
+                    else global_ids[partition.parent_cluster],
                 )
-            )
 
-            communities_at_level[partition_cluster] = community
-            communities[partition_level] = communities_at_level
+    def run(
+        self,
+        graph: nx.Graph | CSRGraph,
+        previous: CommunityDetectionResult | None = None,
+    ) -> CommunityDetectionResult:
+        """Detect the communities of the graph.
+
+        Args:
+            graph (nx.Graph | CSRGraph): The graph to cluster.
+            previous (CommunityDetectionResult, optional): Communities detected on an
+                earlier version of the graph. Its top level communities are the
+                starting point of Leiden and the communities keep the id of the
+                previous community they overlap most, so that only the
+                communities returned by `changed_communities` need new
+                reports. Defaults to None.
+
+        Returns:
+            The detected communities.
+        """
+        result = self._detect(graph, previous)
+        if previous is None:
+            return result
+        return _keep_previous_ids(result, previous)
+
+    def _detect(
+        self,
+        graph: nx.Graph | CSRGraph,
+        previous: CommunityDetectionResult | None,
+    ) -> CommunityDetectionResult:
+        if self._per_component and not self._use_lcc:
+            if isinstance(graph, CSRGraph):
+                graph = graph.to_networkx()
+            return _to_detection_result(self._cluster_components(graph, previous))
+
+        leiden_input: nx.Graph | list[tuple[str, str, float]]
+        if isinstance(graph, CSRGraph):
+            # node names are used as they are, the edges are listed in
+            # the same stable order as the stabilized networkx graph
+            if self._use_lcc:
+                graph = graph.largest_connected_component()
+            leiden_input = graph.edge_list()
+            nodes = graph.node_names.tolist()
+        else:
+            if self._use_lcc:
+                graph = stable_largest_connected_component(graph)
+            leiden_input = graph
+            nodes = list(graph.nodes)
+
+        community_mapping: HierarchicalClusters = hierarchical_leiden(
+            leiden_input,
+            max_cluster_size=self._max_cluster_size,
+            random_seed=self._seed,
+            starting_communities=_starting_communities(previous, nodes),
+        )
 
-        return CommunityDetectionResult(communities=communities)
+        return _to_detection_result(community_mapping)
@@ -3,19 +3,22 @@
 from .entity_relationship_extraction import (
     EntityExtractionPromptBuilder,
     EntityRelationshipExtractor,
+    ExtractionTables,
 )
 from .entity_relationship_summarization import (
     EntityRelationshipDescriptionSummarizer,
     SummarizeDescriptionPromptBuilder,
 )
 from .generator import GraphGenerator
-from .graphs_merger import GraphsMerger
+from .graphs_merger import GraphsMerger, IdScheme
 
 __all__ = [
     "EntityRelationshipExtractor",
     "EntityExtractionPromptBuilder",
+    "ExtractionTables",
     "EntityRelationshipDescriptionSummarizer",
     "SummarizeDescriptionPromptBuilder",
     "GraphGenerator",
     "GraphsMerger",
+    "IdScheme",
 ]
@@ -0,0 +1,391 @@
+"""Group-by based engine to merge the graphs extracted from the text units.
+
+Produces exactly the same graph as the fold done by `GraphsMerger` but
+instead of merging the graphs one by one, all the node and edge records
+are concatenated and aggregated in one go.
+
+A node (or an edge) seen only once keeps its attributes as they are.
+For the ones seen more than once the descriptions and text unit ids become
+the sorted distinct union of all the records and the weights are summed
+up as integers, which is what the pairwise merge amounts to.
+
+The aggregation is associative, partial aggregations of consecutive
+groups of graphs can be aggregated again, which is what the parallel
+tree reduction relies on.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from enum import Enum
+from random import Random
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+from langchain_graphrag.utils.uuid import gen_content_uuid, gen_uuid
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+_LIST_ATTRIBUTES = ["description", "text_unit_ids"]
+
+
+class IdScheme(str, Enum):
+    """How `GraphsMerger` makes the ids of the nodes and edges.
+
+    - random: ids drawn from a generator seeded with `seed`, in the order
+      of the nodes (then edges) of the merged graph. A node added to the
+      text units shifts the ids of every node after it.
+    - content: ids derived from `seed` and the name of the node, or the
+      endpoints of the edge, so they are the same in every indexing run.
+      Use it with `VectorStoreWriter.upsert` to only embed the entities
+      and relationships that changed since the last run.
+    """
+
+    random = "random"
+    content = "content"
+
+
+def make_node_id(seed: int, name: str) -> str:
+    """Id of a node, derived from its name so that it is the same in every run."""
+    return gen_content_uuid(f"{seed:x}", name)
+
+
+def make_edge_id(seed: int, source: str, target: str) -> str:
+    """Id of an edge, derived from its endpoints in either order."""
+    return gen_content_uuid(f"{seed:x}", *sorted((source, target)))
+
+
+class PartialMerge(NamedTuple):
+    """Nodes and edges aggregated over a consecutive group of graphs.
+
+    Both frames have one row per node (or edge) in the order they were
+    first seen. `graph` and `pos` locate the first record so that
+    partial merges can be ordered against each other.
+    """
+
+    nodes: pd.DataFrame
+    edges: pd.DataFrame
+
+
+def _node_records(graphs: Sequence[nx.Graph], offset: int) -> pd.DataFrame:
+    records = [
+        (offset + g_index, pos, name, data or {})
+        for g_index, g in enumerate(graphs)
+        for pos, (name, data) in enumerate(g.nodes(data=True))
+    ]
+    frame = pd.DataFrame.from_records(
+        records, columns=["graph", "pos", "name", "attrs"]
+    )
+    attrs = frame["attrs"]
+    frame["description"] = [a.get("description", []) for a in attrs]
+    frame["text_unit_ids"] = [a.get("text_unit_ids", []) for a in attrs]
+    frame["count"] = 1
+    return frame
+
+
+def _edge_records(graphs: Sequence[nx.Graph], offset: int) -> pd.DataFrame:
+    records = [
+        (offset + g_index, pos, source, target, data or {})
+        for g_index, g in enumerate(graphs)
+        for pos, (source, target, data) in enumerate(g.edges(data=True))
+    ]
+    frame = pd.DataFrame.from_records(
+        records, columns=["graph", "pos", "source", "target", "attrs"]
+    )
+    attrs = frame["attrs"]
+    frame["description"] = [a.get("description", []) for a in attrs]
+    frame["text_unit_ids"] = [a.get("text_unit_ids", []) for a in attrs]
+    frame["weight"] = [a.get("weight") for a in attrs]
+    frame["count"] = 1
+
+    # undirected, both orientations are the same edge
+    in_order = frame["source"] <= frame["target"]
+    frame["key_source"] = frame["source"].where(in_order, frame["target"])
+    frame["key_target"] = frame["target"].where(in_order, frame["source"])
+    return frame
+
+
+def _sorted_distinct_lists(
+    group_codes: np.ndarray,
+    values: pd.Series,
+) -> dict[int, list]:
+    exploded = pd.DataFrame({"code": group_codes, "value": values.to_numpy()})
+    exploded = exploded.explode("value").dropna(subset=["value"])
+    exploded = exploded.drop_duplicates().sort_values(["code", "value"])
+    if exploded.empty:
+        return {}
+
+    # split the sorted values at the group boundaries, much cheaper
+    # than aggregating every group into a list with a python callback
+    codes = exploded["code"].to_numpy(dtype=np.int64)
+    boundaries = np.flatnonzero(np.diff(codes)) + 1
+    starts = np.concatenate(([0], boundaries))
+    groups = np.split(exploded["value"].to_numpy(dtype=object), boundaries)
+    return {
+        code: group.tolist()
+        for code, group in zip(codes[starts].tolist(), groups, strict=True)
+    }
+
+
+def _combine(frame: pd.DataFrame, keys: list[str], *, has_weight: bool) -> pd.DataFrame:
+    # records (or partial results) in the order they were seen
+    frame = frame.sort_values(["graph", "pos"], kind="stable").reset_index(drop=True)
+
+    codes = frame.groupby(keys, sort=False).ngroup().to_numpy()
+    counts = np.bincount(codes, weights=frame["count"].to_numpy()).astype(np.int64)
+
+    # the first record of a group carries its attributes and its
+    # position, groups are numbered in the order they were first seen
+    combined = frame[~pd.Series(codes).duplicated().to_numpy()].reset_index(drop=True)
+    combined["count"] = counts
+
+    is_multi = counts[codes] > 1
+    multi_codes = np.flatnonzero(counts > 1)
+
+    for column in _LIST_ATTRIBUTES:
+        merged_lists = _sorted_distinct_lists(codes[is_multi], frame[column][is_multi])
+        values = combined[column].tolist()
+        for code in multi_codes:
+            values[code] = merged_lists.get(code, [])
+        combined[column] = pd.Series(values, dtype=object)
+
+    if has_weight:
+        weights = frame["weight"][is_multi].to_numpy(dtype=float)
+        summed = np.bincount(
+            codes[is_multi],
+            weights=np.trunc(weights),
+            minlength=len(counts),
+        )
+        values = combined["weight"].tolist()
+        for code in multi_codes:
+            values[code] = int(summed[code])
+        combined["weight"] = pd.Series(values, dtype=object)
+
+    return combined
+
+
+def partial_merge(graphs: Sequence[nx.Graph], offset: int = 0) -> PartialMerge:
+    """Aggregate a consecutive group of graphs.
+
+    Args:
+        graphs: The graphs to aggregate.
+        offset: Index of the first graph in the full list of graphs.
+    """
+    return PartialMerge(
+        nodes=_combine(_node_records(graphs, offset), ["name"], has_weight=False),
+        edges=_combine(
+            _edge_records(graphs, offset),
+            ["key_source", "key_target"],
+            has_weight=True,
+        ),
+    )
+
+
+def combine_partial_merges(left: PartialMerge, right: PartialMerge) -> PartialMerge:
+    """Aggregate two partial merges into one."""
+    return PartialMerge(
+        nodes=_combine(
+            pd.concat([left.nodes, right.nodes], ignore_index=True),
+            ["name"],
+            has_weight=False,
+        ),
+        edges=_combine(
+            pd.concat([left.edges, right.edges], ignore_index=True),
+            ["key_source", "key_target"],
+            has_weight=True,
+        ),
+    )
+
+
+def _merged_attrs(row_attrs: dict[str, Any], count: int, **merged: Any) -> dict:
+    # attributes seen only once are kept as they are
+    return {**row_attrs, **merged} if count > 1 else dict(row_attrs)
+
+
+def finalize_merge(
+    partial: PartialMerge,
+    seed: int,
+    *,
+    id_scheme: IdScheme = IdScheme.random,
+) -> nx.Graph:
+    """Compute degree, rank and ids and build the merged graph."""
+    nodes, edges = partial.nodes, partial.edges
+    num_nodes, num_edges = len(nodes), len(edges)
+
+    names = nodes["name"].to_numpy(dtype=object)
+    node_index = pd.Index(names)
+    source_codes = node_index.get_indexer(edges["source"]).astype(np.int64)
+    target_codes = node_index.get_indexer(edges["target"]).astype(np.int64)
+
+    # degree as computed by networkx, a self loop counts twice
+    degrees = np.bincount(source_codes, minlength=num_nodes) + np.bincount(
+        target_codes, minlength=num_nodes
+    )
+
+    # networkx reports an edge from the endpoint that was added first
+    # and in the order the edges of that endpoint were added
+    first_codes = np.minimum(source_codes, target_codes)
+    second_codes = np.maximum(source_codes, target_codes)
+    edge_order = np.lexsort((np.arange(num_edges), first_codes))
+    edge_hrids = np.empty(num_edges, dtype=np.int64)
+    edge_hrids[edge_order] = np.arange(num_edges)
+
+    if id_scheme == IdScheme.content:
+        node_ids = [make_node_id(seed, name) for name in names]
+        edge_ids = [
+            make_edge_id(seed, source, target)
+            for source, target in zip(edges["source"], edges["target"], strict=True)
+        ]
+    else:
+        random = Random(seed)  # noqa: S311
+        node_ids = [str(gen_uuid(random)) for _ in range(num_nodes)]
+        ordered_edge_ids = [str(gen_uuid(random)) for _ in range(num_edges)]
+        edge_ids = [ordered_edge_ids[hrid] for hrid in edge_hrids.tolist()]
+
+    source_degrees = degrees[first_codes].tolist()
+    target_degrees = degrees[second_codes].tolist()
+    degrees_list = degrees.tolist()
+
+    merged_graph: nx.Graph = nx.Graph()
+    merged_graph.add_nodes_from(
+        (
+            name,
+            {
+                **_merged_attrs(
+                    attrs,
+                    count,
+                    description=description,
+                    text_unit_ids=text_unit_ids,
+                ),
+                "degree": degree,
+                "human_readable_id": hrid,
+                "id": node_id,
+            },
+        )
+        for hrid, (
+            name,
+            attrs,
+            count,
+            description,
+            text_unit_ids,
+            degree,
+            node_id,
+        ) in enumerate(
+            zip(
+                names,
+                nodes["attrs"],
+                nodes["count"].tolist(),
+                nodes["description"],
+                nodes["text_unit_ids"],
+                degrees_list,
+                node_ids,
+                strict=True,
+            )
+        )
+    )
+
+    # adding the edges in the order they were first seen gives the same
+    # adjacency, and hence the same iteration order, as the pairwise merge
+    merged_graph.add_edges_from(
+        (
+            source,
+            target,
+            {
+                **_merged_attrs(
+                    attrs,
+                    count,
+                    text_unit_ids=text_unit_ids,
+                    description=description,
+                    weight=weight,
+                ),
+                "source_degree": source_degree,
+                "target_degree": target_degree,
+                "rank": source_degree + target_degree,
+                "human_readable_id": hrid,
+                "id": edge_id,
+            },
+        )
+        for (
+            source,
+            target,
+            attrs,
+            count,
+            description,
+            text_unit_ids,
+            weight,
+            source_degree,
+            target_degree,
+            hrid,
+            edge_id,
+        ) in zip(
+            edges["source"],
+            edges["target"],
+            edges["attrs"],
+            edges["count"].tolist(),
+            edges["description"],
+            edges["text_unit_ids"],
+            edges["weight"],
+            source_degrees,
+            target_degrees,
+            edge_hrids.tolist(),
+            edge_ids,
+            strict=True,
+        )
+    )
+
+    return merged_graph
+
+
+def groupby_merge(
+    graphs: Sequence[nx.Graph],
+    seed: int,
+    *,
+    id_scheme: IdScheme = IdScheme.random,
+) -> nx.Graph:
+    """Merge the graphs with a single group-by over all their records."""
+    return finalize_merge(partial_merge(graphs), seed, id_scheme=id_scheme)
+
+
+def _partial_merge_shard(shard: tuple[Sequence[nx.Graph], int]) -> PartialMerge:
+    graphs, offset = shard
+    return partial_merge(graphs, offset)
+
+
+def _combine_pair(pair: tuple[PartialMerge, PartialMerge]) -> PartialMerge:
+    return combine_partial_merges(*pair)
+
+
+def parallel_merge(
+    graphs: Sequence[nx.Graph],
+    seed: int,
+    *,
+    shard_size: int,
+    max_workers: int | None = None,
+    id_scheme: IdScheme = IdScheme.random,
+) -> nx.Graph:
+    """Merge shards of the graphs in a process pool and reduce them pairwise.
+
+    Shards are consecutive and neighbours are always reduced together
+    (left before right) so the result is identical to `groupby_merge`.
+    """
+    shards = [
+        (graphs[start : start + shard_size], start)
+        for start in range(0, len(graphs), shard_size)
+    ]
+    if len(shards) <= 1:
+        return groupby_merge(graphs, seed, id_scheme=id_scheme)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        partials = list(executor.map(_partial_merge_shard, shards))
+        while len(partials) > 1:
+            pairs = list(zip(partials[0::2], partials[1::2], strict=False))
+            reduced = list(executor.map(_combine_pair, pairs))
+            if len(partials) % 2 == 1:
+                reduced.append(partials[-1])
+            partials = reduced
+
+    return finalize_merge(partials[0], seed, id_scheme=id_scheme)
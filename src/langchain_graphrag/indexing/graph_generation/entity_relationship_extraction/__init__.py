@@ -2,8 +2,10 @@
 
 from .extractor import EntityRelationshipExtractor
 from .prompt_builder import EntityExtractionPromptBuilder
+from .tables import ExtractionTables
 
 __all__ = [
     "EntityRelationshipExtractor",
     "EntityExtractionPromptBuilder",
+    "ExtractionTables",
 ]
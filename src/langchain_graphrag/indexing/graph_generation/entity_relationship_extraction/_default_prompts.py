@@ -124,3 +124,8 @@ Output:
 
 
 """
+
+DEFAULT_PACKED_INPUT_HEADER = """The text below is made of {text_units_count} independent text units. Every text unit starts with a line of the form -Text Unit <id>-.
+Identify the entities and relationships of every text unit on its own and do not relate entities that belong to different text units.
+Before the records of a text unit, output ("text_unit"{tuple_delimiter}<id>){record_delimiter}
+"""
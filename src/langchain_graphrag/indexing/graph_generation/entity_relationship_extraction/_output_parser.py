@@ -4,13 +4,15 @@ import html
 import numbers
 import re
 from collections.abc import Mapping
-from typing import Any
+from typing import Any, NamedTuple
 
 import networkx as nx
 from langchain_core.output_parsers import BaseOutputParser
 
 _ENTITY_ATTRIBUTES_LENGTH = 4
 _RELATIONSHIP_ATTRIBUTES_LENGTH = 5
+_TEXT_UNIT_ATTRIBUTES_LENGTH = 2
+_TEXT_UNIT_RECORD = '"text_unit"'
 
 
 def _clean_str(input_str: Any) -> str:
@@ -28,6 +30,60 @@ def _unpack_descriptions(data: Mapping) -> list[str]:
     return data.get("description", [])
 
 
+class EntityRecord(NamedTuple):
+    name: str
+    type: str
+    description: str
+
+
+class RelationshipRecord(NamedTuple):
+    source: str
+    target: str
+    description: str
+    weight: float
+
+
+class ExtractedRecords(NamedTuple):
+    """Flat records parsed from the output for a single text unit."""
+
+    entities: list[EntityRecord]
+    relationships: list[RelationshipRecord]
+
+
+def _to_entity_record(record_attributes: list[str]) -> EntityRecord | None:
+    if (record_attributes[0] != '"entity"') or (
+        len(record_attributes) < _ENTITY_ATTRIBUTES_LENGTH
+    ):
+        return None
+
+    return EntityRecord(
+        name=_clean_str(record_attributes[1].upper()),
+        type=_clean_str(record_attributes[2].upper()),
+        description=_clean_str(record_attributes[3]),
+    )
+
+
+def _to_relationship_record(
+    record_attributes: list[str],
+) -> RelationshipRecord | None:
+    if (
+        record_attributes[0] != '"relationship"'
+        or len(record_attributes) < _RELATIONSHIP_ATTRIBUTES_LENGTH
+    ):
+        return None
+
+    return RelationshipRecord(
+        source=_clean_str(record_attributes[1].upper()),
+        target=_clean_str(record_attributes[2].upper()),
+        description=_clean_str(record_attributes[3]),
+        weight=(
+            float(record_attributes[-1])
+            if isinstance(record_attributes[-1], numbers.Number)
+            else 1.0
+        ),
+    )
+
+
 class EntityExtractionOutputParser(BaseOutputParser[nx.Graph]):
     """OutputParser for extracting entities and relationships.
 
@@ -47,15 +103,12 @@ class EntityExtractionOutputParser(BaseOutputParser[nx.Graph]):
     record_delimiter: str
 
     def _process_entity(self, record_attributes: list[str], graph: nx.Graph) -> None:
-        if (record_attributes[0] != '"entity"') or (
-            len(record_attributes) < _ENTITY_ATTRIBUTES_LENGTH
-        ):
+        entity = _to_entity_record(record_attributes)
+        if entity is None:
             return
 
         # add this record as a node in the G
-        entity_name = _clean_str(record_attributes[1].upper())
-        entity_type = _clean_str(record_attributes[2].upper())
-        entity_description = _clean_str(record_attributes[3])
+        entity_name, entity_type, entity_description = entity
 
         if entity_name in graph.nodes():
             node = graph.nodes[entity_name]
@@ -81,22 +134,13 @@ class EntityExtractionOutputParser(BaseOutputParser[nx.Graph]):
         record_attributes: list[str],
         graph: nx.Graph,
     ) -> None:
-        if (
-            record_attributes[0] != '"relationship"'
-            or len(record_attributes) < _RELATIONSHIP_ATTRIBUTES_LENGTH
-        ):
+        relationship = _to_relationship_record(record_attributes)
+        if relationship is None:
             return
 
         # add this record as edge
-        source = _clean_str(record_attributes[1].upper())
-        target = _clean_str(record_attributes[2].upper())
-        edge_description = _clean_str(record_attributes[3])
+        source, target, edge_description, weight = relationship
 
-        weight = (
-            float(record_attributes[-1])
-            if isinstance(record_attributes[-1], numbers.Number)
-            else 1.0
-        )
         if source not in graph.nodes():
             graph.add_node(
                 source,
@@ -124,9 +168,12 @@ class EntityExtractionOutputParser(BaseOutputParser[nx.Graph]):
 
         graph.add_edge(source, target, weight=weight, description=edge_descriptions)
 
-    def _process_record(self, graph: nx.Graph, record: str) -> None:
+    def _record_attributes(self, record: str) -> list[str]:
         record = re.sub(r"^\(|\)$", "", record.strip())
-        record_attributes = record.split(self.tuple_delimiter)
+        return record.split(self.tuple_delimiter)
+
+    def _process_record(self, graph: nx.Graph, record: str) -> None:
+        record_attributes = self._record_attributes(record)
 
         self._process_entity(record_attributes, graph)
         self._process_relationship(record_attributes, graph)
@@ -146,6 +193,88 @@ class EntityExtractionOutputParser(BaseOutputParser[nx.Graph]):
             self._process_record(graph, record)
         return graph
 
+    def parse_records(self, text: str) -> ExtractedRecords:
+        """Parses the given text into flat entity and relationship records.
+
+        Unlike `parse`, records are not merged with each other. The
+        entities referred to by a relationship but not described before
+        it get a record with empty type and description, the same way
+        `parse` adds them as nodes to the graph.
+
+        Parameters:
+            text (str): The text to be parsed.
+
+        Returns:
+            The parsed entity and relationship records.
+        """
+        entities: list[EntityRecord] = []
+        relationships: list[RelationshipRecord] = []
+        seen: set[str] = set()
+        for record in text.split(self.record_delimiter):
+            record_attributes = self._record_attributes(record)
+
+            entity = _to_entity_record(record_attributes)
+            if entity is not None:
+                entities.append(entity)
+                seen.add(entity.name)
+
+            relationship = _to_relationship_record(record_attributes)
+            if relationship is not None:
+                for name in (relationship.source, relationship.target):
+                    if name not in seen:
+                        entities.append(EntityRecord(name, "", ""))
+                        seen.add(name)
+                relationships.append(relationship)
+
+        return ExtractedRecords(entities=entities, relationships=relationships)
+
+    def split_packed(self, text: str) -> dict[str, str]:
+        """Splits the output of a packed prompt into the output of every text unit.
+
+        A packed prompt contains several text units. The records of every
+        text unit are preceded by a `("text_unit"<tuple_delimiter><id>)` record,
+        records that come before the first of them are ignored.
+
+        Parameters:
+            text (str): The text to be split.
+
+        Returns:
+            A mapping from the id of the text unit to the records produced for it.
+        """
+        text_unit_records: dict[str, list[str]] = {}
+        current: list[str] | None = None
+        for record in text.split(self.record_delimiter):
+            record_attributes = self._record_attributes(record)
+            if (
+                record_attributes[0] == _TEXT_UNIT_RECORD
+                and len(record_attributes) >= _TEXT_UNIT_ATTRIBUTES_LENGTH
+            ):
+                text_unit_id = _clean_str(record_attributes[1]).strip('"')
+                current = text_unit_records.setdefault(text_unit_id, [])
+            elif current is not None:
+                current.append(record)
+
+        return {
+            text_unit_id: self.record_delimiter.join(records)
+            for text_unit_id, records in text_unit_records.items()
+        }
+
+    def parse_packed(self, text: str) -> dict[str, nx.Graph]:
+        """Parses the output of a packed prompt into one graph per text unit.
+
+        See `split_packed` for the expected format.
+
+        Parameters:
+            text (str): The text to be parsed.
+
+        Returns:
+            A mapping from the id of the text unit to its parsed graph object.
+        """
+        return {
+            text_unit_id: self.parse(text_unit_output)
+            for text_unit_id, text_unit_output in self.split_packed(text).items()
+        }
+
     @property
     def _type(self) -> str:
         return "entity_extraction_output_parser"
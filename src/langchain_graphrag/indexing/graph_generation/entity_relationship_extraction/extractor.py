@@ -3,20 +3,90 @@
 from __future__ import annotations
 
 import logging
+from typing import TYPE_CHECKING, Any, NamedTuple, cast
 
 import networkx as nx
 import pandas as pd
 from langchain_core.language_models import LanguageModelLike
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import Runnable
 from langchain_core.runnables.config import RunnableConfig
 from tqdm import tqdm
+from tqdm.asyncio import tqdm as atqdm
 
 from langchain_graphrag.types.prompts import IndexingPromptBuilder
+from langchain_graphrag.types.tokens import TokenCounter
+from langchain_graphrag.utils.disk_cache import (
+    DiskCache,
+    make_cache_key,
+    model_identity,
+)
+from langchain_graphrag.utils.text_dedup import TextDeduplicator
 
+from ._output_parser import (
+    EntityExtractionOutputParser,
+    EntityRecord,
+    ExtractedRecords,
+    RelationshipRecord,
+)
 from .prompt_builder import EntityExtractionPromptBuilder
+from .tables import ExtractionTables
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def _graph_to_json(graph: nx.Graph) -> dict[str, Any]:
+    return dict(
+        nodes=[[name, data] for name, data in graph.nodes(data=True)],
+        edges=[
+            [source, target, data] for source, target, data in graph.edges(data=True)
+        ],
+    )
+
+
+def _graph_from_json(data: dict[str, Any]) -> nx.Graph:
+    graph = nx.Graph()
+    graph.add_nodes_from((name, node_data) for name, node_data in data["nodes"])
+    graph.add_edges_from(
+        (source, target, edge_data) for source, target, edge_data in data["edges"]
+    )
+    return graph
+
+
+def _records_to_json(records: ExtractedRecords) -> list[list[Any]]:
+    return [
+        [list(entity) for entity in records.entities],
+        [list(relationship) for relationship in records.relationships],
+    ]
+
+
+def _records_from_json(data: list[list[Any]]) -> ExtractedRecords:
+    entities, relationships = data
+    return ExtractedRecords(
+        entities=[EntityRecord(*entity) for entity in entities],
+        relationships=[
+            RelationshipRecord(*relationship) for relationship in relationships
+        ],
+    )
+
+
+class _ExtractionMode(NamedTuple):
+    # output of the chain is either a single parsed result or,
+    # when text units are packed, a mapping from text unit id to it
+    chain: Runnable
+    # extracts a single text unit, for the text units that the
+    # language model left out of a packed reply
+    unpacked_chain: Runnable
+    to_json: Callable[[Any], Any]
+    from_json: Callable[[Any], Any]
+    cache_key_tag: str | None
+    # gives a duplicate text unit its own copy of a shared result
+    share: Callable[[Any], Any]
+
+
 class EntityRelationshipExtractor:
     def __init__(
         self,
@@ -24,41 +94,439 @@ class EntityRelationshipExtractor:
         llm: LanguageModelLike,
         *,
         chain_config: RunnableConfig | None = None,
+        max_concurrency: int | None = None,
+        cache: DiskCache | None = None,
+        model_id: str | None = None,
+        packing_token_budget: int | None = None,
+        token_counter: TokenCounter | None = None,
+        deduplicator: TextDeduplicator | None = None,
     ):
         """Extracts entities and relationships from text units using a language model.
 
         Args:
-            prompt_builder (PromptBuilder): The prompt builder object used to construct the prompt for the language model.
-            llm (LanguageModelLike): The language model used for entity and relationship extraction.
-            chain_config (RunnableConfig, optional): The configuration object for the extraction chain. Defaults to None.
+            prompt_builder (PromptBuilder): The prompt builder object used to construct
+                the prompt for the language model.
+            llm (LanguageModelLike): The language model used for entity and
+                relationship extraction.
+            chain_config (RunnableConfig, optional): The configuration object for the
+                extraction chain. Defaults to None.
+            max_concurrency (int, optional): Maximum number of extraction calls kept in
+                flight. If None, `invoke` processes the text units one at a time and
+                `ainvoke` does not limit the number of concurrent calls.
+                Defaults to None.
+            cache (DiskCache, optional): Cache for the parsed graph of every text unit.
+                The key is made of the text unit, the prompt (template, delimiters
+                and entity types) and the model id, so a hit skips both
+                the LLM call and the parsing of its output. Defaults to None.
+            model_id (str, optional): Identifies the language model in the cache key.
+                If None, it is derived from the identifying parameters of `llm`.
+            packing_token_budget (int, optional): If provided, consecutive text units
+                are packed in a single prompt as long as their combined size stays
+                within this many tokens, which saves sending the few-shot
+                examples of the prompt once per text unit. Requires an
+                `EntityExtractionPromptBuilder` and a `token_counter`.
+                Defaults to None.
+            token_counter (TokenCounter, optional): Counts the tokens of the text units
+                when packing them. Defaults to None.
+            deduplicator (TextDeduplicator, optional): If provided, only the first of
+                a group of duplicate text units is sent to the language model and the
+                others reuse its result, so the nodes and edges extracted from
+                it carry the ids of all of them once the graphs are merged.
+                Defaults to None.
 
         """
         prompt, output_parser = prompt_builder.build()
-        self._extraction_chain = prompt | llm | output_parser
+        self._prompt = prompt
+        unpacked_chain: Runnable = prompt | llm | output_parser
+        extraction_chain = unpacked_chain
+
+        if packing_token_budget is not None:
+            if not isinstance(prompt_builder, EntityExtractionPromptBuilder):
+                raise ValueError(
+                    "packing text units requires an EntityExtractionPromptBuilder"
+                )
+            if token_counter is None:
+                raise ValueError("packing text units requires a token_counter")
+            assert isinstance(output_parser, EntityExtractionOutputParser)
+            extraction_chain = (
+                prompt | llm | StrOutputParser() | output_parser.parse_packed
+            )
+
+        self._graph_mode = _ExtractionMode(
+            chain=extraction_chain,
+            unpacked_chain=unpacked_chain,
+            to_json=_graph_to_json,
+            from_json=_graph_from_json,
+            cache_key_tag=None,
+            share=lambda graph: graph.copy(),
+        )
+
+        # flat records are only produced by the default output parser
+        self._records_mode: _ExtractionMode | None = None
+        if isinstance(output_parser, EntityExtractionOutputParser):
+            parse_records = output_parser.parse_records
+
+            def _parse_packed_records(text: str) -> dict[str, ExtractedRecords]:
+                return {
+                    text_unit_id: parse_records(text_unit_output)
+                    for text_unit_id, text_unit_output in output_parser.split_packed(
+                        text
+                    ).items()
+                }
+
+            unpacked_records_chain = prompt | llm | StrOutputParser() | parse_records
+            self._records_mode = _ExtractionMode(
+                chain=unpacked_records_chain
+                if packing_token_budget is None
+                else prompt | llm | StrOutputParser() | _parse_packed_records,
+                unpacked_chain=unpacked_records_chain,
+                to_json=_records_to_json,
+                from_json=_records_from_json,
+                cache_key_tag="records",
+                share=lambda records: records,
+            )
+
+        self._packing_token_budget = packing_token_budget
+        self._token_counter = token_counter
         self._prompt_builder = prompt_builder
         self._chain_config = chain_config
+        self._max_concurrency = max_concurrency
+        self._cache = cache
+        self._model_id = model_id if model_id is not None else model_identity(llm)
+        self._deduplicator = deduplicator
 
     @staticmethod
     def build_default(
         llm: LanguageModelLike,
         *,
         chain_config: RunnableConfig | None = None,
+        max_concurrency: int | None = None,
+        cache: DiskCache | None = None,
+        packing_token_budget: int | None = None,
+        token_counter: TokenCounter | None = None,
+        deduplicator: TextDeduplicator | None = None,
     ) -> EntityRelationshipExtractor:
-        """Builds and returns an instance of EntityRelationshipExtractor with default parameters.
+        """Builds and returns an instance of EntityRelationshipExtractor with defaults.
 
         Parameters:
-            llm (LanguageModelLike): The language model used for entity relationship extraction.
-            chain_config (RunnableConfig, optional): The configuration object for the extraction chain. Defaults to None.
+            llm (LanguageModelLike): The language model used for entity relationship
+                extraction.
+            chain_config (RunnableConfig, optional): The configuration object for the
+                extraction chain. Defaults to None.
+            max_concurrency (int, optional): Maximum number of extraction calls kept in
+                flight. Defaults to None.
+            cache (DiskCache, optional): Cache for the parsed graph of every text unit.
+                Defaults to None.
+            packing_token_budget (int, optional): Token budget for packing several text
+                units in a prompt. Defaults to None.
+            token_counter (TokenCounter, optional): Counts the tokens of the text units
+                when packing them. Defaults to None.
+            deduplicator (TextDeduplicator, optional): Detects the duplicate text units
+                that can share their result. Defaults to None.
 
         Returns:
-            EntityRelationshipExtractor: An instance of EntityRelationshipExtractor with default parameters.
+            EntityRelationshipExtractor: An instance of EntityRelationshipExtractor
+                with default parameters.
         """
         return EntityRelationshipExtractor(
             prompt_builder=EntityExtractionPromptBuilder(),
             llm=llm,
             chain_config=chain_config,
+            max_concurrency=max_concurrency,
+            cache=cache,
+            packing_token_budget=packing_token_budget,
+            token_counter=token_counter,
+            deduplicator=deduplicator,
+        )
+
+    def _batch_config(self) -> RunnableConfig:
+        config: RunnableConfig = {**(self._chain_config or {})}
+        if self._max_concurrency is not None:
+            config["max_concurrency"] = self._max_concurrency
+        return config
+
+    def _prepare_chain_inputs(self, text_units: pd.DataFrame) -> list[dict[str, str]]:
+        return [
+            self._prompt_builder.prepare_chain_input(text_unit=text_unit)
+            for text_unit in text_units["text_unit"]
+        ]
+
+    def _add_text_unit_id(self, chunk_graph: nx.Graph, text_id: str) -> nx.Graph:
+        # add the chunk_id to the nodes
+        for node_names in chunk_graph.nodes():
+            chunk_graph.nodes[node_names]["text_unit_ids"] = [text_id]
+
+        # add the chunk_id to the edges as well
+        for edge_names in chunk_graph.edges():
+            chunk_graph.edges[edge_names]["text_unit_ids"] = [text_id]
+
+        if logging.getLevelName(_LOGGER.getEffectiveLevel()) == "DEBUG":
+            _LOGGER.debug(f"Graph for: {text_id}")
+            _LOGGER.debug(chunk_graph)
+
+        return chunk_graph
+
+    def _cache_keys(
+        self,
+        chain_inputs: list[dict[str, str]],
+        mode: _ExtractionMode,
+    ) -> list[str]:
+        # The rendered prompt covers the text unit, the template,
+        # the delimiters and the entity types
+        tag = () if mode.cache_key_tag is None else (mode.cache_key_tag,)
+        return [
+            make_cache_key(self._prompt.format(**chain_input), self._model_id, *tag)
+            for chain_input in chain_inputs
+        ]
+
+    def _lookup_cache(
+        self,
+        cache_keys: list[str],
+        indices: list[int],
+        mode: _ExtractionMode,
+    ) -> list[Any | None]:
+        assert self._cache is not None
+        results: list[Any | None] = [None] * len(cache_keys)
+        for index in indices:
+            data = self._cache.get(cache_keys[index])
+            results[index] = None if data is None else mode.from_json(data)
+        return results
+
+    def _make_jobs(self, texts: list[str], pending: list[int]) -> list[list[int]]:
+        # every job is a single call to the language model
+        if self._packing_token_budget is None:
+            return [[index] for index in pending]
+
+        assert self._token_counter is not None
+        jobs: list[list[int]] = []
+        job: list[int] = []
+        job_tokens = 0
+        for index in pending:
+            tokens = self._token_counter.count_tokens(texts[index])
+            if job and job_tokens + tokens > self._packing_token_budget:
+                jobs.append(job)
+                job, job_tokens = [], 0
+            job.append(index)
+            job_tokens += tokens
+        if job:
+            jobs.append(job)
+        return jobs
+
+    def _job_input(
+        self,
+        job: list[int],
+        texts: list[str],
+        chain_inputs: list[dict[str, str]],
+    ) -> dict[str, str]:
+        if self._packing_token_budget is None:
+            return chain_inputs[job[0]]
+
+        # the position in the job is used as the id of the text unit
+        # as the real ids are long and the model has to repeat them
+        prompt_builder = cast("EntityExtractionPromptBuilder", self._prompt_builder)
+        return prompt_builder.prepare_packed_chain_input(
+            text_units=[(str(n + 1), texts[index]) for n, index in enumerate(job)]
+        )
+
+    def _job_results(
+        self,
+        job: list[int],
+        output: Any,
+    ) -> tuple[list[tuple[int, Any]], list[int]]:
+        # (text unit, result) of the job and the text units without a result
+        if self._packing_token_budget is None:
+            return [(job[0], output)], []
+
+        results: list[tuple[int, Any]] = []
+        missing: list[int] = []
+        for n, index in enumerate(job):
+            if str(n + 1) in output:
+                results.append((index, output[str(n + 1)]))
+            else:
+                missing.append(index)
+        return results, missing
+
+    def _start(
+        self,
+        text_units: pd.DataFrame,
+        mode: _ExtractionMode,
+    ) -> tuple[
+        list[Any | None],
+        list[str],
+        list[list[int]],
+        list[dict[str, str]],
+        list[int],
+        list[dict[str, str]],
+    ]:
+        texts = text_units["text_unit"].tolist()
+        chain_inputs = self._prepare_chain_inputs(text_units)
+
+        # duplicates are neither looked up nor extracted
+        representatives = (
+            self._deduplicator.find_representatives(texts)
+            if self._deduplicator is not None
+            else list(range(len(texts)))
+        )
+        unique = [i for i, r in enumerate(representatives) if i == r]
+
+        cache_keys: list[str] = []
+        results: list[Any | None] = [None] * len(chain_inputs)
+        if self._cache is not None:
+            cache_keys = self._cache_keys(chain_inputs, mode)
+            results = self._lookup_cache(cache_keys, unique, mode)
+
+        pending = [i for i in unique if results[i] is None]
+        jobs = self._make_jobs(texts, pending)
+        job_inputs = [self._job_input(job, texts, chain_inputs) for job in jobs]
+
+        return results, cache_keys, jobs, job_inputs, representatives, chain_inputs
+
+    @staticmethod
+    def _share_duplicates(
+        results: list[Any],
+        representatives: list[int],
+        mode: _ExtractionMode,
+    ) -> list[Any]:
+        return [
+            result if index == representative else mode.share(results[representative])
+            for index, (result, representative) in enumerate(
+                zip(results, representatives, strict=True)
+            )
+        ]
+
+    def _collect(
+        self,
+        results: list[Any | None],
+        cache_keys: list[str],
+        job_results: list[tuple[int, Any]],
+        mode: _ExtractionMode,
+    ) -> None:
+        # results may arrive in completion order, they are put back in
+        # the order of the text units so that merging stays deterministic
+        for index, result in job_results:
+            if self._cache is not None:
+                self._cache.set(cache_keys[index], mode.to_json(result))
+            results[index] = result
+
+    def _collect_job(
+        self,
+        results: list[Any | None],
+        cache_keys: list[str],
+        job: list[int],
+        output: Any,
+        mode: _ExtractionMode,
+    ) -> list[int]:
+        job_results, missing = self._job_results(job, output)
+        self._collect(results, cache_keys, job_results, mode)
+        if missing:
+            # they are extracted again on their own, an empty result
+            # would otherwise be cached and the text units lost for good
+            _LOGGER.warning(
+                f"{len(missing)} text units missing from a packed reply, "
+                "extracting them one by one"
+            )
+        return missing
+
+    def _run_jobs(
+        self,
+        job_inputs: list[dict[str, str]],
+        mode: _ExtractionMode,
+    ) -> Iterator[tuple[int, Any]]:
+        if self._max_concurrency is not None and self._max_concurrency > 1:
+            yield from mode.chain.batch_as_completed(
+                job_inputs,
+                config=self._batch_config(),
+            )
+        else:
+            for index, job_input in enumerate(job_inputs):
+                yield (
+                    index,
+                    mode.chain.invoke(
+                        input=job_input,
+                        config=self._chain_config,
+                    ),
+                )
+
+    def _extract(self, text_units: pd.DataFrame, mode: _ExtractionMode) -> list[Any]:
+        results, cache_keys, jobs, job_inputs, representatives, chain_inputs = (
+            self._start(text_units, mode)
         )
 
+        missing: list[int] = []
+        with tqdm(
+            total=sum(len(job) for job in jobs),
+            desc="Extracting entities and relationships ...",
+        ) as pbar:
+            for job_index, output in self._run_jobs(job_inputs, mode):
+                missing += self._collect_job(
+                    results, cache_keys, jobs[job_index], output, mode
+                )
+                pbar.update(len(jobs[job_index]))
+
+        if missing:
+            outputs = mode.unpacked_chain.batch(
+                [chain_inputs[index] for index in missing],
+                config=self._batch_config(),
+            )
+            self._collect(
+                results, cache_keys, list(zip(missing, outputs, strict=True)), mode
+            )
+
+        return self._share_duplicates(results, representatives, mode)
+
+    async def _aextract(
+        self,
+        text_units: pd.DataFrame,
+        mode: _ExtractionMode,
+    ) -> list[Any]:
+        results, cache_keys, jobs, job_inputs, representatives, chain_inputs = (
+            self._start(text_units, mode)
+        )
+
+        missing: list[int] = []
+        with atqdm(
+            total=sum(len(job) for job in jobs),
+            desc="Extracting entities and relationships ...",
+        ) as pbar:
+            async for job_index, output in mode.chain.abatch_as_completed(
+                job_inputs,
+                config=self._batch_config(),
+            ):
+                missing += self._collect_job(
+                    results, cache_keys, jobs[job_index], output, mode
+                )
+                pbar.update(len(jobs[job_index]))
+
+        if missing:
+            outputs = await mode.unpacked_chain.abatch(
+                [chain_inputs[index] for index in missing],
+                config=self._batch_config(),
+            )
+            self._collect(
+                results, cache_keys, list(zip(missing, outputs, strict=True)), mode
+            )
+
+        return self._share_duplicates(results, representatives, mode)
+
+    def _finish_graphs(
+        self,
+        chunk_graphs: list[nx.Graph],
+        text_units: pd.DataFrame,
+    ) -> list[nx.Graph]:
+        return [
+            self._add_text_unit_id(chunk_graph, text_id)
+            for chunk_graph, text_id in zip(
+                chunk_graphs, text_units["id"].tolist(), strict=True
+            )
+        ]
+
+    def _require_records_mode(self) -> _ExtractionMode:
+        if self._records_mode is None:
+            raise ValueError(
+                "extracting tables requires the EntityExtractionOutputParser"
+            )
+        return self._records_mode
+
     def invoke(self, text_units: pd.DataFrame) -> list[nx.Graph]:
         """Invoke the entity relationship extraction process on the text units.
 
@@ -73,38 +541,55 @@ class EntityRelationshipExtractor:
             text_units (pd.DataFrame): A pandas dataframe containing the text units.
 
         Returns:
-            A list of networkx Graph objects representing the extracted entities and relationships.
+            A list of networkx Graph objects representing the extracted entities
+            and relationships, in the same order as the text units.
         """
+        chunk_graphs = self._extract(text_units, self._graph_mode)
+        return self._finish_graphs(chunk_graphs, text_units)
 
-        def _run_chain(series: pd.Series) -> nx.Graph:
-            _, text_id, text_unit = (
-                series["document_id"],
-                series["id"],
-                series["text_unit"],
-            )
+    async def ainvoke(self, text_units: pd.DataFrame) -> list[nx.Graph]:
+        """Asynchronously invoke the entity relationship extraction process.
 
-            chain_input = self._prompt_builder.prepare_chain_input(text_unit=text_unit)
+        Up to `max_concurrency` extraction calls are kept in flight at any
+        time. The requirements on `text_units` are the same as for `invoke`.
 
-            chunk_graph = self._extraction_chain.invoke(
-                input=chain_input,
-                config=self._chain_config,
-            )
+        Parameters:
+            text_units (pd.DataFrame): A pandas dataframe containing the text units.
 
-            # add the chunk_id to the nodes
-            for node_names in chunk_graph.nodes():
-                chunk_graph.nodes[node_names]["text_unit_ids"] = [text_id]
+        Returns:
+            A list of networkx Graph objects representing the extracted entities
+            and relationships, in the same order as the text units.
+        """
+        chunk_graphs = await self._aextract(text_units, self._graph_mode)
+        return self._finish_graphs(chunk_graphs, text_units)
 
-            # add the chunk_id to the edges as well
-            for edge_names in chunk_graph.edges():
-                chunk_graph.edges[edge_names]["text_unit_ids"] = [text_id]
+    def invoke_as_tables(self, text_units: pd.DataFrame) -> ExtractionTables:
+        """Invoke the extraction process and return flat records instead of graphs.
 
-            if logging.getLevelName(_LOGGER.getEffectiveLevel()) == "DEBUG":
-                _LOGGER.debug(f"Graph for: {text_id}")
-                _LOGGER.debug(chunk_graph)
+        No graph is built per text unit, every entity and relationship record
+        produced by the language model becomes a row of `ExtractionTables`
+        together with the id of its text unit. The tables can be merged
+        with `GraphsMerger.merge_tables`.
 
-            return chunk_graph
+        The requirements on `text_units` are the same as for `invoke`.
 
-        tqdm.pandas(desc="Extracting entities and relationships ...")
-        chunk_graphs: list[nx.Graph] = text_units.progress_apply(_run_chain, axis=1)
+        Parameters:
+            text_units (pd.DataFrame): A pandas dataframe containing the text units.
+
+        Returns:
+            The tables of entity and relationship records.
+        """
+        records = self._extract(text_units, self._require_records_mode())
+        return ExtractionTables.from_records(records, text_units["id"].tolist())
+
+    async def ainvoke_as_tables(self, text_units: pd.DataFrame) -> ExtractionTables:
+        """Asynchronous version of `invoke_as_tables`.
 
-        return chunk_graphs
+        Parameters:
+            text_units (pd.DataFrame): A pandas dataframe containing the text units.
+
+        Returns:
+            The tables of entity and relationship records.
+        """
+        records = await self._aextract(text_units, self._require_records_mode())
+        return ExtractionTables.from_records(records, text_units["id"].tolist())
@@ -9,7 +9,7 @@ from typing_extensions import Unpack
 
 from langchain_graphrag.types.prompts import IndexingPromptBuilder
 
-from ._default_prompts import DEFAULT_ER_EXTRACTION_PROMPT
+from ._default_prompts import DEFAULT_ER_EXTRACTION_PROMPT, DEFAULT_PACKED_INPUT_HEADER
 from ._output_parser import EntityExtractionOutputParser
 
 _DEFAULT_TUPLE_DELIMITER = "<|>"
@@ -42,6 +42,11 @@ class EntityExtractionPromptBuilder(IndexingPromptBuilder):
     entity extraction, you can create a custom implementation of the protocol
     `PromptBuilder` and use it in the `EntityRelationshipExtractor` class.
 
+    Several text units can also be packed in a single prompt, see
+    `prepare_packed_chain_input`. The records of every text unit are then
+    preceded by a marker record that `EntityExtractionOutputParser.parse_packed`
+    uses to split the output back into one graph per text unit.
+
     """
 
     def __init__(
@@ -126,3 +131,30 @@ class EntityExtractionPromptBuilder(IndexingPromptBuilder):
             raise ValueError("text_unit is required")
 
         return dict(input_text=text_unit)
+
+    def prepare_packed_chain_input(
+        self, *, text_units: list[tuple[str, str]]
+    ) -> dict[str, str]:
+        """Prepares the input for the extraction chain from several text units.
+
+        Note:
+            You would not directly use this method.
+            It is used by the `EntityRelationshipExtractor` class.
+
+        Args:
+            text_units: A list of (id, text unit) pairs. The ids are repeated by
+                the language model so short ones save output tokens.
+        """
+        if not text_units:
+            raise ValueError("text_units is required")
+
+        header = DEFAULT_PACKED_INPUT_HEADER.format(
+            text_units_count=len(text_units),
+            tuple_delimiter=self._tuple_delimiter,
+            record_delimiter=self._record_delimiter,
+        )
+        body = "\n".join(
+            f"-Text Unit {text_unit_id}-\n{text_unit}"
+            for text_unit_id, text_unit in text_units
+        )
+        return dict(input_text=f"{header}\n{body}")
@@ -0,0 +1,58 @@
+"""Columnar representation of the extracted entities and relationships."""
+
+from __future__ import annotations
+
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from ._output_parser import EntityRecord, ExtractedRecords, RelationshipRecord
+
+NODES_COLUMNS = [*EntityRecord._fields, "text_unit_id"]
+EDGES_COLUMNS = [*RelationshipRecord._fields, "text_unit_id"]
+
+
+class ExtractionTables(NamedTuple):
+    """Entities and relationships extracted from all the text units.
+
+    Every row is a single record produced by the language model, records
+    are not merged in any way. This is a lot cheaper to hold than one
+    `networkx.Graph` per text unit and is consumed directly by
+    `GraphsMerger.merge_tables`.
+
+    Attributes:
+        nodes: A dataframe with the columns name, type, description and text_unit_id.
+        edges: A dataframe with the columns source, target, description,
+            weight and text_unit_id.
+    """
+
+    nodes: pd.DataFrame
+    edges: pd.DataFrame
+
+    @staticmethod
+    def from_records(
+        records: list[ExtractedRecords],
+        text_unit_ids: list[str],
+    ) -> ExtractionTables:
+        """Accumulates the records of every text unit in a single pair of tables."""
+        nodes = pd.DataFrame.from_records(
+            [entity for r in records for entity in r.entities],
+            columns=list(EntityRecord._fields),
+        )
+        nodes["text_unit_id"] = np.repeat(
+            np.asarray(text_unit_ids, dtype=object),
+            [len(r.entities) for r in records],
+        )
+
+        edges = pd.DataFrame.from_records(
+            [relationship for r in records for relationship in r.relationships],
+            columns=list(RelationshipRecord._fields),
+        )
+        edges["text_unit_id"] = np.repeat(
+            np.asarray(text_unit_ids, dtype=object),
+            [len(r.relationships) for r in records],
+        )
+        edges["weight"] = edges["weight"].astype(float)
+
+        return ExtractionTables(nodes=nodes, edges=edges)
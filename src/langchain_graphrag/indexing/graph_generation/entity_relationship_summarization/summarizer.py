@@ -1,14 +1,30 @@
 from __future__ import annotations
 
+from typing import TYPE_CHECKING, Any
+
 import networkx as nx
 from langchain_core.language_models import LanguageModelLike
 from langchain_core.runnables.config import RunnableConfig
 from tqdm import tqdm
+from tqdm.asyncio import tqdm as atqdm
 
 from langchain_graphrag.types.prompts import IndexingPromptBuilder
+from langchain_graphrag.types.tokens import TokenCounter
+from langchain_graphrag.utils.disk_cache import (
+    DiskCache,
+    make_cache_key,
+    model_identity,
+)
 
 from .prompt_builder import SummarizeDescriptionPromptBuilder
 
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+# a batch always takes at least this many descriptions so that
+# every round strictly reduces the number of descriptions
+_MIN_BATCH_SIZE = 2
+
 
 class EntityRelationshipDescriptionSummarizer:
     def __init__(
@@ -17,56 +33,312 @@ class EntityRelationshipDescriptionSummarizer:
         llm: LanguageModelLike,
         *,
         chain_config: RunnableConfig | None = None,
+        max_concurrency: int | None = None,
+        token_counter: TokenCounter | None = None,
+        concat_token_threshold: int | None = None,
+        max_input_tokens: int | None = None,
+        cache: DiskCache | None = None,
+        model_id: str | None = None,
     ):
+        """Summarizes the descriptions of the entities and relationships of a graph.
+
+        Args:
+            prompt_builder (IndexingPromptBuilder): Builds the summarization prompt.
+            llm (LanguageModelLike): The language model used to summarize.
+            chain_config (RunnableConfig, optional): The configuration object for the
+                summarization chain. Defaults to None.
+            max_concurrency (int, optional): Maximum number of summarization calls kept
+                in flight. Nodes and edges are summarized together. If None,
+                `invoke` summarizes them one at a time and `ainvoke` does not
+                limit the number of concurrent calls. Defaults to None.
+            token_counter (TokenCounter, optional): Counts the tokens of the
+                descriptions. Required by `concat_token_threshold` and
+                `max_input_tokens`. Defaults to None.
+            concat_token_threshold (int, optional): Descriptions that add up to at most
+                this many tokens are joined with new lines instead of being
+                summarized by the language model. Defaults to None.
+            max_input_tokens (int, optional): Maximum number of description tokens sent
+                in a single prompt. Longer description lists are split in batches
+                that are summarized concurrently, the summaries of the batches
+                are then summarized again until a single one is left.
+                Defaults to None.
+            cache (DiskCache, optional): Cache for the summary of every node and edge.
+                The key is made of the name of the node (or edge), its sorted
+                descriptions, the prompt and the model id, so unchanged nodes
+                and edges are not summarized again when re-indexing.
+                Defaults to None.
+            model_id (str, optional): Identifies the language model in the cache key.
+                If None, it is derived from the identifying parameters of `llm`.
+        """
+        if (
+            concat_token_threshold is not None or max_input_tokens is not None
+        ) and token_counter is None:
+            raise ValueError(
+                "concat_token_threshold and max_input_tokens require a token_counter"
+            )
+
         prompt, output_parser = prompt_builder.build()
         self._summarize_chain = prompt | llm | output_parser
+        # the template itself, with every variable left as a placeholder
+        self._prompt_identity = prompt.format(
+            **{name: f"{{{name}}}" for name in prompt.input_variables}
+        )
         self._prompt_builder = prompt_builder
         self._chain_config = chain_config
+        self._max_concurrency = max_concurrency
+        self._token_counter = token_counter
+        self._concat_token_threshold = concat_token_threshold
+        self._max_input_tokens = max_input_tokens
+        self._cache = cache
+        self._model_id = model_id if model_id is not None else model_identity(llm)
 
     @staticmethod
     def build_default(
         llm: LanguageModelLike,
         *,
         chain_config: RunnableConfig | None = None,
+        max_concurrency: int | None = None,
+        token_counter: TokenCounter | None = None,
+        concat_token_threshold: int | None = None,
+        max_input_tokens: int | None = None,
+        cache: DiskCache | None = None,
     ) -> EntityRelationshipDescriptionSummarizer:
         return EntityRelationshipDescriptionSummarizer(
             prompt_builder=SummarizeDescriptionPromptBuilder(),
             llm=llm,
             chain_config=chain_config,
+            max_concurrency=max_concurrency,
+            token_counter=token_counter,
+            concat_token_threshold=concat_token_threshold,
+            max_input_tokens=max_input_tokens,
+            cache=cache,
         )
 
-    def invoke(self, graph: nx.Graph) -> nx.Graph:
-        for node_name, node in tqdm(
-            graph.nodes(data=True), desc="Summarizing entities descriptions"
-        ):
-            if len(node["description"]) == 1:
-                node["description"] = node["description"][0]
-                continue
+    def _batch_config(self) -> RunnableConfig:
+        config: RunnableConfig = {**(self._chain_config or {})}
+        if self._max_concurrency is not None:
+            config["max_concurrency"] = self._max_concurrency
+        return config
 
-            chain_input = self._prompt_builder.prepare_chain_input(
-                entity_name=node_name, description_list=node["description"]
-            )
+    def _count_tokens(self, descriptions: list[str]) -> int:
+        assert self._token_counter is not None
+        return sum(self._token_counter.count_tokens(d) for d in descriptions)
 
-            node["description"] = self._summarize_chain.invoke(
-                input=chain_input,
-                config=self._chain_config,
+    def _cache_key(self, entity_name: str, description_list: list[str]) -> str:
+        # the batching changes what the model is asked to summarize
+        return make_cache_key(
+            entity_name,
+            sorted(description_list),
+            self._prompt_identity,
+            self._model_id,
+            self._max_input_tokens,
+        )
+
+    def _prepare_targets(
+        self, graph: nx.Graph
+    ) -> tuple[list[dict[str, Any]], list[str], list[list[str]], list[str]]:
+        # the attribute dicts of the graph are updated in place once
+        # their summary arrives, whatever the order of completion is
+        targets: list[dict[str, Any]] = []
+        entity_names: list[str] = []
+        descriptions: list[list[str]] = []
+        cache_keys: list[str] = []
+
+        # (name in the prompt, name in the cache key, attributes), the
+        # endpoints of an undirected edge come in the order networkx
+        # iterates them, the cache key must not depend on it
+        elements = [
+            (node_name, node_name, node) for node_name, node in graph.nodes(data=True)
+        ] + [
+            (
+                f"{from_node} -> {to_node}",
+                " -> ".join(
+                    (from_node, to_node)
+                    if graph.is_directed()
+                    else sorted((from_node, to_node))
+                ),
+                edge,
             )
+            for from_node, to_node, edge in graph.edges(data=True)
+        ]
 
-        for from_node, to_node, edge in tqdm(
-            graph.edges(data=True), desc="Summarizing relationship descriptions"
-        ):
-            if len(edge["description"]) == 1:
-                edge["description"] = edge["description"][0]
+        for entity_name, cache_name, attributes in elements:
+            description_list = attributes["description"]
+            if len(description_list) == 1:
+                attributes["description"] = description_list[0]
                 continue
 
-            chain_input = self._prompt_builder.prepare_chain_input(
-                entity_name=f"{from_node} -> {to_node}",
-                description_list=edge["description"],
-            )
+            if (
+                self._concat_token_threshold is not None
+                and self._count_tokens(description_list) <= self._concat_token_threshold
+            ):
+                attributes["description"] = "\n".join(description_list)
+                continue
+
+            cache_key = ""
+            if self._cache is not None:
+                cache_key = self._cache_key(cache_name, description_list)
+                cached_summary = self._cache.get(cache_key)
+                if cached_summary is not None:
+                    attributes["description"] = cached_summary
+                    continue
+
+            targets.append(attributes)
+            entity_names.append(entity_name)
+            descriptions.append(description_list)
+            cache_keys.append(cache_key)
+
+        return targets, entity_names, descriptions, cache_keys
+
+    def _split_descriptions(self, description_list: list[str]) -> list[list[str]]:
+        if self._max_input_tokens is None:
+            return [description_list]
+
+        assert self._token_counter is not None
+        batches: list[list[str]] = []
+        batch: list[str] = []
+        batch_tokens = 0
+        for description in description_list:
+            tokens = self._token_counter.count_tokens(description)
+            if (
+                len(batch) >= _MIN_BATCH_SIZE
+                and batch_tokens + tokens > self._max_input_tokens
+            ):
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+            batch.append(description)
+            batch_tokens += tokens
+        if batch:
+            batches.append(batch)
 
-            edge["description"] = self._summarize_chain.invoke(
-                input=chain_input,
-                config=self._chain_config,
+        # a lone leftover description is merged into the previous batch
+        if len(batches) > 1 and len(batches[-1]) == 1:
+            batches[-2].extend(batches.pop())
+        return batches
+
+    def _prepare_round(
+        self,
+        pending: list[int],
+        entity_names: list[str],
+        descriptions: list[list[str]],
+    ) -> tuple[list[int], list[dict[str, str]]]:
+        owners: list[int] = []
+        chain_inputs: list[dict[str, str]] = []
+        for target in pending:
+            for batch in self._split_descriptions(descriptions[target]):
+                owners.append(target)
+                chain_inputs.append(
+                    self._prompt_builder.prepare_chain_input(
+                        entity_name=entity_names[target],
+                        description_list=batch,
+                    )
+                )
+        return owners, chain_inputs
+
+    def _finish_round(
+        self,
+        owners: list[int],
+        summaries: list[str],
+        targets: list[dict[str, Any]],
+        descriptions: list[list[str]],
+        cache_keys: list[str],
+    ) -> list[int]:
+        # the summaries of the batches of an element replace its
+        # descriptions until a single batch (the final summary) is left
+        partials: dict[int, list[str]] = {}
+        for target, summary in zip(owners, summaries, strict=True):
+            partials.setdefault(target, []).append(summary)
+
+        pending: list[int] = []
+        for target, target_summaries in partials.items():
+            if len(target_summaries) == 1:
+                targets[target]["description"] = target_summaries[0]
+                if self._cache is not None:
+                    self._cache.set(cache_keys[target], target_summaries[0])
+            else:
+                descriptions[target] = target_summaries
+                pending.append(target)
+        return pending
+
+    def _run_jobs(
+        self, chain_inputs: list[dict[str, str]]
+    ) -> Iterator[tuple[int, str]]:
+        if self._max_concurrency is not None and self._max_concurrency > 1:
+            yield from self._summarize_chain.batch_as_completed(
+                chain_inputs,
+                config=self._batch_config(),
             )
+        else:
+            for index, chain_input in enumerate(chain_inputs):
+                yield (
+                    index,
+                    self._summarize_chain.invoke(
+                        input=chain_input,
+                        config=self._chain_config,
+                    ),
+                )
+
+    def invoke(self, graph: nx.Graph) -> nx.Graph:
+        """Summarize the descriptions of the nodes and edges in place.
+
+        Only the `description` attribute is reassigned, the lists of
+        descriptions themselves are never modified, so a shallow copy
+        of a graph can be summarized without affecting the original.
+
+        Parameters:
+            graph (nx.Graph): A graph whose nodes and edges have a list of descriptions.
+
+        Returns:
+            The same graph where every description is a single string.
+        """
+        targets, entity_names, descriptions, cache_keys = self._prepare_targets(graph)
+        pending = list(range(len(targets)))
+
+        with tqdm(total=0, desc="Summarizing descriptions") as pbar:
+            while pending:
+                owners, chain_inputs = self._prepare_round(
+                    pending, entity_names, descriptions
+                )
+                pbar.total += len(chain_inputs)
+                summaries = [""] * len(chain_inputs)
+                for index, summary in self._run_jobs(chain_inputs):
+                    summaries[index] = summary
+                    pbar.update(1)
+                pending = self._finish_round(
+                    owners, summaries, targets, descriptions, cache_keys
+                )
+
+        return graph
+
+    async def ainvoke(self, graph: nx.Graph) -> nx.Graph:
+        """Asynchronously summarize the descriptions of the nodes and edges in place.
+
+        Up to `max_concurrency` summarization calls are kept in flight at any time.
+
+        Parameters:
+            graph (nx.Graph): A graph whose nodes and edges have a list of descriptions.
+
+        Returns:
+            The same graph where every description is a single string.
+        """
+        targets, entity_names, descriptions, cache_keys = self._prepare_targets(graph)
+        pending = list(range(len(targets)))
+
+        with atqdm(total=0, desc="Summarizing descriptions") as pbar:
+            while pending:
+                owners, chain_inputs = self._prepare_round(
+                    pending, entity_names, descriptions
+                )
+                pbar.total += len(chain_inputs)
+                summaries = [""] * len(chain_inputs)
+                async for index, summary in self._summarize_chain.abatch_as_completed(
+                    chain_inputs,
+                    config=self._batch_config(),
+                ):
+                    summaries[index] = summary
+                    pbar.update(1)
+                pending = self._finish_round(
+                    owners, summaries, targets, descriptions, cache_keys
+                )
 
         return graph
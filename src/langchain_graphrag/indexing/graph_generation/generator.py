@@ -1,4 +1,3 @@
-from copy import deepcopy
 from typing import Callable
 
 import networkx as nx
@@ -16,13 +15,31 @@ class GraphGenerator:
         graphs_merger: GraphsMerger,
         er_description_summarizer: EntityRelationshipDescriptionSummarizer,
         graph_sanitizer: Callable[[nx.Graph], nx.Graph] | None = None,
+        *,
+        keep_merged_graph: bool = True,
     ):
+        """Extracts, merges and summarizes the graph of the text units.
+
+        Args:
+            er_extractor (EntityRelationshipExtractor): Extracts a graph from every
+                text unit.
+            graphs_merger (GraphsMerger): Merges the graphs of the text units.
+            er_description_summarizer (EntityRelationshipDescriptionSummarizer):
+                Summarizes the descriptions of the merged graph.
+            graph_sanitizer (Callable[[nx.Graph], nx.Graph], optional): Applied to the
+                merged graph before summarizing it. Defaults to None.
+            keep_merged_graph (bool, optional): If False, the descriptions are
+                summarized in the merged graph itself and no merged graph is
+                returned, which avoids holding the description lists and the
+                summaries at the same time. Defaults to True.
+        """
         self._er_extractor = er_extractor
         self._graphs_merger = graphs_merger
         self._graph_sanitizer = graph_sanitizer
         self._er_description_summarizer = er_description_summarizer
+        self._keep_merged_graph = keep_merged_graph
 
-    def run(self, text_units: pd.DataFrame) -> tuple[nx.Graph, nx.Graph]:
+    def run(self, text_units: pd.DataFrame) -> tuple[nx.Graph | None, nx.Graph]:
         er_graphs = self._er_extractor.invoke(text_units)
         er_merged_graph = self._graphs_merger(er_graphs)
         er_sanitized_graph = (
@@ -30,7 +47,14 @@ class GraphGenerator:
             if self._graph_sanitizer
             else er_merged_graph
         )
+
+        if not self._keep_merged_graph:
+            return None, self._er_description_summarizer.invoke(er_sanitized_graph)
+
+        # The summarizer only replaces the description of every node and
+        # edge, a shallow copy (new attribute dicts, shared values) is
+        # enough to keep the merged graph intact.
         er_summarized_graph = self._er_description_summarizer.invoke(
-            deepcopy(er_sanitized_graph)
+            er_sanitized_graph.copy()
         )
         return er_sanitized_graph, er_summarized_graph
@@ -3,9 +3,37 @@ from random import Random
 from typing import Any
 
 import networkx as nx
+import pandas as pd
 
 from langchain_graphrag.utils.uuid import gen_uuid
 
+from ._merge_engine import (
+    IdScheme,
+    groupby_merge,
+    make_edge_id,
+    make_node_id,
+    parallel_merge,
+)
+from .entity_relationship_extraction.tables import ExtractionTables
+
+
+class MergeEngine(str, Enum):
+    """How `GraphsMerger` merges the graphs of the text units.
+
+    - fold: merges the graphs one by one into the merged graph.
+    - groupby: concatenates the nodes and edges of all the graphs and
+      aggregates them with a single group-by. The merged graph is
+      identical to the one of `fold` but repeated nodes and edges
+      are a lot cheaper to merge.
+    - parallel: splits the graphs in shards, aggregates every shard like
+      `groupby` in a process pool and reduces the partial results
+      pairwise. The merged graph is identical to the one of `fold`.
+    """
+
+    fold = "fold"
+    groupby = "groupby"
+    parallel = "parallel"
+
 
 class AttributesToMerge(str, Enum):
     text_unit_ids = "text_unit_ids"
@@ -61,19 +89,168 @@ def merge_edges(*, target_graph: nx.Graph, sub_graph: nx.Graph):
             )
 
 
+def _sorted_distinct(
+    frame: pd.DataFrame,
+    keys: list[str],
+    column: str,
+) -> pd.Series:
+    # sorting once and dropping the duplicates is a lot cheaper
+    # than a python level sorted(set(...)) per group
+    distinct = (
+        frame[[*keys, column]].drop_duplicates().sort_values(column, kind="stable")
+    )
+    return distinct.groupby(keys, sort=False)[column].agg(list)
+
+
+def _undirected_edge_keys(edges: pd.DataFrame) -> pd.DataFrame:
+    source, target = edges["source"], edges["target"]
+    in_order = source <= target
+    return edges.assign(
+        key_source=source.where(in_order, target),
+        key_target=target.where(in_order, source),
+    )
+
+
+def _merge_node_tables(nodes: pd.DataFrame) -> pd.DataFrame:
+    grouped = nodes.groupby("name", sort=False)
+
+    # the first non empty type, entities that only appear in
+    # relationships have an empty type
+    types = (
+        nodes[nodes["type"] != ""]
+        .groupby("name", sort=False)["type"]
+        .first()
+        .reindex(grouped.size().index, fill_value="")
+    )
+
+    merged = pd.DataFrame(
+        {
+            "type": types,
+            "description": _sorted_distinct(nodes, ["name"], "description"),
+            "text_unit_ids": _sorted_distinct(nodes, ["name"], "text_unit_id"),
+        }
+    )
+    return merged.reset_index()
+
+
+def _merge_edge_tables(edges: pd.DataFrame) -> pd.DataFrame:
+    edges = _undirected_edge_keys(edges)
+    keys = ["key_source", "key_target"]
+    grouped = edges.groupby(keys, sort=False)
+
+    merged = pd.DataFrame(
+        {
+            # keep the orientation in which the edge was first seen
+            "source": grouped["source"].first(),
+            "target": grouped["target"].first(),
+            "weight": grouped["weight"].sum(),
+            "description": _sorted_distinct(edges, keys, "description"),
+            "text_unit_ids": _sorted_distinct(edges, keys, "text_unit_id"),
+        }
+    )
+    return merged.reset_index(drop=True)
+
+
 class GraphsMerger:
-    def __init__(self, seed: int = 0xF001):
+    def __init__(
+        self,
+        seed: int = 0xF001,
+        *,
+        engine: MergeEngine = MergeEngine.fold,
+        shard_size: int = 2000,
+        max_workers: int | None = None,
+        id_scheme: IdScheme = IdScheme.random,
+    ):
+        """Merges the graphs extracted from the text units.
+
+        Args:
+            seed (int, optional): Seed used to generate the ids of nodes and edges.
+            engine (MergeEngine, optional): How the graphs are merged.
+                Defaults to MergeEngine.fold.
+            shard_size (int, optional): Number of graphs merged by a worker
+                process, only used by MergeEngine.parallel. Defaults to 2000.
+            max_workers (int, optional): Number of worker processes, only used
+                by MergeEngine.parallel. Defaults to the number of CPUs.
+            id_scheme (IdScheme, optional): How the ids of nodes and edges are
+                made. IdScheme.content keeps them the same across indexing runs,
+                which is what incremental upserts need, but they differ from the
+                ids of artifacts indexed with IdScheme.random.
+                Defaults to IdScheme.random.
+        """
         self._seed = seed
+        self._engine = engine
+        self._shard_size = shard_size
+        self._max_workers = max_workers
+        self._id_scheme = id_scheme
 
     def __call__(
         self,
         graphs: list[nx.Graph],
     ) -> nx.Graph:
+        if self._engine == MergeEngine.groupby:
+            return groupby_merge(graphs, self._seed, id_scheme=self._id_scheme)
+
+        if self._engine == MergeEngine.parallel:
+            return parallel_merge(
+                graphs,
+                self._seed,
+                shard_size=self._shard_size,
+                max_workers=self._max_workers,
+                id_scheme=self._id_scheme,
+            )
+
         merged_graph: nx.Graph = nx.Graph()
         for g in graphs:
             merge_nodes(target_graph=merged_graph, sub_graph=g)
             merge_edges(target_graph=merged_graph, sub_graph=g)
 
+        return self._add_degree_rank_and_ids(merged_graph)
+
+    def merge_tables(self, tables: ExtractionTables) -> nx.Graph:
+        """Merge the records produced by `EntityRelationshipExtractor.invoke_as_tables`.
+
+        All the records of a node (or of an edge) are aggregated with
+        a single group-by instead of merging one graph per text unit.
+        The descriptions and the text unit ids are sorted and made
+        distinct, the weights of the edges are summed up and the type
+        of a node is the first non empty one.
+
+        Nodes and edges are added to the graph in the order they are
+        first seen in the tables.
+        """
+        nodes = _merge_node_tables(tables.nodes)
+        edges = _merge_edge_tables(tables.edges)
+
+        merged_graph: nx.Graph = nx.Graph()
+        merged_graph.add_nodes_from(
+            (name, dict(type=type_, description=description, text_unit_ids=ids))
+            for name, type_, description, ids in zip(
+                nodes["name"],
+                nodes["type"],
+                nodes["description"],
+                nodes["text_unit_ids"],
+                strict=True,
+            )
+        )
+        merged_graph.add_edges_from(
+            (
+                source,
+                target,
+                dict(weight=weight, description=description, text_unit_ids=ids),
+            )
+            for source, target, weight, description, ids in zip(
+                edges["source"],
+                edges["target"],
+                edges["weight"],
+                edges["description"],
+                edges["text_unit_ids"],
+                strict=True,
+            )
+        )
+
+        return self._add_degree_rank_and_ids(merged_graph)
+
+    def _add_degree_rank_and_ids(self, merged_graph: nx.Graph) -> nx.Graph:
         # add degree as an attribute
         for node_degree in merged_graph.degree:
             merged_graph.nodes[str(node_degree[0])]["degree"] = int(node_degree[1])
@@ -88,15 +265,22 @@ class GraphsMerger:
             merged_graph.edges[source, target]["rank"] = source_degree + target_degree
 
         random = Random(self._seed)  # noqa: S311
+        content_ids = self._id_scheme == IdScheme.content
 
         # add ids to nodes
         for index, node in enumerate(merged_graph.nodes()):
             merged_graph.nodes[node]["human_readable_id"] = index
-            merged_graph.nodes[node]["id"] = str(gen_uuid(random))
+            merged_graph.nodes[node]["id"] = (
+                make_node_id(self._seed, node) if content_ids else str(gen_uuid(random))
+            )
 
         # add ids to edges
         for index, edge in enumerate(merged_graph.edges()):
             merged_graph.edges[edge]["human_readable_id"] = index
-            merged_graph.edges[edge]["id"] = str(gen_uuid(random))
+            merged_graph.edges[edge]["id"] = (
+                make_edge_id(self._seed, *edge)
+                if content_ids
+                else str(gen_uuid(random))
+            )
 
         return merged_graph
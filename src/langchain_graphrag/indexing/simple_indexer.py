@@ -5,6 +5,9 @@ etc to index a document.
 
 """
 
+from functools import partial
+from pathlib import Path
+
 from langchain_core.documents import Document
 
 from langchain_graphrag.types.graphs.community import CommunityDetector
@@ -13,6 +16,7 @@ from .artifacts import IndexerArtifacts
 from .artifacts_generation import (
     CommunitiesReportsArtifactsGenerator,
     EntitiesArtifactsGenerator,
+    LazyGraphEmbeddings,
     RelationshipsArtifactsGenerator,
     TextUnitsArtifactsGenerator,
 )
@@ -30,6 +34,8 @@ class SimpleIndexer:
         relationships_artifacts_generator: RelationshipsArtifactsGenerator,
         communities_report_artifacts_generator: CommunitiesReportsArtifactsGenerator,
         text_units_artifacts_generator: TextUnitsArtifactsGenerator,
+        *,
+        graph_embeddings_dir: Path | None = None,
     ):
         self._text_unit_extractor = text_unit_extractor
         self._graph_generator = graph_generator
@@ -40,6 +46,7 @@ class SimpleIndexer:
             communities_report_artifacts_generator
         )
         self._text_units_artifacts_generator = text_units_artifacts_generator
+        self._graph_embeddings_dir = graph_embeddings_dir
 
     def run(self, documents: list[Document]) -> IndexerArtifacts:
         # Step 1 - Text Unit extraction
@@ -63,6 +70,16 @@ class SimpleIndexer:
             summarized_graph,
         )
 
+        # graph embeddings are only computed when they are asked for
+        graph_embeddings = LazyGraphEmbeddings(
+            partial(
+                self._entities_artifacts_generator.generate_graph_embeddings,
+                summarized_graph,
+            ),
+            cache_dir=self._graph_embeddings_dir,
+            graph=summarized_graph,
+        )
+
         # Step 6 - Relationships generation (depends on Step 2)
         df_relationships = self._relationships_artifacts_generator.run(summarized_graph)
 
@@ -81,4 +98,5 @@ class SimpleIndexer:
             summarized_graph=summarized_graph,
             merged_graph=merged_graph,
             communities=community_detection_result,
+            graph_embeddings=graph_embeddings,
         )
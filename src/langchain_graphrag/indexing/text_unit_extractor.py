@@ -1,13 +1,24 @@
 """A module to extract text units from the document."""
 
+from __future__ import annotations
+
+import itertools
 import uuid
-from typing import TypedDict
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, TypedDict
 
 import pandas as pd
 from langchain_core.documents import Document
 from langchain_text_splitters import TextSplitter
 from tqdm import tqdm
 
+from langchain_graphrag.utils.uuid import gen_content_uuid
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
 
 class _TextUnit(TypedDict):
     id: str
@@ -15,26 +26,123 @@ class _TextUnit(TypedDict):
     text_unit: str
 
 
+_COLUMNS = ["document_id", "id", "text_unit"]
+
+
 class TextUnitExtractor:
-    def __init__(self, text_splitter: TextSplitter):
-        self._text_splitter = text_splitter
+    def __init__(
+        self,
+        text_splitter: TextSplitter,
+        *,
+        max_workers: int | None = None,
+        chunksize: int = 8,
+        content_ids: bool = False,
+    ):
+        """Splits the documents in text units.
 
-    def run(self, documents: list[Document]) -> pd.DataFrame:
-        response: list[_TextUnit] = []
+        Args:
+            text_splitter (TextSplitter): Splits the content of a document.
+            max_workers (int, optional): If greater than 1, the documents are split
+                in a pool of that many processes. The text splitter must then be
+                picklable. Defaults to None.
+            chunksize (int, optional): Number of documents sent to a worker process
+                at once. Defaults to 8.
+            content_ids (bool, optional): If True, the ids are derived from the content
+                instead of being random. A document without an id gets one made
+                from its content and a text unit gets one made from the id of
+                its document and its text, so re-indexing the same documents
+                gives the same ids. Defaults to False.
+        """
+        self._text_splitter = text_splitter
+        self._max_workers = max_workers
+        self._chunksize = chunksize
+        self._content_ids = content_ids
 
-        # TODO: Parallize this
-        for document in tqdm(documents, desc="Processing documents ..."):
-            text_units = self._text_splitter.split_text(document.page_content)
+    def _split_documents(
+        self,
+        documents: Iterable[Document],
+        executor: Executor | None,
+    ) -> Iterator[tuple[Document, list[str]]]:
+        if executor is None:
+            for document in documents:
+                yield document, self._text_splitter.split_text(document.page_content)
+            return
 
-            document_id = document.id if document.id else str(uuid.uuid4())
+        # documents are submitted a window at a time so that only a
+        # bounded number of them (and of their text units) is in memory
+        window_size = self._chunksize * (self._max_workers or 1) * 2
+        documents_iter = iter(documents)
+        while window := list(itertools.islice(documents_iter, window_size)):
+            yield from zip(
+                window,
+                executor.map(
+                    self._text_splitter.split_text,
+                    [document.page_content for document in window],
+                    chunksize=self._chunksize,
+                ),
+                strict=True,
+            )
 
-            for t in tqdm(text_units, desc="Extracting text units ..."):
-                response.append(  # noqa: PERF401
-                    _TextUnit(
+    def _iter_text_units(
+        self,
+        documents: Iterable[Document],
+        executor: Executor | None,
+    ) -> Iterator[_TextUnit]:
+        for document, text_units in self._split_documents(documents, executor):
+            if not self._content_ids:
+                document_id = document.id or str(uuid.uuid4())
+                for t in text_units:
+                    yield _TextUnit(
                         document_id=document_id,
                         id=str(uuid.uuid4()),
                         text_unit=t,
                     )
+                continue
+
+            document_id = document.id or gen_content_uuid(document.page_content)
+            # the same text can appear more than once in a document
+            occurrences: Counter[str] = Counter()
+            for t in text_units:
+                occurrences[t] += 1
+                yield _TextUnit(
+                    document_id=document_id,
+                    id=gen_content_uuid(document_id, t, str(occurrences[t])),
+                    text_unit=t,
                 )
 
-        return pd.DataFrame.from_records(response)
+    def iter_batches(
+        self,
+        documents: Iterable[Document],
+        batch_size: int = 1000,
+    ) -> Iterator[pd.DataFrame]:
+        """Split the documents lazily and yield the text units in batches.
+
+        Only the documents of the batch being built are held in memory,
+        so the text units can be processed (e.g. extracted) while the
+        rest of the documents is still being split.
+
+        Args:
+            documents (Iterable[Document]): The documents, possibly a generator.
+            batch_size (int, optional): Maximum number of text units per batch.
+                Defaults to 1000.
+
+        Returns:
+            An iterator over dataframes with the columns document_id, id and text_unit.
+        """
+        executor: Executor | None = None
+        if self._max_workers is not None and self._max_workers > 1:
+            executor = ProcessPoolExecutor(max_workers=self._max_workers)
+
+        with executor if executor is not None else nullcontext():
+            text_units = self._iter_text_units(
+                tqdm(documents, desc="Processing documents ..."),
+                executor,
+            )
+            while batch := list(itertools.islice(text_units, batch_size)):
+                yield pd.DataFrame.from_records(batch, columns=_COLUMNS)
+
+    def run(self, documents: list[Document]) -> pd.DataFrame:
+        batches = list(self.iter_batches(documents, batch_size=10_000))
+        if not batches:
+            return pd.DataFrame(columns=_COLUMNS)
+        return pd.concat(batches, ignore_index=True)
@@ -1,9 +1,12 @@
 import itertools
 import logging
+import weakref
 from typing import NamedTuple
 
 import pandas as pd
 
+from langchain_graphrag.utils.csr_graph import CSRGraph
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -146,20 +149,50 @@ def _find_out_network_relationships(
 class RelationshipsSelector:
     def __init__(self, top_k_out_network: int = 5):
         self._top_k_out_network = top_k_out_network
+        # the graph of the relationships table it was built from
+        self._graph_of: tuple[weakref.ref[pd.DataFrame], CSRGraph] | None = None
+
+    def _relationships_graph(self, df_relationships: pd.DataFrame) -> CSRGraph:
+        if self._graph_of is not None and self._graph_of[0]() is df_relationships:
+            return self._graph_of[1]
+
+        graph = CSRGraph.from_edges(
+            df_relationships["source_id"].tolist(),
+            df_relationships["target_id"].tolist(),
+        )
+        self._graph_of = (weakref.ref(df_relationships), graph)
+        return graph
+
+    def _incident_relationships(
+        self,
+        df_entities: pd.DataFrame,
+        df_relationships: pd.DataFrame,
+    ) -> pd.DataFrame:
+        # both in and out network relationships have at least one of the
+        # selected entities as an endpoint, every other one is skipped
+        # without being looked at. Edge i is the i-th relationship.
+        graph = self._relationships_graph(df_relationships)
+        nodes = graph.node_ids(df_entities["id"].tolist())
+        edges = graph.incident_edges(nodes[nodes >= 0])
+        return df_relationships.iloc[edges]
 
     def run(
         self,
         df_entities: pd.DataFrame,
         df_relationships: pd.DataFrame,
     ) -> RelationshipsSelectionResult:
+        df_incident_relationships = self._incident_relationships(
+            df_entities, df_relationships
+        )
+
         in_network_relationships = _find_in_network_relationships(
             df_entities,
-            df_relationships.copy(deep=True),
+            df_incident_relationships.copy(deep=True),
         )
 
         out_network_relationships = _find_out_network_relationships(
             df_entities,
-            df_relationships.copy(deep=True),
+            df_incident_relationships.copy(deep=True),
             top_k=self._top_k_out_network,
         )
 
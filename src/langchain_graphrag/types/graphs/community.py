@@ -1,11 +1,23 @@
+from __future__ import annotations
+
 from dataclasses import dataclass
-from typing import NewType, Protocol
+from typing import TYPE_CHECKING, Any, NewType, Protocol
 
 import networkx as nx
+import numpy as np
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Sequence
+    from pathlib import Path
+
+    from langchain_graphrag.utils.csr_graph import CSRGraph
 
 CommunityId = NewType("CommunityId", int)
 CommunityLevel = NewType("CommunityLevel", int)
 
+_NO_PARENT = -1
+_COLUMNS = ("levels", "community_ids", "node_codes", "parent_ids", "is_final")
+
 
 @dataclass
 class CommunityNode:
@@ -20,13 +32,297 @@ class Community:
     nodes: list[CommunityNode]
 
 
-@dataclass
+def _community_groups(
+    levels: np.ndarray,
+    community_ids: np.ndarray,
+) -> Iterator[tuple[int, int, np.ndarray]]:
+    # (level, community id, rows) of every community, communities in
+    # the order they are first seen and rows in their original order
+    keys = levels.astype(np.int64) << 32 | community_ids.astype(np.int64)
+    _, first_rows, group_of_row = np.unique(
+        keys, return_index=True, return_inverse=True
+    )
+    rank = np.empty_like(first_rows)
+    rank[np.argsort(first_rows, kind="stable")] = np.arange(len(first_rows))
+    group_of_row = rank[group_of_row.reshape(-1)]
+    rows = np.argsort(group_of_row, kind="stable")
+    boundaries = np.flatnonzero(np.diff(group_of_row[rows])) + 1
+    for group in np.split(rows, boundaries) if len(rows) else []:
+        yield int(levels[group[0]]), int(community_ids[group[0]]), group
+
+
 class CommunityDetectionResult:
-    communities: dict[CommunityLevel, dict[CommunityId, Community]]
+    """Memberships of the nodes in the communities of every level.
+
+    Every membership (a node in a community at a level) is a row of a few
+    NumPy columns, the names of the nodes are interned. The nested
+    `communities` mapping of `Community` objects is only built when it is
+    asked for, the indexes (node to communities, community to members
+    and parent to children) are built once on first use.
+
+    Attributes:
+        node_names: Name of every node, `node_codes` index into it.
+        levels: Level of every membership.
+        community_ids: Community of every membership.
+        node_codes: Node of every membership.
+        parent_ids: Parent community of every membership, -1 if there is none.
+        is_final: Whether the community of a membership is not split any further.
+    """
+
+    __slots__ = (
+        "_children",
+        "_communities",
+        "_members",
+        "_node_communities",
+        "community_ids",
+        "is_final",
+        "levels",
+        "node_codes",
+        "node_names",
+        "parent_ids",
+    )
+
+    def __init__(
+        self,
+        communities: dict[CommunityLevel, dict[CommunityId, Community]] | None = None,
+    ):
+        self.communities = communities or {}
+
+    def _set_communities(
+        self,
+        communities: dict[CommunityLevel, dict[CommunityId, Community]],
+    ) -> None:
+        rows = [
+            (level, community.id, node.name, node.parent_cluster, node.is_final_cluster)
+            for level, level_communities in communities.items()
+            for community in level_communities.values()
+            for node in community.nodes
+        ]
+        names = [row[2] for row in rows]
+        node_names = list(dict.fromkeys(names))
+        node_index = {name: code for code, name in enumerate(node_names)}
+        self._set_columns(
+            node_names=node_names,
+            levels=[row[0] for row in rows],
+            community_ids=[row[1] for row in rows],
+            node_codes=[node_index[name] for name in names],
+            parent_ids=[_NO_PARENT if row[3] is None else row[3] for row in rows],
+            is_final=[row[4] for row in rows],
+        )
+
+    def _set_columns(
+        self,
+        *,
+        node_names: Sequence[str] | np.ndarray,
+        levels: Sequence[int] | np.ndarray,
+        community_ids: Sequence[int] | np.ndarray,
+        node_codes: Sequence[int] | np.ndarray,
+        parent_ids: Sequence[int] | np.ndarray,
+        is_final: Sequence[bool] | np.ndarray,
+    ) -> None:
+        self.node_names = np.asarray(node_names, dtype=object)
+        self.levels = np.asarray(levels, dtype=np.int16)
+        self.community_ids = np.asarray(community_ids, dtype=np.int32)
+        self.node_codes = np.asarray(node_codes, dtype=np.int32)
+        self.parent_ids = np.asarray(parent_ids, dtype=np.int32)
+        self.is_final = np.asarray(is_final, dtype=bool)
+        self._communities: dict[CommunityLevel, dict[CommunityId, Community]] | None
+        self._communities = None
+        self._node_communities: dict[str, list[CommunityId]] | None = None
+        self._members: dict[tuple[int, int], list[str]] | None = None
+        self._children: dict[int, list[CommunityId]] | None = None
+
+    @staticmethod
+    def from_memberships(
+        *,
+        node_names: Sequence[str] | np.ndarray,
+        levels: Sequence[int] | np.ndarray,
+        community_ids: Sequence[int] | np.ndarray,
+        node_codes: Sequence[int] | np.ndarray,
+        parent_ids: Sequence[int] | np.ndarray,
+        is_final: Sequence[bool] | np.ndarray,
+    ) -> CommunityDetectionResult:
+        """Build the result from its columns, see the class attributes."""
+        result = CommunityDetectionResult.__new__(CommunityDetectionResult)
+        result.__setstate__(
+            {
+                "node_names": node_names,
+                "levels": levels,
+                "community_ids": community_ids,
+                "node_codes": node_codes,
+                "parent_ids": parent_ids,
+                "is_final": is_final,
+            }
+        )
+        return result
+
+    def __eq__(self, other: object) -> bool:
+        """Results are equal if they have the same communities."""
+        if not isinstance(other, CommunityDetectionResult):
+            return NotImplemented
+        return self.communities == other.communities
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __getstate__(self) -> dict[str, Any]:
+        """The columns, the indexes are rebuilt on demand."""
+        return {"node_names": self.node_names.tolist()} | {
+            column: getattr(self, column) for column in _COLUMNS
+        }
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        """Restore the columns, or the communities of a result pickled before.
+
+        Results used to be a dataclass with a single `communities`
+        field, their pickles are still loaded.
+        """
+        if "communities" in state:
+            self._set_communities(state["communities"])
+        else:
+            self._set_columns(**state)
+
+    @property
+    def communities(self) -> dict[CommunityLevel, dict[CommunityId, Community]]:
+        """The communities of every level, in the order they were found.
+
+        Setting them replaces every membership of the result.
+        """
+        if self._communities is None:
+            communities: dict[CommunityLevel, dict[CommunityId, Community]] = {}
+            names = self.node_names[self.node_codes].tolist()
+            parents = self.parent_ids.tolist()
+            is_final = self.is_final.tolist()
+            for level, community_id, rows in _community_groups(
+                self.levels, self.community_ids
+            ):
+                communities.setdefault(CommunityLevel(level), {})[
+                    CommunityId(community_id)
+                ] = Community(
+                    id=CommunityId(community_id),
+                    nodes=[
+                        CommunityNode(
+                            name=names[row],
+                            parent_cluster=None
+                            if parents[row] == _NO_PARENT
+                            else CommunityId(parents[row]),
+                            is_final_cluster=is_final[row],
+                        )
+                        for row in rows.tolist()
+                    ],
+                )
+            self._communities = communities
+        return self._communities
+
+    @communities.setter
+    def communities(
+        self,
+        communities: dict[CommunityLevel, dict[CommunityId, Community]],
+    ) -> None:
+        self._set_communities(communities)
 
     def communities_at_level(self, level: CommunityLevel) -> list[Community]:
         return list(self.communities[level].values())
 
+    def membership_at_level(self, level: CommunityLevel) -> dict[str, CommunityId]:
+        """The community of every node at a level."""
+        at_level = self.levels == level
+        return dict(
+            zip(
+                self.node_names[self.node_codes[at_level]].tolist(),
+                map(CommunityId, self.community_ids[at_level].tolist()),
+                strict=True,
+            )
+        )
+
+    def node_communities(self) -> dict[str, list[CommunityId]]:
+        """The communities of every node, ordered by level."""
+        if self._node_communities is None and len(self.node_codes) == 0:
+            self._node_communities = {}
+        if self._node_communities is None:
+            level_rank = {
+                level: rank
+                for rank, level in enumerate(dict.fromkeys(self.levels.tolist()))
+            }
+            ranks = np.array([level_rank[level] for level in self.levels.tolist()])
+            rows = np.lexsort((ranks, self.node_codes))
+            codes, ids = self.node_codes[rows], self.community_ids[rows].tolist()
+            boundaries = (np.flatnonzero(np.diff(codes)) + 1).tolist()
+            starts, ends = [0, *boundaries], [*boundaries, len(rows)]
+            self._node_communities = {
+                self.node_names[codes[start]]: [
+                    CommunityId(community_id) for community_id in ids[start:end]
+                ]
+                for start, end in zip(starts, ends, strict=True)
+            }
+        return self._node_communities
+
+    def members(self, level: CommunityLevel, community_id: CommunityId) -> list[str]:
+        """Names of the nodes of a community."""
+        if self._members is None:
+            names = self.node_names[self.node_codes]
+            self._members = {
+                (level, community_id): names[rows].tolist()
+                for level, community_id, rows in _community_groups(
+                    self.levels, self.community_ids
+                )
+            }
+        return self._members.get((int(level), int(community_id)), [])
+
+    def children(self, community_id: CommunityId) -> list[CommunityId]:
+        """Communities that a community was split into at the next level."""
+        if self._children is None:
+            children: dict[int, list[CommunityId]] = {}
+            has_parent = self.parent_ids != _NO_PARENT
+            pairs = dict.fromkeys(
+                zip(
+                    self.parent_ids[has_parent].tolist(),
+                    self.community_ids[has_parent].tolist(),
+                    strict=True,
+                )
+            )
+            for parent, child in pairs:
+                children.setdefault(parent, []).append(CommunityId(child))
+            self._children = children
+        return self._children.get(int(community_id), [])
+
+    def changed_communities(
+        self,
+        previous: CommunityDetectionResult,
+    ) -> list[tuple[CommunityLevel, CommunityId]]:
+        """Communities whose members differ from the same community in `previous`.
+
+        New communities are included, communities that only exist in
+        `previous` are not.
+        """
+        return [
+            (level, community_id)
+            for level, communities in self.communities.items()
+            for community_id in communities
+            if set(self.members(level, community_id))
+            != set(previous.members(level, community_id))
+        ]
+
+    def save(self, path: Path) -> None:
+        """Save the columns in a compressed `.npz` file."""
+        np.savez_compressed(
+            path,
+            node_names=self.node_names.astype(str),
+            **{column: getattr(self, column) for column in _COLUMNS},
+        )
+
+    @staticmethod
+    def load(path: Path) -> CommunityDetectionResult:
+        """Load a result saved with `save`."""
+        with np.load(path, allow_pickle=False) as data:
+            return CommunityDetectionResult.from_memberships(
+                node_names=data["node_names"].tolist(),
+                **{column: data[column] for column in _COLUMNS},
+            )
+
 
 class CommunityDetector(Protocol):
-    def run(self, graph: nx.Graph) -> CommunityDetectionResult: ...
+    def run(
+        self,
+        graph: nx.Graph | CSRGraph,
+        previous: CommunityDetectionResult | None = None,
+    ) -> CommunityDetectionResult: ...
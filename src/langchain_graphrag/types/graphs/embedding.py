@@ -1,8 +1,173 @@
-from typing import Protocol
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, NamedTuple, Protocol
 
 import networkx as nx
 import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping, Sequence
+    from pathlib import Path
+
+_VECTORS_FILE = "vectors.npy"
+_IDS_FILE = "ids.npy"
+_SCALES_FILE = "scales.npy"
 
 
 class GraphEmbeddingGenerator(Protocol):
     def run(self, graph: nx.Graph) -> dict[str, np.ndarray]: ...
+
+
+class GraphEmbeddingUpdate(NamedTuple):
+    """Embeddings after an incremental update.
+
+    Attributes:
+        embeddings: Embedding of every node, sorted by name.
+        updated_nodes: Nodes embedded by this update.
+        propagated_nodes: Nodes embedded incrementally since the last full run.
+        drift: Share of the embeddings that were not made by a full run.
+        needs_full_rebuild: Whether the drift went over the allowed maximum.
+    """
+
+    embeddings: dict[str, np.ndarray]
+    updated_nodes: list[str]
+    propagated_nodes: frozenset[str]
+    drift: float
+    needs_full_rebuild: bool
+
+
+class EmbeddingMatrix:
+    """Embeddings of the entities as one contiguous matrix.
+
+    Row `i` of `vectors` is the embedding of the entity `ids[i]`. The
+    vectors are float32, or int8 with a float32 scale per row when the
+    matrix is quantized.
+
+    Attributes:
+        ids: Entity id of every row.
+        vectors: The (number of entities, dimensions) matrix.
+        scales: Scale of every row of a quantized matrix, None otherwise.
+    """
+
+    __slots__ = ("_row_index", "ids", "scales", "vectors")
+
+    def __init__(
+        self,
+        ids: Sequence[str] | np.ndarray,
+        vectors: np.ndarray,
+        scales: np.ndarray | None = None,
+    ):
+        self.ids = np.asarray(ids)
+        self.vectors = vectors
+        self.scales = scales
+        self._row_index: pd.Index | None = None
+
+    @staticmethod
+    def from_embeddings(
+        embeddings: Mapping[str, np.ndarray],
+        ids: Mapping[str, str] | None = None,
+    ) -> EmbeddingMatrix:
+        """Stack embeddings keyed by node name.
+
+        Args:
+            embeddings (Mapping[str, np.ndarray]): Embedding of every node, e.g. the
+                output of a `GraphEmbeddingGenerator`.
+            ids (Mapping[str, str], optional): Entity id of every node name. If None,
+                the rows are indexed by the node names. Defaults to None.
+        """
+        names = list(embeddings)
+        if not names:
+            return EmbeddingMatrix([], np.zeros((0, 0), dtype=np.float32))
+        return EmbeddingMatrix(
+            [ids[name] for name in names] if ids is not None else names,
+            np.stack([embeddings[name] for name in names]).astype(
+                np.float32, copy=False
+            ),
+        )
+
+    def __len__(self) -> int:
+        """Number of rows."""
+        return len(self.ids)
+
+    def __contains__(self, entity_id: object) -> bool:
+        """Whether an entity has a row."""
+        return entity_id in self.row_index
+
+    @property
+    def dimensions(self) -> int:
+        return self.vectors.shape[1]
+
+    @property
+    def is_quantized(self) -> bool:
+        return self.scales is not None
+
+    @property
+    def row_index(self) -> pd.Index:
+        """Row of every entity id."""
+        if self._row_index is None:
+            self._row_index = pd.Index(self.ids)
+        return self._row_index
+
+    def quantized(self) -> EmbeddingMatrix:
+        """Symmetric int8 quantization with one scale per row."""
+        if self.is_quantized:
+            return self
+        scales = np.abs(self.vectors).max(axis=1, initial=0) / 127
+        scales = np.where(scales == 0, 1, scales).astype(np.float32)
+        vectors = np.rint(self.vectors / scales[:, None]).astype(np.int8)
+        return EmbeddingMatrix(self.ids, vectors, scales)
+
+    def take(self, entity_ids: Sequence[str]) -> np.ndarray:
+        """Float32 embeddings of the given entities, in their order."""
+        rows = self.row_index.get_indexer(list(entity_ids))
+        if (rows < 0).any():
+            missing = np.asarray(entity_ids, dtype=object)[rows < 0].tolist()
+            msg = f"No graph embedding for {missing}"
+            raise KeyError(msg)
+        return self._dequantize(self.vectors[rows], rows)
+
+    def get(self, entity_id: str) -> np.ndarray | None:
+        """Float32 embedding of an entity, None if it has none."""
+        if entity_id not in self:
+            return None
+        return self.take([entity_id])[0]
+
+    def to_dense(self) -> np.ndarray:
+        """The whole float32 matrix."""
+        return self._dequantize(self.vectors, np.arange(len(self)))
+
+    def _dequantize(self, vectors: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        if self.scales is None:
+            return np.asarray(vectors, dtype=np.float32)
+        return vectors.astype(np.float32) * self.scales[rows, None]
+
+    def save(self, directory: Path) -> None:
+        """Save the matrix as `.npy` files in a directory.
+
+        The files of a matrix saved there before are replaced, the scales
+        of an earlier quantized matrix are removed.
+        """
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / _VECTORS_FILE, np.ascontiguousarray(self.vectors))
+        np.save(directory / _IDS_FILE, self.ids.astype(str))
+        if self.scales is not None:
+            np.save(directory / _SCALES_FILE, self.scales)
+        else:
+            (directory / _SCALES_FILE).unlink(missing_ok=True)
+
+    @staticmethod
+    def load(directory: Path, *, mmap: bool = True) -> EmbeddingMatrix:
+        """Load a matrix saved with `save`.
+
+        Args:
+            directory (Path): The directory given to `save`.
+            mmap (bool, optional): Memory map the vectors instead of reading them.
+                Defaults to True.
+        """
+        scales_file = directory / _SCALES_FILE
+        return EmbeddingMatrix(
+            np.load(directory / _IDS_FILE),
+            np.load(directory / _VECTORS_FILE, mmap_mode="r" if mmap else None),
+            np.load(scales_file) if scales_file.exists() else None,
+        )
@@ -1,6 +1,20 @@
 """Misc utility functions for the GraphRAG project."""
 
+from .content_hash_index import ContentHashIndex
+from .csr_graph import CSRGraph
+from .disk_cache import DiskCache, make_cache_key, model_identity
+from .text_dedup import TextDeduplicator
 from .token_counter import TiktokenCounter
-from .uuid import gen_uuid
+from .uuid import gen_content_uuid, gen_uuid
 
-__all__ = ["TiktokenCounter", "gen_uuid"]
+__all__ = [
+    "CSRGraph",
+    "ContentHashIndex",
+    "DiskCache",
+    "TextDeduplicator",
+    "TiktokenCounter",
+    "gen_content_uuid",
+    "gen_uuid",
+    "make_cache_key",
+    "model_identity",
+]
@@ -0,0 +1,55 @@
+"""Content hashes of the texts written to a vector store."""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+
+
+class ContentHashIndex:
+    """Maps every id written to a vector store to the hash of its content.
+
+    The index lives in a JSON file next to the vector store so that a
+    later indexing run knows which texts are already embedded and which
+    ids are gone. Saves are atomic.
+    """
+
+    def __init__(self, path: Path):
+        self._path = path
+        self._hashes: dict[str, str] = (
+            json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+        )
+
+    def __len__(self) -> int:
+        """Number of ids in the index."""
+        return len(self._hashes)
+
+    def get(self, text_id: str) -> str | None:
+        return self._hashes.get(text_id)
+
+    def ids(self) -> set[str]:
+        return set(self._hashes)
+
+    def update(self, hashes: Mapping[str, str]) -> None:
+        self._hashes.update(hashes)
+
+    def remove(self, text_ids: Iterable[str]) -> None:
+        for text_id in text_ids:
+            self._hashes.pop(text_id, None)
+
+    def save(self) -> None:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self._path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._hashes, f, ensure_ascii=False)
+            Path(tmp_path).replace(self._path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
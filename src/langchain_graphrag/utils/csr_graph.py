@@ -0,0 +1,311 @@
+"""Compact, integer indexed representation of an undirected graph.
+
+Node names are interned to consecutive integers and the adjacency is held
+in CSR (compressed sparse row) arrays. Edge attributes live in arrays
+parallel to the edges, so a graph with millions of edges is a handful of
+NumPy arrays instead of millions of Python dicts.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_array
+from scipy.sparse.csgraph import connected_components
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+
+def _attribute_array(values: list[Any]) -> np.ndarray:
+    if all(
+        isinstance(value, (bool, int, float, np.number, np.bool_)) for value in values
+    ):
+        return np.asarray(values)
+
+    # anything else (ids, descriptions, lists of text unit ids, missing
+    # values) is kept as one python object per element. np.asarray would
+    # turn lists of the same length into a 2-D array and fail on others.
+    array = np.empty(len(values), dtype=object)
+    for position, value in enumerate(values):
+        array[position] = value
+    return array
+
+
+def _present(names: list[str], values: list[Any]) -> dict[str, Any]:
+    # attributes missing from the original graph are stored as None
+    return {
+        name: value
+        for name, value in zip(names, values, strict=True)
+        if value is not None
+    }
+
+
+class CSRGraph:
+    """An undirected graph stored in CSR arrays.
+
+    Edges are numbered in the order they are iterated by `networkx`, the
+    neighbours of a node are listed in the order of their edges. Self
+    loops are stored once in the adjacency and count twice in the degree,
+    like `networkx` does.
+
+    Attributes:
+        node_names: Names of the nodes, the index of a name is the id of its node.
+        sources: Node id of the first endpoint of every edge.
+        targets: Node id of the second endpoint of every edge.
+        indptr: The neighbours of node `i` are `indices[indptr[i]:indptr[i + 1]]`.
+        indices: Node ids of the neighbours, grouped by node.
+        slot_edges: Edge id of every entry of `indices`.
+        node_attributes: Arrays parallel to `node_names`.
+        edge_attributes: Arrays parallel to `sources` and `targets`.
+    """
+
+    __slots__ = (
+        "_node_index",
+        "edge_attributes",
+        "indices",
+        "indptr",
+        "node_attributes",
+        "node_names",
+        "slot_edges",
+        "sources",
+        "targets",
+    )
+
+    def __init__(
+        self,
+        node_names: Sequence[str],
+        sources: np.ndarray,
+        targets: np.ndarray,
+        *,
+        node_attributes: dict[str, np.ndarray] | None = None,
+        edge_attributes: dict[str, np.ndarray] | None = None,
+    ):
+        self.node_names = np.asarray(node_names, dtype=object)
+        self.sources = np.asarray(sources, dtype=np.int32)
+        self.targets = np.asarray(targets, dtype=np.int32)
+        self.node_attributes = node_attributes or {}
+        self.edge_attributes = edge_attributes or {}
+        self._node_index: dict[str, int] | None = None
+
+        num_nodes, num_edges = len(self.node_names), len(self.sources)
+        edge_ids = np.arange(num_edges, dtype=np.int32)
+        not_loop = self.sources != self.targets
+
+        rows = np.concatenate([self.sources, self.targets[not_loop]])
+        columns = np.concatenate([self.targets, self.sources[not_loop]])
+        slot_edges = np.concatenate([edge_ids, edge_ids[not_loop]])
+
+        order = np.lexsort((slot_edges, rows))
+        self.indices = columns[order]
+        self.slot_edges = slot_edges[order]
+        self.indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=num_nodes), out=self.indptr[1:])
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.node_names)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.sources)
+
+    def node_id(self, name: str) -> int:
+        """Id of the node with the given name."""
+        if self._node_index is None:
+            self._node_index = {
+                name: index for index, name in enumerate(self.node_names.tolist())
+            }
+        return self._node_index[name]
+
+    def node_ids(self, names: Iterable[str]) -> np.ndarray:
+        """Ids of the given nodes, -1 for the names that are not in the graph."""
+        return pd.Index(self.node_names).get_indexer(list(names))
+
+    def degrees(self) -> np.ndarray:
+        """Degree of every node, a self loop counts twice."""
+        return np.bincount(self.sources, minlength=self.num_nodes) + np.bincount(
+            self.targets, minlength=self.num_nodes
+        )
+
+    def neighbors(self, node: int) -> np.ndarray:
+        """Ids of the neighbours of a node."""
+        return self.indices[self.indptr[node] : self.indptr[node + 1]]
+
+    def incident_edges(self, nodes: np.ndarray) -> np.ndarray:
+        """Sorted ids of the edges that have at least one endpoint in `nodes`."""
+        nodes = np.asarray(nodes, dtype=np.int64)
+        starts, ends = self.indptr[nodes], self.indptr[nodes + 1]
+        lengths = ends - starts
+        # positions of all the slots of the nodes without a python loop
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        slots = offsets + np.arange(lengths.sum())
+        return np.unique(self.slot_edges[slots])
+
+    def subgraph(self, nodes: np.ndarray) -> CSRGraph:
+        """Graph induced by the given nodes, in their current order."""
+        keep = np.zeros(self.num_nodes, dtype=bool)
+        keep[nodes] = True
+        new_ids = np.cumsum(keep) - 1
+        edges = keep[self.sources] & keep[self.targets]
+        return CSRGraph(
+            self.node_names[keep],
+            new_ids[self.sources[edges]],
+            new_ids[self.targets[edges]],
+            node_attributes={k: v[keep] for k, v in self.node_attributes.items()},
+            edge_attributes={k: v[edges] for k, v in self.edge_attributes.items()},
+        )
+
+    def _edge_weights(self, weight_attribute: str, weight_default: float) -> np.ndarray:
+        weights = self.edge_attributes.get(weight_attribute)
+        if weights is None:
+            return np.full(self.num_edges, weight_default)
+        return pd.Series(weights).fillna(weight_default).to_numpy(dtype=float)
+
+    def reordered(self, order: np.ndarray) -> CSRGraph:
+        """Same graph with node `i` being node `order[i]` of this graph."""
+        order = np.asarray(order, dtype=np.int64)
+        new_ids = np.empty(self.num_nodes, dtype=np.int32)
+        new_ids[order] = np.arange(self.num_nodes, dtype=np.int32)
+        return CSRGraph(
+            self.node_names[order],
+            new_ids[self.sources],
+            new_ids[self.targets],
+            node_attributes={k: v[order] for k, v in self.node_attributes.items()},
+            edge_attributes=self.edge_attributes,
+        )
+
+    def adjacency(
+        self,
+        weight_attribute: str = "weight",
+        weight_default: float = 1.0,
+        dtype: type = np.float32,
+    ) -> csr_array:
+        """Symmetric weighted adjacency matrix, a self loop is on the diagonal once."""
+        weights = self._edge_weights(weight_attribute, weight_default)
+        return csr_array(
+            (weights[self.slot_edges].astype(dtype), self.indices, self.indptr),
+            shape=(self.num_nodes, self.num_nodes),
+        )
+
+    def largest_connected_component(self) -> CSRGraph:
+        """Subgraph of the largest connected component."""
+        adjacency = csr_array(
+            (np.ones(len(self.indices), dtype=np.int8), self.indices, self.indptr),
+            shape=(self.num_nodes, self.num_nodes),
+        )
+        _, labels = connected_components(adjacency, directed=False)
+        if len(labels) == 0:
+            return self
+        return self.subgraph(np.flatnonzero(labels == np.bincount(labels).argmax()))
+
+    def edge_list(
+        self,
+        weight_attribute: str = "weight",
+        weight_default: float = 1.0,
+    ) -> list[tuple[str, str, float]]:
+        """Edges as (source name, target name, weight) in a stable order.
+
+        The endpoints of an edge are sorted by name and the edges are sorted
+        by their endpoints, whatever the order the graph was built in.
+        """
+        source_names = self.node_names[self.sources]
+        target_names = self.node_names[self.targets]
+        swap = source_names > target_names
+        first = np.where(swap, target_names, source_names)
+        second = np.where(swap, source_names, target_names)
+        weights = self._edge_weights(weight_attribute, weight_default)
+        return sorted(
+            zip(first.tolist(), second.tolist(), weights.tolist(), strict=True)
+        )
+
+    @staticmethod
+    def from_networkx(
+        graph: nx.Graph,
+        *,
+        node_attributes: Sequence[str] = (),
+        edge_attributes: Sequence[str] = ("weight",),
+    ) -> CSRGraph:
+        """Convert a `networkx` graph, only the given attributes are kept."""
+        node_names = list(graph.nodes)
+        node_index = {name: index for index, name in enumerate(node_names)}
+        edges = list(graph.edges(data=True))
+        return CSRGraph(
+            node_names,
+            np.fromiter((node_index[s] for s, _, _ in edges), np.int32, len(edges)),
+            np.fromiter((node_index[t] for _, t, _ in edges), np.int32, len(edges)),
+            node_attributes={
+                name: _attribute_array(
+                    [data.get(name) for _, data in graph.nodes(data=True)]
+                )
+                for name in node_attributes
+            },
+            edge_attributes={
+                name: _attribute_array([data.get(name) for _, _, data in edges])
+                for name in edge_attributes
+            },
+        )
+
+    @staticmethod
+    def from_edges(
+        sources: Sequence[str],
+        targets: Sequence[str],
+        *,
+        edge_attributes: dict[str, np.ndarray] | None = None,
+    ) -> CSRGraph:
+        """Build a graph from the names of the endpoints of its edges.
+
+        Nodes are numbered in the order they first appear, edge `i` is
+        the i-th pair of names, e.g. the i-th row of a relationships table.
+        """
+        endpoints = np.empty(2 * len(sources), dtype=object)
+        endpoints[0::2] = np.asarray(sources, dtype=object)
+        endpoints[1::2] = np.asarray(targets, dtype=object)
+        codes, node_names = pd.factorize(endpoints)
+        return CSRGraph(
+            node_names,
+            codes[0::2],
+            codes[1::2],
+            edge_attributes=edge_attributes,
+        )
+
+    def to_networkx(self) -> nx.Graph:
+        """Convert back to a `networkx` graph with the same iteration order."""
+        graph = nx.Graph()
+        node_attribute_names = list(self.node_attributes)
+        graph.add_nodes_from(
+            (name, _present(node_attribute_names, values))
+            for name, *values in zip(
+                self.node_names.tolist(),
+                *(v.tolist() for v in self.node_attributes.values()),
+                strict=True,
+            )
+        )
+        edge_attribute_names = list(self.edge_attributes)
+        graph.add_edges_from(
+            (source, target, _present(edge_attribute_names, values))
+            for source, target, *values in zip(
+                self.node_names[self.sources].tolist(),
+                self.node_names[self.targets].tolist(),
+                *(v.tolist() for v in self.edge_attributes.values()),
+                strict=True,
+            )
+        )
+        return graph
+
+    def nbytes(self) -> int:
+        """Memory held by the arrays of the graph, excluding python objects."""
+        arrays = [
+            self.node_names,
+            self.sources,
+            self.targets,
+            self.indptr,
+            self.indices,
+            self.slot_edges,
+            *self.node_attributes.values(),
+            *self.edge_attributes.values(),
+        ]
+        return sum(array.nbytes for array in arrays)
@@ -0,0 +1,66 @@
+"""A simple content addressed cache that lives on the local disk."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any
+
+
+def make_cache_key(*parts: Any) -> str:
+    """Make a stable key by hashing the JSON representation of the parts."""
+    payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def model_identity(llm: Any) -> str:
+    """Describe a language model by its type and identifying parameters."""
+    params = getattr(llm, "_identifying_params", None)
+    if not isinstance(params, dict):
+        return type(llm).__qualname__
+    return json.dumps(
+        {"type": type(llm).__qualname__, **params},
+        sort_keys=True,
+        default=str,
+    )
+
+
+class DiskCache:
+    """Stores JSON serializable values in a directory, one file per key.
+
+    The files are spread over sub directories named after the first
+    two characters of the key so that no single directory gets too big.
+    Writes are atomic, a reader never sees a partially written entry.
+    """
+
+    def __init__(self, cache_dir: Path):
+        self._cache_dir = cache_dir
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self._cache_dir / key[:2] / f"{key}.json"
+
+    def __contains__(self, key: str) -> bool:
+        """Whether a value is cached under the key."""
+        return self._path(key).exists()
+
+    def get(self, key: str) -> Any | None:
+        path = self._path(key)
+        if not path.exists():
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def set(self, key: str, value: Any) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(value, f, ensure_ascii=False)
+            Path(tmp_path).replace(path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
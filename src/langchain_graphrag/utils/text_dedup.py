@@ -0,0 +1,130 @@
+"""Detection of exact and near duplicate texts."""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+# Mersenne prime of the universal hash functions of MinHash, small
+# enough for (a * h + b) of 32 bit shingle hashes to fit in uint64
+_PRIME = np.uint64((1 << 31) - 1)
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def _shingle_hashes(text: str, shingle_size: int) -> np.ndarray:
+    tokens = _TOKEN_PATTERN.findall(text.lower())
+    shingles = {
+        " ".join(tokens[i : i + shingle_size])
+        for i in range(max(1, len(tokens) - shingle_size + 1))
+    }
+    return np.fromiter(
+        (
+            int.from_bytes(
+                hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little"
+            )
+            for s in shingles
+        ),
+        dtype=np.uint64,
+        count=len(shingles),
+    )
+
+
+class TextDeduplicator:
+    def __init__(
+        self,
+        *,
+        near_duplicate_threshold: float | None = None,
+        num_permutations: int = 64,
+        num_bands: int = 16,
+        shingle_size: int = 3,
+        seed: int = 42,
+    ):
+        """Finds the texts that are exact or near duplicates of an earlier text.
+
+        Exact duplicates are identical once leading and trailing whitespace
+        is removed. Near duplicates are found with MinHash signatures of
+        the word shingles of the texts, candidates come from locality
+        sensitive hashing of the signature bands and are kept if their
+        estimated Jaccard similarity reaches the threshold.
+
+        Args:
+            near_duplicate_threshold (float, optional): Minimum estimated Jaccard
+                similarity of two near duplicates. If None, only exact
+                duplicates are detected. Defaults to None.
+            num_permutations (int, optional): Size of the MinHash signatures.
+                Defaults to 64.
+            num_bands (int, optional): Number of bands the signatures are split in,
+                must divide `num_permutations`. Defaults to 16.
+            shingle_size (int, optional): Number of words per shingle. Defaults to 3.
+            seed (int, optional): Seed of the hash functions. Defaults to 42.
+        """
+        if num_permutations % num_bands != 0:
+            raise ValueError("num_bands must divide num_permutations")
+
+        self._near_duplicate_threshold = near_duplicate_threshold
+        self._num_bands = num_bands
+        self._shingle_size = shingle_size
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, size=num_permutations, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, size=num_permutations, dtype=np.uint64)
+
+    def _signature(self, text: str) -> np.ndarray:
+        hashes = _shingle_hashes(text, self._shingle_size)
+        permuted = (np.outer(hashes, self._a) + self._b) % _PRIME
+        return permuted.min(axis=0)
+
+    def find_representatives(self, texts: Sequence[str]) -> list[int]:
+        """Map every text to the first text it duplicates.
+
+        Args:
+            texts (Sequence[str]): The texts, e.g. the text units in the order
+                they are processed.
+
+        Returns:
+            For every text the index of its representative, which is the
+            text itself when it is not a duplicate of an earlier text.
+        """
+        representatives = list(range(len(texts)))
+        first_seen: dict[str, int] = {}
+        for index, text in enumerate(texts):
+            representatives[index] = first_seen.setdefault(text.strip(), index)
+
+        if self._near_duplicate_threshold is None:
+            return representatives
+
+        # only representatives are indexed so that a text is never
+        # matched to a duplicate, chains of near duplicates stay short
+        buckets: dict[tuple[int, bytes], list[int]] = {}
+        signatures: dict[int, np.ndarray] = {}
+        for index, text in enumerate(texts):
+            if representatives[index] != index:
+                continue
+
+            signature = self._signature(text)
+            bands = [
+                (band, chunk.tobytes())
+                for band, chunk in enumerate(np.split(signature, self._num_bands))
+            ]
+
+            candidates = sorted(
+                {candidate for key in bands for candidate in buckets.get(key, [])}
+            )
+            for candidate in candidates:
+                similarity = float(np.mean(signatures[candidate] == signature))
+                if similarity >= self._near_duplicate_threshold:
+                    representatives[index] = candidate
+                    break
+            else:
+                signatures[index] = signature
+                for key in bands:
+                    buckets.setdefault(key, []).append(index)
+
+        # exact duplicates follow their representative
+        return [representatives[r] for r in representatives]
@@ -7,3 +7,8 @@ def gen_uuid(rd: Random | None = None):
     return uuid.UUID(
         int=rd.getrandbits(128) if rd is not None else getrandbits(128), version=4
     ).hex
+
+
+def gen_content_uuid(*parts: str) -> str:
+    """Generate a UUID v5 derived from the given parts of content."""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, "\x1f".join(parts)))
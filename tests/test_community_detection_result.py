@@ -0,0 +1,118 @@
+import pickle
+from pathlib import Path
+
+from langchain_graphrag.types.graphs.community import (
+    Community,
+    CommunityDetectionResult,
+    CommunityNode,
+)
+
+
+def _make_result() -> CommunityDetectionResult:
+    return CommunityDetectionResult(
+        communities={
+            0: {
+                3: Community(
+                    id=3,
+                    nodes=[
+                        CommunityNode("a", None, is_final_cluster=False),
+                        CommunityNode("b", None, is_final_cluster=False),
+                        CommunityNode("c", None, is_final_cluster=False),
+                    ],
+                ),
+                1: Community(
+                    id=1, nodes=[CommunityNode("d", None, is_final_cluster=True)]
+                ),
+            },
+            1: {
+                5: Community(
+                    id=5,
+                    nodes=[
+                        CommunityNode("a", 3, is_final_cluster=True),
+                        CommunityNode("b", 3, is_final_cluster=True),
+                    ],
+                ),
+                4: Community(
+                    id=4, nodes=[CommunityNode("c", 3, is_final_cluster=True)]
+                ),
+            },
+        }
+    )
+
+
+def test_indexes_and_view_match_communities():
+    result = _make_result()
+
+    assert list(result.communities) == [0, 1]
+    assert list(result.communities[0]) == [3, 1]
+    assert result.communities_at_level(1)[0].nodes[0] == CommunityNode(
+        "a", 3, is_final_cluster=True
+    )
+    assert result.node_communities() == {
+        "a": [3, 5],
+        "b": [3, 5],
+        "c": [3, 4],
+        "d": [1],
+    }
+    assert result.members(0, 3) == ["a", "b", "c"]
+    assert result.members(1, 3) == []
+    assert result.children(3) == [5, 4]
+    assert result.children(1) == []
+    assert result.membership_at_level(1) == {"a": 5, "b": 5, "c": 4}
+
+
+def test_save_load_and_pickle(tmp_path: Path):
+    result = _make_result()
+    path = tmp_path / "communities.npz"
+    result.save(path)
+
+    assert CommunityDetectionResult.load(path) == result
+    assert pickle.loads(pickle.dumps(result)) == result  # noqa: S301
+    assert CommunityDetectionResult() == CommunityDetectionResult.from_memberships(
+        node_names=[],
+        levels=[],
+        community_ids=[],
+        node_codes=[],
+        parent_ids=[],
+        is_final=[],
+    )
+
+
+class _PreviousResult:
+    # pickles like the dataclass with a single `communities` field that
+    # CommunityDetectionResult used to be
+    def __init__(self, communities: dict):
+        self.communities = communities
+
+    def __reduce__(self) -> tuple:
+        return (
+            object.__new__,
+            (CommunityDetectionResult,),
+            {"communities": self.communities},
+        )
+
+
+def test_pickles_of_the_previous_dataclass_still_load():
+    previous = pickle.dumps(_PreviousResult(_make_result().communities))
+    result = pickle.loads(previous)  # noqa: S301
+
+    assert isinstance(result, CommunityDetectionResult)
+    assert result == _make_result()
+    assert result.node_communities()["c"] == [3, 4]
+
+
+def test_communities_can_be_replaced():
+    result = _make_result()
+    result.communities = {
+        0: {7: Community(id=7, nodes=[CommunityNode("e", None, is_final_cluster=True)])}
+    }
+
+    assert result.members(0, 7) == ["e"]
+    assert result.node_communities() == {"e": [7]}
+
+
+def test_empty_result():
+    result = CommunityDetectionResult()
+
+    assert result.node_communities() == {}
+    assert result.communities == {}
@@ -0,0 +1,117 @@
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+from langchain_graphrag.indexing.graph_clustering import (
+    HierarchicalLeidenCommunityDetector,
+)
+from langchain_graphrag.query.local_search.context_selectors import (
+    RelationshipsSelector,
+)
+from langchain_graphrag.query.local_search.context_selectors.relationships import (
+    _find_in_network_relationships,
+    _find_out_network_relationships,
+)
+from langchain_graphrag.utils import CSRGraph
+
+
+def _make_graph(seed: int = 7) -> nx.Graph:
+    rng = np.random.default_rng(seed)
+    graph = nx.Graph()
+    for i in range(60):
+        graph.add_node(f"N{i:02d}", degree=0, id=f"node-{i}")
+    for _ in range(150):
+        source, target = rng.integers(0, 60, size=2)
+        graph.add_edge(
+            f"N{target:02d}",
+            f"N{source:02d}",
+            weight=int(rng.integers(1, 5)),
+            id=f"edge-{source}-{target}",
+        )
+    graph.add_edge("X", "Y", weight=1)
+    return graph
+
+
+def test_round_trip_keeps_order_and_attributes():
+    graph = _make_graph()
+    csr = CSRGraph.from_networkx(
+        graph, node_attributes=["id"], edge_attributes=["weight", "id"]
+    )
+    round_trip = csr.to_networkx()
+
+    assert list(round_trip.nodes(data="id")) == list(graph.nodes(data="id"))
+    assert [(s, t, d.get("id")) for s, t, d in round_trip.edges(data=True)] == [
+        (s, t, d.get("id")) for s, t, d in graph.edges(data=True)
+    ]
+    assert csr.degrees().tolist() == [d for _, d in graph.degree]
+    for node, name in enumerate(csr.node_names):
+        assert set(csr.node_names[csr.neighbors(node)]) == set(graph.neighbors(name))
+
+
+def test_list_attributes_are_kept_per_element():
+    graph = nx.Graph()
+    graph.add_node("A", text_unit_ids=["t1", "t2"])
+    graph.add_node("B", text_unit_ids=["t1"])
+    graph.add_edge("A", "B", text_unit_ids=["t1", "t2"], weight=2.0)
+    graph.add_edge("B", "C", text_unit_ids=["t3", "t4"], weight=1.0)
+
+    csr = CSRGraph.from_networkx(
+        graph,
+        node_attributes=["text_unit_ids"],
+        edge_attributes=["text_unit_ids", "weight"],
+    )
+
+    # ragged lists, lists of the same length and a missing value
+    assert csr.node_attributes["text_unit_ids"].shape == (3,)
+    assert csr.edge_attributes["text_unit_ids"].shape == (2,)
+    assert csr.edge_attributes["weight"].dtype == np.float64
+    round_trip = csr.to_networkx()
+    assert list(round_trip.nodes(data=True)) == list(graph.nodes(data=True))
+    assert list(round_trip.edges(data=True)) == list(graph.edges(data=True))
+
+
+def test_incident_edges():
+    graph = _make_graph()
+    csr = CSRGraph.from_networkx(graph)
+    nodes = csr.node_ids(["N03", "N10", "missing"])
+
+    expected = {
+        index
+        for index, (s, t) in enumerate(graph.edges())
+        if s in {"N03", "N10"} or t in {"N03", "N10"}
+    }
+    assert nodes[-1] == -1
+    assert csr.incident_edges(nodes[:-1]).tolist() == sorted(expected)
+
+
+def test_leiden_on_csr_graph_matches_networkx():
+    graph = _make_graph()
+    graph.remove_edges_from(list(nx.selfloop_edges(graph)))
+    detector = HierarchicalLeidenCommunityDetector(max_cluster_size=5)
+
+    expected = detector.run(graph)
+    result = detector.run(CSRGraph.from_networkx(graph))
+
+    assert result == expected
+
+
+def test_relationships_selector_only_looks_at_incident_relationships():
+    graph = _make_graph()
+    df_relationships = pd.DataFrame.from_records(
+        [
+            dict(source_id=s, target_id=t, source=s, target=t, rank=d["weight"])
+            for s, t, d in graph.edges(data=True)
+        ]
+    )
+    df_entities = pd.DataFrame({"id": ["N01", "N02", "N30", "N31", "missing"]})
+
+    result = RelationshipsSelector(top_k_out_network=3).run(
+        df_entities, df_relationships
+    )
+
+    assert result.in_network_relationships.equals(
+        _find_in_network_relationships(df_entities, df_relationships.copy())
+    )
+    assert result.out_network_relationships.equals(
+        _find_out_network_relationships(df_entities, df_relationships.copy(), top_k=3)
+    )
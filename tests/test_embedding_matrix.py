@@ -0,0 +1,61 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from langchain_graphrag.indexing import IndexerArtifacts
+from langchain_graphrag.types.graphs.embedding import EmbeddingMatrix
+
+_DIMENSIONS = 8
+
+
+def _make_matrix() -> EmbeddingMatrix:
+    rng = np.random.default_rng(0)
+    embeddings = {name: rng.normal(size=_DIMENSIONS) for name in ["A", "B", "C"]}
+    return EmbeddingMatrix.from_embeddings(
+        embeddings, ids={"A": "id-a", "B": "id-b", "C": "id-c"}
+    )
+
+
+def test_rows_are_indexed_by_entity_id():
+    matrix = _make_matrix()
+
+    assert matrix.vectors.dtype == np.float32
+    assert matrix.vectors.flags.c_contiguous
+    assert matrix.dimensions == _DIMENSIONS
+    assert "id-b" in matrix
+    assert matrix.get("B") is None
+    np.testing.assert_array_equal(matrix.take(["id-c", "id-a"]), matrix.vectors[[2, 0]])
+    with pytest.raises(KeyError):
+        matrix.take(["id-a", "missing"])
+
+
+def test_quantized_matrix_round_trip(tmp_path: Path):
+    matrix = _make_matrix()
+    quantized = matrix.quantized()
+
+    assert quantized.vectors.dtype == np.int8
+    np.testing.assert_allclose(quantized.to_dense(), matrix.to_dense(), atol=0.05)
+
+    quantized.save(tmp_path / "embeddings")
+    loaded = EmbeddingMatrix.load(tmp_path / "embeddings")
+    assert isinstance(loaded.vectors, np.memmap)
+    np.testing.assert_array_equal(loaded.to_dense(), quantized.to_dense())
+
+    empty = pd.DataFrame()
+    artifacts = IndexerArtifacts(empty, empty, empty, empty, graph_embeddings=loaded)
+    np.testing.assert_array_equal(
+        artifacts.graph_embedding("id-a"), quantized.take(["id-a"])[0]
+    )
+    assert IndexerArtifacts(empty, empty, empty, empty).graph_embedding("id-a") is None
+
+
+def test_float_matrix_replaces_an_earlier_quantized_save(tmp_path: Path):
+    matrix = _make_matrix()
+    matrix.quantized().save(tmp_path)
+    matrix.save(tmp_path)
+
+    loaded = EmbeddingMatrix.load(tmp_path)
+    assert not loaded.is_quantized
+    np.testing.assert_array_equal(loaded.to_dense(), matrix.to_dense())
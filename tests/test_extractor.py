@@ -0,0 +1,182 @@
+import asyncio
+import math
+import re
+from pathlib import Path
+
+import pandas as pd
+from langchain_core.prompt_values import PromptValue
+from langchain_core.runnables import RunnableLambda
+
+from langchain_graphrag.indexing.graph_generation import (
+    EntityRelationshipExtractor,
+    GraphsMerger,
+)
+from langchain_graphrag.utils import DiskCache, TextDeduplicator
+
+
+def _fake_llm(prompt: PromptValue) -> str:
+    # the entity is the text unit itself so that we can check
+    # that every graph ends up next to its own text unit
+    text_unit = prompt.to_string().split("Text: ")[-1].split("\n")[0]
+    return f'("entity"<|>{text_unit}<|>PERSON<|>{text_unit} is a person)'
+
+
+def _make_text_units(count: int) -> pd.DataFrame:
+    return pd.DataFrame.from_records(
+        [
+            dict(document_id="doc", id=f"id-{i}", text_unit=f"name{i}")
+            for i in range(count)
+        ]
+    )
+
+
+def test_concurrent_extraction_keeps_order():
+    text_units = _make_text_units(20)
+    extractor = EntityRelationshipExtractor.build_default(
+        llm=RunnableLambda(_fake_llm),
+        max_concurrency=4,
+    )
+
+    graphs = extractor.invoke(text_units)
+    async_graphs = asyncio.run(extractor.ainvoke(text_units))
+
+    for result in [graphs, async_graphs]:
+        assert len(result) == len(text_units)
+        for i, graph in enumerate(result):
+            assert list(graph.nodes) == [f"NAME{i}"]
+            assert graph.nodes[f"NAME{i}"]["text_unit_ids"] == [f"id-{i}"]
+
+
+def test_cached_extraction_skips_llm(tmp_path: Path):
+    cache = DiskCache(tmp_path)
+    text_units = _make_text_units(5)
+    extractor = EntityRelationshipExtractor.build_default(
+        llm=RunnableLambda(_fake_llm),
+        cache=cache,
+    )
+    graphs = extractor.invoke(text_units)
+
+    def _failing_llm(_prompt: PromptValue) -> str:
+        raise AssertionError("cache miss")
+
+    # same chunks but new (random) text unit ids
+    text_units["id"] = [f"new-id-{i}" for i in range(len(text_units))]
+    cached_extractor = EntityRelationshipExtractor.build_default(
+        llm=RunnableLambda(_failing_llm),
+        cache=cache,
+    )
+    cached_graphs = cached_extractor.invoke(text_units)
+
+    for i, (graph, cached_graph) in enumerate(zip(graphs, cached_graphs, strict=True)):
+        assert list(graph.nodes) == list(cached_graph.nodes)
+        assert cached_graph.nodes[f"NAME{i}"]["text_unit_ids"] == [f"new-id-{i}"]
+
+
+class _WordCounter:
+    def count_tokens(self, text: str) -> int:
+        return len(text.split())
+
+
+def _fake_packed_llm(prompt: PromptValue) -> str:
+    text = prompt.to_string().split("-Real Data-")[-1]
+    records = []
+    for unit_id, text_unit in re.findall(r"-Text Unit (\d+)-\n(\S+)", text):
+        records.append(f'("text_unit"<|>{unit_id})')
+        records.append(f'("entity"<|>{text_unit}<|>PERSON<|>{text_unit} is a person)')
+    return "##".join(records)
+
+
+def test_packed_extraction_splits_graphs():
+    text_units = _make_text_units(7)
+    budget = 3
+    calls = []
+
+    def _counting_llm(prompt: PromptValue) -> str:
+        calls.append(prompt)
+        return _fake_packed_llm(prompt)
+
+    extractor = EntityRelationshipExtractor.build_default(
+        llm=RunnableLambda(_counting_llm),
+        packing_token_budget=budget,
+        token_counter=_WordCounter(),
+    )
+    graphs = extractor.invoke(text_units)
+
+    # every text unit is a single token
+    assert len(calls) == math.ceil(len(text_units) / budget)
+    for i, graph in enumerate(graphs):
+        assert list(graph.nodes) == [f"NAME{i}"]
+        assert graph.nodes[f"NAME{i}"]["text_unit_ids"] == [f"id-{i}"]
+
+
+def test_text_units_missing_from_packed_reply_are_extracted_again(tmp_path: Path):
+    text_units = _make_text_units(4)
+    cache = DiskCache(tmp_path)
+    unpacked_calls = []
+
+    def _forgetful_llm(prompt: PromptValue) -> str:
+        if "-Text Unit " not in prompt.to_string():
+            unpacked_calls.append(prompt)
+            return _fake_llm(prompt)
+        # the reply leaves the second text unit of every prompt out
+        records = _fake_packed_llm(prompt).split("##")
+        return "##".join(records[:2] + records[4:])
+
+    extractor = EntityRelationshipExtractor.build_default(
+        llm=RunnableLambda(_forgetful_llm),
+        cache=cache,
+        packing_token_budget=2,
+        token_counter=_WordCounter(),
+    )
+    graphs = extractor.invoke(text_units)
+
+    assert len(unpacked_calls) == len(text_units) // 2
+    for i, graph in enumerate(graphs):
+        assert list(graph.nodes) == [f"NAME{i}"]
+
+    def _failing_llm(_prompt: PromptValue) -> str:
+        raise AssertionError("cache miss")
+
+    # the text units extracted again are cached with their own result
+    cached_graphs = EntityRelationshipExtractor.build_default(
+        llm=RunnableLambda(_failing_llm),
+        cache=cache,
+        packing_token_budget=2,
+        token_counter=_WordCounter(),
+    ).invoke(text_units)
+    for i, graph in enumerate(cached_graphs):
+        assert list(graph.nodes) == [f"NAME{i}"]
+
+
+def test_extraction_as_tables():
+    text_units = _make_text_units(3)
+    extractor = EntityRelationshipExtractor.build_default(
+        llm=RunnableLambda(_fake_llm),
+    )
+
+    tables = extractor.invoke_as_tables(text_units)
+
+    assert tables.nodes["name"].tolist() == ["NAME0", "NAME1", "NAME2"]
+    assert tables.nodes["text_unit_id"].tolist() == ["id-0", "id-1", "id-2"]
+    assert tables.edges.empty
+
+
+def test_duplicate_text_units_share_extraction():
+    text_units = _make_text_units(4)
+    text_units["text_unit"] = ["name0", "name1", "name0", " name1 "]
+    calls = []
+
+    def _counting_llm(prompt: PromptValue) -> str:
+        calls.append(prompt)
+        return _fake_llm(prompt)
+
+    extractor = EntityRelationshipExtractor.build_default(
+        llm=RunnableLambda(_counting_llm),
+        deduplicator=TextDeduplicator(),
+    )
+    graphs = extractor.invoke(text_units)
+    merged_graph = GraphsMerger()(graphs)
+
+    assert len(calls) == text_units["text_unit"].str.strip().nunique()
+    assert merged_graph.nodes["NAME0"]["text_unit_ids"] == ["id-0", "id-2"]
+    assert merged_graph.nodes["NAME1"]["text_unit_ids"] == ["id-1", "id-3"]
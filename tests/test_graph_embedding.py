@@ -0,0 +1,118 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from langchain_graphrag.indexing.embedding_generation import (
+    FastRPGraphEmbeddingGenerator,
+    IncrementalGraphEmbeddingGenerator,
+    Node2VectorGraphEmbeddingGenerator,
+    SpectralGraphEmbeddingGenerator,
+)
+from langchain_graphrag.indexing.embedding_generation.graph.node2vec import _WalkSampler
+from langchain_graphrag.types.graphs.embedding import GraphEmbeddingGenerator
+from langchain_graphrag.utils.csr_graph import CSRGraph
+
+
+def _make_graph() -> nx.Graph:
+    graph = nx.Graph()
+    for prefix in ["A", "B"]:
+        clique = nx.complete_graph([f"{prefix}{i}" for i in range(8)])
+        graph.add_edges_from(clique.edges, weight=1.0)
+    graph.add_edge("A0", "B0", weight=1.0)
+    graph.add_edge("X", "Y", weight=1.0)
+    return graph
+
+
+def _cosine(a: np.ndarray, b: np.ndarray) -> float:
+    return float(a @ b / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+
+@pytest.mark.parametrize(
+    "generator",
+    [
+        FastRPGraphEmbeddingGenerator(dimensions=32),
+        SpectralGraphEmbeddingGenerator(dimensions=4),
+    ],
+)
+def test_sparse_graph_embeddings(generator: GraphEmbeddingGenerator):
+    graph = _make_graph()
+    embeddings = generator.run(graph)
+
+    # the largest connected component, sorted by name
+    assert list(embeddings) == sorted(n for n in graph if n not in {"X", "Y"})
+    assert all(e.dtype == np.float32 for e in embeddings.values())
+
+    same = _cosine(embeddings["A1"], embeddings["A2"])
+    other = _cosine(embeddings["A1"], embeddings["B1"])
+    assert same > other
+
+    # same result from a CSR graph built in another order
+    shuffled = nx.Graph()
+    shuffled.add_edges_from(reversed(list(graph.edges(data=True))))
+    from_csr = generator.run(CSRGraph.from_networkx(shuffled))
+    assert list(from_csr) == list(embeddings)
+    for name, embedding in embeddings.items():
+        np.testing.assert_allclose(from_csr[name], embedding, atol=1e-5)
+
+
+def test_node2vec_walks_follow_weighted_edges():
+    graph = nx.Graph()
+    graph.add_edge("C", "L", weight=1.0)
+    graph.add_edge("C", "H", weight=9.0)
+    csr_graph = CSRGraph.from_networkx(graph)
+    sampler = _WalkSampler(csr_graph)
+
+    center = csr_graph.node_id("C")
+    starts = np.full(10_000, center)
+    walks, _ = sampler.walks((starts, np.full(10_000, 3), (0, 0, 0)))
+
+    adjacency = csr_graph.adjacency().toarray()
+    assert (adjacency[walks[:, 0], walks[:, 1]] > 0).all()
+    assert (walks[:, 2] == center).all()
+    # "H" carries 9 of the 10 units of weight around the center
+    share_heavy = np.mean(walks[:, 1] == csr_graph.node_id("H"))
+    np.testing.assert_allclose(share_heavy, 0.9, atol=0.05)
+
+
+def test_node2vec_is_reproducible_with_worker_processes():
+    graph = _make_graph()
+    # a single word2vec thread makes the training deterministic
+    sequential = Node2VectorGraphEmbeddingGenerator(
+        dimensions=16, shard_size=5, training_workers=1
+    ).run(graph)
+    parallel = Node2VectorGraphEmbeddingGenerator(
+        dimensions=16, shard_size=5, max_workers=2, training_workers=1
+    ).run(graph)
+
+    assert list(sequential) == sorted(n for n in graph if n not in {"X", "Y"})
+    assert list(parallel) == list(sequential)
+    for name, embedding in sequential.items():
+        np.testing.assert_array_equal(parallel[name], embedding)
+
+
+def test_incremental_embeddings_for_new_nodes():
+    graph = _make_graph()
+    generator = IncrementalGraphEmbeddingGenerator(
+        FastRPGraphEmbeddingGenerator(dimensions=32), max_drift=0.1
+    )
+    full = generator.run(graph)
+
+    subgraph = nx.Graph()
+    subgraph.add_edges_from(
+        [("A1", "NEW"), ("A2", "NEW"), ("A3", "NEW"), ("NEW", "NEWER")], weight=1.0
+    )
+    update = generator.update(full, subgraph, removed_nodes=["B7"])
+
+    assert update.updated_nodes == ["NEW", "NEWER"]
+    assert "B7" not in update.embeddings
+    np.testing.assert_array_equal(update.embeddings["A1"], full["A1"])
+    assert _cosine(update.embeddings["NEW"], full["A4"]) > _cosine(
+        update.embeddings["NEW"], full["B4"]
+    )
+    assert update.drift == pytest.approx(2 / 17)
+    assert update.needs_full_rebuild
+
+    # the drift adds up over updates, re-embedded nodes count once
+    again = generator.update(update, subgraph, changed_nodes=["NEW"])
+    assert again.updated_nodes == ["NEW"]
+    assert again.propagated_nodes == {"NEW", "NEWER"}
@@ -0,0 +1,61 @@
+import pandas as pd
+from langchain_core.prompt_values import PromptValue
+from langchain_core.runnables import RunnableLambda
+
+from langchain_graphrag.indexing.graph_generation import (
+    EntityRelationshipDescriptionSummarizer,
+    EntityRelationshipExtractor,
+    GraphGenerator,
+    GraphsMerger,
+)
+
+
+def _extraction_llm(prompt: PromptValue) -> str:
+    # the same entity is found in every text unit
+    text_unit = prompt.to_string().split("Text: ")[-1].split("\n")[0]
+    return f'("entity"<|>alice<|>PERSON<|>alice in {text_unit})'
+
+
+def _make_generator(*, keep_merged_graph: bool) -> GraphGenerator:
+    return GraphGenerator(
+        er_extractor=EntityRelationshipExtractor.build_default(
+            RunnableLambda(_extraction_llm)
+        ),
+        graphs_merger=GraphsMerger(),
+        er_description_summarizer=EntityRelationshipDescriptionSummarizer.build_default(
+            RunnableLambda(lambda _: "summary")
+        ),
+        keep_merged_graph=keep_merged_graph,
+    )
+
+
+def _make_text_units() -> pd.DataFrame:
+    return pd.DataFrame.from_records(
+        [dict(document_id="doc", id=f"id-{i}", text_unit=f"text{i}") for i in range(3)]
+    )
+
+
+def test_summarized_graph_does_not_change_merged_graph():
+    merged_graph, summarized_graph = _make_generator(keep_merged_graph=True).run(
+        _make_text_units()
+    )
+
+    assert merged_graph is not None
+    assert merged_graph.nodes["ALICE"]["description"] == [
+        f"alice in text{i}" for i in range(3)
+    ]
+    assert summarized_graph.nodes["ALICE"]["description"] == "summary"
+    # everything else is shared
+    assert (
+        summarized_graph.nodes["ALICE"]["text_unit_ids"]
+        is merged_graph.nodes["ALICE"]["text_unit_ids"]
+    )
+
+
+def test_merged_graph_can_be_dropped():
+    merged_graph, summarized_graph = _make_generator(keep_merged_graph=False).run(
+        _make_text_units()
+    )
+
+    assert merged_graph is None
+    assert summarized_graph.nodes["ALICE"]["description"] == "summary"
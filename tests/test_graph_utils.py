@@ -0,0 +1,50 @@
+import networkx as nx
+import pytest
+
+from langchain_graphrag.indexing._graph_utils import stable_largest_connected_component
+from langchain_graphrag.indexing.embedding_generation.graph import (
+    Node2VectorGraphEmbeddingGenerator,
+)
+from langchain_graphrag.indexing.graph_clustering import (
+    HierarchicalLeidenCommunityDetector,
+)
+
+
+def _make_graph() -> nx.Graph:
+    graph = nx.Graph()
+    graph.add_edges_from(
+        [("c", "b"), ("b", "a"), ("a", "c"), ("c", "d"), ("x", "y")], weight=1
+    )
+    return graph
+
+
+def test_stable_lcc_is_memoized():
+    graph = _make_graph()
+    lcc = stable_largest_connected_component(graph)
+
+    assert list(lcc.nodes) == ["A", "B", "C", "D"]
+    assert list(lcc.edges) == [("A", "B"), ("A", "C"), ("B", "C"), ("C", "D")]
+    assert stable_largest_connected_component(graph) is lcc
+    assert nx.is_frozen(lcc)
+    with pytest.raises(nx.NetworkXError):
+        lcc.add_node("E")
+
+    # a change of the graph invalidates the shared component
+    graph.add_edge("d", "e")
+    assert list(stable_largest_connected_component(graph).nodes) == [
+        "A",
+        "B",
+        "C",
+        "D",
+        "E",
+    ]
+
+
+def test_stages_share_the_stable_lcc():
+    graph = _make_graph()
+
+    result = HierarchicalLeidenCommunityDetector().run(graph)
+    embeddings = Node2VectorGraphEmbeddingGenerator(dimensions=2).run(graph)
+
+    nodes = {n.name for c in result.communities[0].values() for n in c.nodes}
+    assert nodes == set(embeddings) == {"A", "B", "C", "D"}
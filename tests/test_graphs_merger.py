@@ -1,10 +1,23 @@
 import networkx as nx
+import pandas as pd
 
+from langchain_graphrag.indexing.graph_generation import (
+    ExtractionTables,
+    GraphsMerger,
+    IdScheme,
+)
+from langchain_graphrag.indexing.graph_generation.entity_relationship_extraction.tables import (  # noqa: E501
+    EDGES_COLUMNS,
+    NODES_COLUMNS,
+)
 from langchain_graphrag.indexing.graph_generation.graphs_merger import (
+    MergeEngine,
     merge_edges,
     merge_nodes,
 )
 
+_MERGED_EDGE_WEIGHT = 6.0
+
 
 def test_node_merge():
     target_graph = nx.Graph()
@@ -49,3 +62,108 @@ def test_node_merge():
 
     print(target_graph.nodes(data=True))
     print(target_graph.edges(data=True))
+
+
+def test_merge_tables():
+    nodes = pd.DataFrame.from_records(
+        [
+            ("NODE1", "PERSON", "description1", "1"),
+            ("NODE2", "", "", "1"),
+            ("NODE1", "PERSON", "description1 from 2", "2"),
+            ("NODE2", "GEO", "description2 from 2", "2"),
+            ("NODE1", "PERSON", "description1", "3"),
+        ],
+        columns=NODES_COLUMNS,
+    )
+    edges = pd.DataFrame.from_records(
+        [
+            ("NODE1", "NODE2", "edge description1", 2.0, "1"),
+            ("NODE2", "NODE1", "edge description1", 4.0, "2"),
+        ],
+        columns=EDGES_COLUMNS,
+    )
+
+    graph = GraphsMerger().merge_tables(ExtractionTables(nodes=nodes, edges=edges))
+
+    assert list(graph.nodes) == ["NODE1", "NODE2"]
+    assert graph.nodes["NODE1"]["description"] == [
+        "description1",
+        "description1 from 2",
+    ]
+    assert graph.nodes["NODE1"]["text_unit_ids"] == ["1", "2", "3"]
+    assert graph.nodes["NODE2"]["type"] == "GEO"
+    assert graph.nodes["NODE2"]["degree"] == 1
+
+    edge = graph.edges["NODE1", "NODE2"]
+    assert edge["weight"] == _MERGED_EDGE_WEIGHT
+    assert edge["description"] == ["edge description1"]
+    assert edge["text_unit_ids"] == ["1", "2"]
+    assert edge["rank"] == edge["source_degree"] + edge["target_degree"]
+
+
+def _make_chunk_graphs() -> list[nx.Graph]:
+    graphs = []
+    for chunk, edges in enumerate(
+        [
+            [("B", "A"), ("A", "C")],
+            [("C", "A"), ("D", "D"), ("B", "D")],
+            [("A", "B"), ("E", "A"), ("C", "B")],
+        ]
+    ):
+        graph = nx.Graph()
+        for source, target in edges:
+            for name in (source, target):
+                graph.add_node(
+                    name,
+                    type="PERSON",
+                    description=[f"{name} in {chunk}", "shared"],
+                    text_unit_ids=[str(chunk)],
+                )
+            graph.add_edge(
+                source,
+                target,
+                weight=1.5,
+                description=[f"{source}-{target} in {chunk}"],
+                text_unit_ids=[str(chunk)],
+            )
+        graphs.append(graph)
+    return graphs
+
+
+def test_groupby_merge_is_identical_to_fold():
+    fold_graph = GraphsMerger()(_make_chunk_graphs())
+    groupby_graph = GraphsMerger(engine=MergeEngine.groupby)(_make_chunk_graphs())
+
+    assert list(fold_graph.nodes(data=True)) == list(groupby_graph.nodes(data=True))
+    assert list(fold_graph.edges(data=True)) == list(groupby_graph.edges(data=True))
+
+
+def test_parallel_merge_is_identical_to_fold():
+    fold_graph = GraphsMerger()(_make_chunk_graphs())
+    parallel_graph = GraphsMerger(
+        engine=MergeEngine.parallel,
+        shard_size=1,
+        max_workers=2,
+    )(_make_chunk_graphs())
+
+    assert list(fold_graph.nodes(data=True)) == list(parallel_graph.nodes(data=True))
+    assert list(fold_graph.edges(data=True)) == list(parallel_graph.edges(data=True))
+
+
+def test_content_ids_do_not_depend_on_the_order_of_the_graphs():
+    graphs = _make_chunk_graphs()
+    fold_graph = GraphsMerger(id_scheme=IdScheme.content)(graphs)
+    groupby_graph = GraphsMerger(
+        engine=MergeEngine.groupby, id_scheme=IdScheme.content
+    )(graphs[::-1])
+
+    assert dict(fold_graph.nodes(data="id")) == dict(groupby_graph.nodes(data="id"))
+    assert {
+        frozenset((source, target)): edge_id
+        for source, target, edge_id in fold_graph.edges(data="id")
+    } == {
+        frozenset((source, target)): edge_id
+        for source, target, edge_id in groupby_graph.edges(data="id")
+    }
+    # the default ids are drawn in the order of the merged graph
+    assert GraphsMerger()(graphs).nodes["A"]["id"] != fold_graph.nodes["A"]["id"]
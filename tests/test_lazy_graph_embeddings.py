@@ -0,0 +1,94 @@
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+from langchain_graphrag.indexing import IndexerArtifacts, SimpleIndexer
+from langchain_graphrag.indexing.artifacts_generation import LazyGraphEmbeddings
+from langchain_graphrag.types.graphs.embedding import EmbeddingMatrix
+
+
+def test_graph_embeddings_are_computed_once_on_demand(tmp_path: Path):
+    calls = []
+
+    def compute() -> EmbeddingMatrix:
+        calls.append(1)
+        return EmbeddingMatrix(["id-a"], np.ones((1, 4), dtype=np.float32))
+
+    cache_dir = tmp_path / "graph_embeddings"
+    lazy = LazyGraphEmbeddings(compute, cache_dir=cache_dir)
+    empty = pd.DataFrame()
+    artifacts = IndexerArtifacts(empty, empty, empty, empty, graph_embeddings=lazy)
+
+    assert not lazy.is_computed
+    assert not cache_dir.exists()
+
+    np.testing.assert_array_equal(artifacts.graph_embedding("id-a"), np.ones(4))
+    assert artifacts.graph_embedding("id-b") is None
+    assert calls == [1]
+    assert cache_dir.exists()
+
+    # another consumer of the same artifacts only loads them
+    reloaded = LazyGraphEmbeddings(compute, cache_dir=cache_dir).get()
+    assert reloaded is not None
+    assert reloaded.ids.tolist() == ["id-a"]
+    assert calls == [1]
+
+    assert LazyGraphEmbeddings(cache_dir=tmp_path / "missing").get() is None
+
+
+def test_embeddings_saved_for_another_graph_are_computed_again(tmp_path: Path):
+    calls = []
+
+    def compute() -> EmbeddingMatrix:
+        calls.append(1)
+        return EmbeddingMatrix(["id-a"], np.full((1, 4), len(calls), np.float32))
+
+    cache_dir = tmp_path / "graph_embeddings"
+    graph = nx.Graph([("a", "b")])
+    LazyGraphEmbeddings(compute, cache_dir=cache_dir, graph=graph).get()
+
+    # the same graph is served from the cache
+    LazyGraphEmbeddings(compute, cache_dir=cache_dir, graph=graph.copy()).get()
+    assert calls == [1]
+
+    graph.add_edge("b", "c")
+    embeddings = LazyGraphEmbeddings(compute, cache_dir=cache_dir, graph=graph).get()
+    assert calls == [1, 1]
+    assert embeddings is not None
+    np.testing.assert_array_equal(embeddings.get("id-a"), np.full(4, 2))
+
+    # the replaced embeddings are now the ones of the new graph
+    reloaded = LazyGraphEmbeddings(cache_dir=cache_dir, graph=graph).get()
+    assert reloaded is not None
+    np.testing.assert_array_equal(reloaded.get("id-a"), np.full(4, 2))
+
+
+def test_indexer_does_not_compute_graph_embeddings(tmp_path: Path):
+    graph = nx.Graph([("a", "b")])
+    graph_generator = MagicMock()
+    graph_generator.run.return_value = (graph, graph)
+    entities_artifacts_generator = MagicMock()
+    entities_artifacts_generator.generate_graph_embeddings.return_value = (
+        EmbeddingMatrix(["id-a"], np.ones((1, 4), dtype=np.float32))
+    )
+    indexer = SimpleIndexer(
+        text_unit_extractor=MagicMock(),
+        graph_generator=graph_generator,
+        community_detector=MagicMock(),
+        entities_artifacts_generator=entities_artifacts_generator,
+        relationships_artifacts_generator=MagicMock(),
+        communities_report_artifacts_generator=MagicMock(),
+        text_units_artifacts_generator=MagicMock(),
+        graph_embeddings_dir=tmp_path / "graph_embeddings",
+    )
+
+    artifacts = indexer.run([])
+    entities_artifacts_generator.generate_graph_embeddings.assert_not_called()
+
+    np.testing.assert_array_equal(artifacts.graph_embedding("id-a"), np.ones(4))
+    entities_artifacts_generator.generate_graph_embeddings.assert_called_once_with(
+        graph
+    )
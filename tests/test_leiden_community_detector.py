@@ -0,0 +1,64 @@
+import networkx as nx
+
+from langchain_graphrag.indexing.graph_clustering import (
+    HierarchicalLeidenCommunityDetector,
+)
+from langchain_graphrag.types.graphs.community import CommunityDetectionResult
+
+
+def _make_graph() -> nx.Graph:
+    graph = nx.Graph()
+    for prefix in ["A", "B", "C"]:
+        clique = nx.complete_graph([f"{prefix}{i}" for i in range(12)])
+        graph.add_edges_from(clique.edges, weight=1)
+    graph.add_edge("P0", "P1", weight=1)
+    graph.add_node("S")
+    return graph
+
+
+def test_per_component_detection():
+    graph = _make_graph()
+    sequential = HierarchicalLeidenCommunityDetector(
+        use_lcc=False, max_cluster_size=5, per_component=True
+    ).run(graph)
+    parallel = HierarchicalLeidenCommunityDetector(
+        use_lcc=False, max_cluster_size=5, per_component=True, max_workers=2
+    ).run(graph)
+
+    assert parallel == sequential
+
+    level_0 = sequential.communities[0]
+    assert sorted(n.name for c in level_0.values() for n in c.nodes) == sorted(graph)
+    # trivial components are single communities
+    names = {c.id: sorted(n.name for n in c.nodes) for c in level_0.values()}
+    assert ["P0", "P1"] in names.values()
+    assert ["S"] in names.values()
+    # communities of different components never share an id
+    all_ids = [c for level in sequential.communities.values() for c in level]
+    assert len(all_ids) == len(set(all_ids))
+    for level in sequential.communities.values():
+        for community in level.values():
+            assert len({n.name[0] for n in community.nodes}) == 1
+
+
+def _top_level_members(result: CommunityDetectionResult) -> dict[int, set[str]]:
+    return {c.id: {n.name for n in c.nodes} for c in result.communities[0].values()}
+
+
+def test_incremental_detection_keeps_community_ids():
+    graph = _make_graph()
+    graph.add_edge("A0", "B0", weight=1)
+    graph.add_edge("B1", "C1", weight=1)
+    detector = HierarchicalLeidenCommunityDetector(max_cluster_size=20)
+    previous = detector.run(graph)
+
+    graph.add_edge("A0", "A-new", weight=1)
+    graph.add_edge("A1", "A-new", weight=1)
+    result = detector.run(graph, previous=previous)
+
+    previous_members, members = _top_level_members(previous), _top_level_members(result)
+    assert previous_members.keys() == members.keys()
+    changed = result.changed_communities(previous)
+    assert len(changed) == 1
+    _, changed_id = changed[0]
+    assert members[changed_id] == previous_members[changed_id] | {"A-NEW"}
@@ -1,10 +1,17 @@
+import ast
+import asyncio
+from pathlib import Path
+
 import networkx as nx
 from langchain_core.language_models import FakeListLLM
+from langchain_core.prompt_values import PromptValue
+from langchain_core.runnables import RunnableLambda
 
 from langchain_graphrag.indexing.graph_generation import (
     EntityRelationshipDescriptionSummarizer,
     SummarizeDescriptionPromptBuilder,
 )
+from langchain_graphrag.utils import DiskCache
 
 
 def test_summarizer():
@@ -39,3 +46,122 @@ def test_summarizer():
 
     print("\n")
     print(graph1_updated.edges(data=True))
+
+
+def _entity_name_llm(prompt: PromptValue) -> str:
+    # the summary names its entity so that we can check where it ends up
+    entity_name = prompt.to_string().split("Entities: ")[-1].split("\n")[0]
+    return f"summary of {entity_name}"
+
+
+def _make_graph() -> nx.Graph:
+    graph = nx.Graph()
+    for i in range(10):
+        graph.add_node(f"node{i}", description=[f"a{i}", f"b{i}"])
+    graph.add_node("single", description=["only one"])
+    for i in range(9):
+        graph.add_edge(f"node{i}", f"node{i + 1}", description=["x", "y"])
+    return graph
+
+
+def test_concurrent_summarization_is_deterministic():
+    summarizer = EntityRelationshipDescriptionSummarizer.build_default(
+        RunnableLambda(_entity_name_llm),
+        max_concurrency=4,
+    )
+
+    for graph in [
+        summarizer.invoke(_make_graph()),
+        asyncio.run(summarizer.ainvoke(_make_graph())),
+    ]:
+        assert graph.nodes["single"]["description"] == "only one"
+        for i in range(10):
+            assert graph.nodes[f"node{i}"]["description"] == f"summary of node{i}"
+        for i in range(9):
+            assert (
+                graph.edges[f"node{i}", f"node{i + 1}"]["description"]
+                == f"summary of node{i} -> node{i + 1}"
+            )
+
+
+class _WordCounter:
+    def count_tokens(self, text: str) -> int:
+        return len(text.split())
+
+
+def test_token_aware_summarization():
+    prompts: list[list[str]] = []
+
+    def _counting_llm(prompt: PromptValue) -> str:
+        line = prompt.to_string().split("Description List: ")[-1].split("\n")[0]
+        description_list = ast.literal_eval(line)
+        prompts.append(description_list)
+        return f"summary of {len(description_list)}"
+
+    summarizer = EntityRelationshipDescriptionSummarizer.build_default(
+        RunnableLambda(_counting_llm),
+        token_counter=_WordCounter(),
+        concat_token_threshold=4,
+        max_input_tokens=6,
+    )
+
+    graph = nx.Graph()
+    graph.add_node("short", description=["one two", "three four"])
+    graph.add_node("hub", description=[f"word{i} a b" for i in range(6)])
+    summarizer.invoke(graph)
+
+    assert graph.nodes["short"]["description"] == "one two\nthree four"
+    assert graph.nodes["hub"]["description"] == "summary of 3"
+    # three batches of two descriptions then the summary of the batches
+    assert [len(p) for p in prompts] == [2, 2, 2, 3]
+
+
+def test_cached_summarization_skips_llm(tmp_path: Path):
+    cache = DiskCache(tmp_path)
+    summarizer = EntityRelationshipDescriptionSummarizer.build_default(
+        RunnableLambda(_entity_name_llm),
+        cache=cache,
+    )
+    graph = summarizer.invoke(_make_graph())
+
+    def _failing_llm(_prompt: PromptValue) -> str:
+        raise AssertionError("cache miss")
+
+    cached_summarizer = EntityRelationshipDescriptionSummarizer.build_default(
+        RunnableLambda(_failing_llm),
+        cache=cache,
+    )
+
+    # the order of the descriptions does not matter
+    new_graph = _make_graph()
+    for _, node in new_graph.nodes(data=True):
+        node["description"].reverse()
+    cached_graph = cached_summarizer.invoke(new_graph)
+
+    assert dict(cached_graph.nodes(data=True)) == dict(graph.nodes(data=True))
+    assert list(cached_graph.edges(data=True)) == list(graph.edges(data=True))
+
+
+def test_cached_edge_summary_does_not_depend_on_endpoint_order(tmp_path: Path):
+    cache = DiskCache(tmp_path)
+    graph = nx.Graph()
+    graph.add_nodes_from(["a", "b"], description=["only one"])
+    graph.add_edge("a", "b", description=["x", "y"])
+    EntityRelationshipDescriptionSummarizer.build_default(
+        RunnableLambda(_entity_name_llm),
+        cache=cache,
+    ).invoke(graph)
+
+    def _failing_llm(_prompt: PromptValue) -> str:
+        raise AssertionError("cache miss")
+
+    # networkx iterates this edge as ("b", "a")
+    reversed_graph = nx.Graph()
+    reversed_graph.add_nodes_from(["b", "a"], description=["only one"])
+    reversed_graph.add_edge("b", "a", description=["x", "y"])
+    EntityRelationshipDescriptionSummarizer.build_default(
+        RunnableLambda(_failing_llm),
+        cache=cache,
+    ).invoke(reversed_graph)
+
+    assert reversed_graph.edges["a", "b"]["description"] == "summary of a -> b"
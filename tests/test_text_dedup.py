@@ -0,0 +1,25 @@
+from langchain_graphrag.utils import TextDeduplicator
+
+_TEXT = (
+    "the quick brown fox jumps over the lazy dog and then runs far away into "
+    "the deep dark forest where nobody can find it ever again"
+)
+
+
+def test_exact_duplicates():
+    texts = [_TEXT, "something else", f"  {_TEXT}\n", "something else"]
+    assert TextDeduplicator().find_representatives(texts) == [0, 1, 0, 1]
+
+
+def test_near_duplicates():
+    texts = [
+        "a text about cooking pasta with a tomato sauce",
+        _TEXT,
+        _TEXT.replace("far", "very far"),
+        _TEXT.replace("far", "very far"),
+    ]
+    exact_only = TextDeduplicator()
+    near = TextDeduplicator(near_duplicate_threshold=0.7)
+
+    assert exact_only.find_representatives(texts) == [0, 1, 2, 2]
+    assert near.find_representatives(texts) == [0, 1, 1, 1]
@@ -0,0 +1,58 @@
+from langchain_core.documents import Document
+from langchain_text_splitters import CharacterTextSplitter
+
+from langchain_graphrag.indexing import TextUnitExtractor
+
+_PARAGRAPHS_PER_DOCUMENT = 5
+
+
+def _make_documents(count: int) -> list[Document]:
+    return [
+        Document(
+            id=f"doc-{i}",
+            page_content="\n\n".join(
+                f"paragraph {j} of document {i}"
+                for j in range(_PARAGRAPHS_PER_DOCUMENT)
+            ),
+        )
+        for i in range(count)
+    ]
+
+
+def _make_splitter() -> CharacterTextSplitter:
+    return CharacterTextSplitter(chunk_size=30, chunk_overlap=0)
+
+
+def test_parallel_split_matches_sequential_split():
+    documents = _make_documents(10)
+    sequential = TextUnitExtractor(_make_splitter()).run(documents)
+    parallel = TextUnitExtractor(_make_splitter(), max_workers=2, chunksize=2).run(
+        documents
+    )
+
+    assert list(sequential.columns) == ["document_id", "id", "text_unit"]
+    # every paragraph is a text unit
+    assert len(sequential) == len(documents) * _PARAGRAPHS_PER_DOCUMENT
+    assert parallel["id"].is_unique
+    columns = ["document_id", "text_unit"]
+    assert parallel[columns].equals(sequential[columns])
+
+
+def test_text_units_are_streamed_in_batches():
+    extractor = TextUnitExtractor(_make_splitter())
+    batches = list(extractor.iter_batches(iter(_make_documents(10)), batch_size=7))
+
+    assert [len(batch) for batch in batches] == [7] * 7 + [1]
+    assert batches[0]["text_unit"].iloc[0] == "paragraph 0 of document 0"
+
+
+def test_content_ids_are_stable():
+    documents = [Document(page_content="same text\n\nsame text\n\nother text")]
+    extractor = TextUnitExtractor(_make_splitter(), content_ids=True)
+
+    first = extractor.run(documents)
+    second = extractor.run(documents)
+
+    assert first.equals(second)
+    assert first["id"].is_unique
+    assert first["document_id"].nunique() == 1
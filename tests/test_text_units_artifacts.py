@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+from langchain_graphrag.indexing.artifacts_generation import (
+    TextUnitsArtifactsGenerator,
+)
+
+
+def test_text_units_reference_distinct_entities_and_relationships():
+    base_text_units = pd.DataFrame(
+        {
+            "document_id": ["doc-1", "doc-1", "doc-2"],
+            "id": ["t1", "t2", "t3"],
+            "text_unit": ["one", "two", "three"],
+        }
+    )
+    entities = pd.DataFrame(
+        {
+            "id": ["e1", "e2", "e3"],
+            "text_unit_ids": [
+                ["t2", "t1", "t2"],
+                np.array(["t1"], dtype=object),
+                ["t2"],
+            ],
+        }
+    )
+    relationships = pd.DataFrame({"id": ["r1"], "text_unit_ids": [["t2"]]})
+
+    text_units = TextUnitsArtifactsGenerator().run(
+        base_text_units, entities, relationships
+    )
+
+    assert text_units.columns.tolist() == [
+        "document_id",
+        "id",
+        "text_unit",
+        "entity_ids",
+        "relationship_ids",
+    ]
+    assert text_units["id"].tolist() == ["t1", "t2", "t3"]
+    assert text_units["entity_ids"].tolist()[:2] == [["e1", "e2"], ["e1", "e3"]]
+    assert text_units["relationship_ids"].tolist()[1] == ["r1"]
+    # text units that nothing references get no ids
+    assert text_units["entity_ids"].isna().tolist() == [False, False, True]
+    assert text_units["relationship_ids"].isna().tolist() == [True, False, True]
+
+
+def test_entities_without_text_units_are_skipped():
+    base_text_units = pd.DataFrame(
+        {"document_id": ["doc-1"], "id": ["t1"], "text_unit": ["one"]}
+    )
+    # e.g. the text_unit_ids of an outer merge
+    entities = pd.DataFrame(
+        {"id": ["e1", "e2", "e3"], "text_unit_ids": [np.nan, None, ["t1"]]}
+    )
+    relationships = pd.DataFrame({"id": ["r1"], "text_unit_ids": [np.nan]})
+
+    text_units = TextUnitsArtifactsGenerator().run(
+        base_text_units, entities, relationships
+    )
+
+    assert text_units["entity_ids"].tolist() == [["e3"]]
+    assert text_units["relationship_ids"].isna().tolist() == [True]
+
+
+def test_no_text_units():
+    base_text_units = pd.DataFrame({"document_id": [], "id": [], "text_unit": []})
+    empty = pd.DataFrame({"id": [], "text_unit_ids": []})
+
+    text_units = TextUnitsArtifactsGenerator().run(base_text_units, empty, empty)
+
+    assert text_units.empty
+    assert text_units.columns.tolist() == [
+        "document_id",
+        "id",
+        "text_unit",
+        "entity_ids",
+        "relationship_ids",
+    ]
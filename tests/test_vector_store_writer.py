@@ -0,0 +1,152 @@
+import threading
+from pathlib import Path
+from typing import Any
+
+import networkx as nx
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.vectorstores import InMemoryVectorStore
+
+from langchain_graphrag.indexing.artifacts_generation import (
+    EntitiesArtifactsGenerator,
+    RelationshipsArtifactsGenerator,
+    VectorStoreWriter,
+)
+from langchain_graphrag.indexing.graph_generation import GraphsMerger, IdScheme
+from langchain_graphrag.types.graphs.community import CommunityDetectionResult
+from langchain_graphrag.utils import ContentHashIndex
+
+
+class _FlakyVectorStore(InMemoryVectorStore):
+    def __init__(self, failing_ids: dict[str, int]):
+        super().__init__(DeterministicFakeEmbedding(size=4))
+        self.calls: list[int] = []
+        self.deleted: list[str] = []
+        self._failing_ids = failing_ids
+        self._lock = threading.Lock()
+
+    def add_texts(self, texts: Any, metadatas: Any = None, **kwargs: Any) -> Any:
+        with self._lock:
+            self.calls.append(len(texts))
+            for text_id in kwargs["ids"]:
+                if self._failing_ids.get(text_id, 0) > 0:
+                    self._failing_ids[text_id] -= 1
+                    raise ConnectionError("flaky")
+        return super().add_texts(texts, metadatas, **kwargs)
+
+    def delete(self, ids: Any = None, **kwargs: Any) -> None:
+        self.deleted.extend(ids)
+        super().delete(ids, **kwargs)
+
+
+def test_batches_are_retried_on_their_own():
+    store = _FlakyVectorStore(failing_ids={"id-7": 1})
+    writer = VectorStoreWriter(store, batch_size=4, max_concurrency=2, retry_wait=0)
+    ids = [f"id-{i}" for i in range(10)]
+
+    metrics = writer.write([f"text {i}" for i in ids], [{"i": i} for i in ids], ids)
+
+    assert [(m.batch, m.size, m.attempts) for m in metrics] == [
+        (0, 4, 1),
+        (1, 4, 2),
+        (2, 2, 1),
+    ]
+    assert sorted(store.calls) == [2, 4, 4, 4]
+    assert {d.id for d in store.get_by_ids(ids)} == set(ids)
+
+
+def test_failed_batch_raises_after_the_others_are_written():
+    store = _FlakyVectorStore(failing_ids={"id-0": 5})
+    writer = VectorStoreWriter(store, batch_size=2, max_attempts=2, retry_wait=0)
+    ids = [f"id-{i}" for i in range(4)]
+
+    with pytest.raises(ConnectionError):
+        writer.write(ids, [{}] * 4, ids)
+    assert [d.id for d in store.get_by_ids(ids)] == ["id-2", "id-3"]
+
+
+def test_relationships_are_written_in_batches():
+    graph = nx.Graph()
+    for i in range(5):
+        graph.add_edge(f"A{i}", f"B{i}", id=f"edge-{i}", description=f"d{i}", rank=1)
+    store = _FlakyVectorStore(failing_ids={})
+
+    RelationshipsArtifactsGenerator(VectorStoreWriter(store, batch_size=2)).run(graph)
+
+    assert sorted(store.calls) == [1, 2, 2]
+
+
+def test_upsert_only_writes_changes(tmp_path: Path):
+    store = _FlakyVectorStore(failing_ids={})
+    index_path = tmp_path / "entities-hashes.json"
+    ids = ["id-0", "id-1", "id-2"]
+
+    def _writer() -> VectorStoreWriter:
+        return VectorStoreWriter(store, content_hashes=ContentHashIndex(index_path))
+
+    first = _writer().upsert(["a", "b", "c"], [{}, {}, {}], ids)
+    assert (first.written, first.unchanged, first.deleted) == (3, 0, 0)
+
+    # a later run, with one text changed, one removed and one added
+    second = _writer().upsert(["a", "B", "d"], [{}, {}, {}], ["id-0", "id-1", "id-3"])
+    assert (second.written, second.unchanged, second.deleted) == (2, 1, 1)
+    assert sorted(store.calls) == [2, 3]
+    # the changed text is deleted first, add_texts appends on some stores
+    assert store.deleted == ["id-2", "id-1"]
+    assert store.get_by_ids(["id-2"]) == []
+    assert store.get_by_ids(["id-1"])[0].page_content == "B"
+    assert ContentHashIndex(index_path).ids() == {"id-0", "id-1", "id-3"}
+
+
+def test_reindexing_only_embeds_new_and_changed_entities(tmp_path: Path):
+    entities_store = _FlakyVectorStore(failing_ids={})
+    relationships_store = _FlakyVectorStore(failing_ids={})
+
+    def _index(graphs: list[nx.Graph]) -> nx.Graph:
+        graph = GraphsMerger(id_scheme=IdScheme.content)(graphs)
+        # what the summarizer does to the merged descriptions
+        for *_, data in [*graph.nodes(data=True), *graph.edges(data=True)]:
+            data["description"] = " ".join(data["description"])
+        EntitiesArtifactsGenerator(
+            VectorStoreWriter(
+                entities_store,
+                content_hashes=ContentHashIndex(tmp_path / "entities.json"),
+            )
+        ).run(CommunityDetectionResult(), graph)
+        RelationshipsArtifactsGenerator(
+            VectorStoreWriter(
+                relationships_store,
+                content_hashes=ContentHashIndex(tmp_path / "relationships.json"),
+            )
+        ).run(graph)
+        return graph
+
+    def _graph(*edges: tuple[str, str]) -> nx.Graph:
+        graph = nx.Graph()
+        for source, target in edges:
+            for name in (source, target):
+                graph.add_node(name, text_unit_ids=["1"], description=[f"about {name}"])
+            graph.add_edge(
+                source,
+                target,
+                text_unit_ids=["1"],
+                description=[f"{source} and {target}"],
+                weight=1,
+            )
+        return graph
+
+    _index([_graph(("A", "B"))])
+
+    # new entities in front of the existing ones do not shift their ids
+    _index([_graph(("C", "D")), _graph(("A", "B"))])
+    assert entities_store.calls == [2, 2]
+    assert relationships_store.calls == [1, 1]
+    assert entities_store.deleted == []
+
+    # a new relationship changes the degree of B and C and the rank of
+    # the relationships around them, which is written again
+    graph = _index([_graph(("C", "D")), _graph(("A", "B")), _graph(("B", "C"))])
+    assert entities_store.calls == [2, 2, 2]
+    assert relationships_store.calls == [1, 1, 3]
+    [entity_b] = entities_store.get_by_ids([graph.nodes["B"]["id"]])
+    assert entity_b.metadata["degree"] == graph.nodes["B"]["degree"]